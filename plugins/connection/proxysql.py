@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+author: Ansible ProxySQL community (@ansible-collections)
+name: proxysql
+short_description: Keep one ProxySQL admin session open for the whole play
+description:
+  - This connection plugin opens a single authenticated session to the
+    ProxySQL admin interface per host and keeps it open, in the background
+    C(ansible-connection) process, for as long as the play runs.
+  - The community.proxysql modules run on the controller and send their
+    queries over this session instead of connecting, authenticating and
+    querying the ProxySQL version in every task. The version is read once
+    per session.
+  - The I(login_*), I(config_file) and SSL options of the modules are
+    ignored when this connection plugin is used.
+version_added: 1.9.0
+requirements:
+  - PyMySQL
+options:
+  host:
+    description:
+      - Address of the ProxySQL admin interface.
+    type: str
+    default: inventory_hostname
+    vars:
+      - name: inventory_hostname
+      - name: ansible_host
+      - name: ansible_proxysql_host
+  port:
+    description:
+      - Port of the ProxySQL admin interface.
+    type: int
+    default: 6032
+    vars:
+      - name: ansible_port
+      - name: ansible_proxysql_port
+  remote_user:
+    description:
+      - The username used to authenticate to the ProxySQL admin interface.
+    type: str
+    vars:
+      - name: ansible_user
+      - name: ansible_proxysql_user
+  password:
+    description:
+      - The password used to authenticate to the ProxySQL admin interface.
+    type: str
+    vars:
+      - name: ansible_password
+      - name: ansible_proxysql_pass
+      - name: ansible_proxysql_password
+  login_unix_socket:
+    description:
+      - The socket used to connect to the ProxySQL admin interface. When set,
+        I(host) and I(port) are ignored.
+    type: str
+    vars:
+      - name: ansible_proxysql_login_unix_socket
+  ssl_ca:
+    description:
+      - The path to a Certificate Authority (CA) certificate.
+    type: path
+    vars:
+      - name: ansible_proxysql_ssl_ca
+  ssl_cert:
+    description:
+      - The path to a client public key certificate.
+    type: path
+    vars:
+      - name: ansible_proxysql_ssl_cert
+  ssl_key:
+    description:
+      - The path to the client private key.
+    type: path
+    vars:
+      - name: ansible_proxysql_ssl_key
+  connect_timeout:
+    description:
+      - The connection timeout when connecting to the ProxySQL admin interface.
+    type: int
+    default: 30
+    vars:
+      - name: ansible_proxysql_connect_timeout
+  persistent_connect_timeout:
+    description:
+      - Seconds the persistent session waits for a new task before it is
+        closed.
+    type: int
+    default: 30
+    ini:
+      - section: persistent_connection
+        key: connect_timeout
+    env:
+      - name: ANSIBLE_PERSISTENT_CONNECT_TIMEOUT
+    vars:
+      - name: ansible_connect_timeout
+  persistent_command_timeout:
+    description:
+      - Seconds to wait for a single query to return.
+    type: int
+    default: 30
+    ini:
+      - section: persistent_connection
+        key: command_timeout
+    env:
+      - name: ANSIBLE_PERSISTENT_COMMAND_TIMEOUT
+    vars:
+      - name: ansible_command_timeout
+  persistent_log_messages:
+    description:
+      - Log every query and result of the persistent session to the file set
+        by C(log_path). The log is not redacted and includes passwords.
+    type: boolean
+    default: false
+    ini:
+      - section: persistent_connection
+        key: log_messages
+    env:
+      - name: ANSIBLE_PERSISTENT_LOG_MESSAGES
+    vars:
+      - name: ansible_persistent_log_messages
+'''
+
+EXAMPLES = '''
+# inventory
+# [proxysql]
+# proxysql01 ansible_host=10.0.0.10
+#
+# [proxysql:vars]
+# ansible_connection=community.proxysql.proxysql
+# ansible_user=admin
+# ansible_password=admin
+# ansible_proxysql_ssl_ca=/etc/proxysql/ca.pem
+
+- name: Manage ProxySQL over a single admin session per host
+  hosts: proxysql
+  gather_facts: false
+  tasks:
+    - name: Add a backend server
+      community.proxysql.proxysql_backend_servers:
+        hostname: mysql01
+        hostgroup_id: 1
+
+    - name: Add a user
+      community.proxysql.proxysql_mysql_users:
+        username: app
+        password: secret
+'''
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils.basic import missing_required_lib
+from ansible.module_utils.common.text.converters import to_text
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.six import integer_types, string_types
+from ansible.plugins.connection import NetworkConnectionBase, ensure_connect
+
+try:
+    import pymysql
+    HAS_PYMYSQL = True
+except ImportError:
+    HAS_PYMYSQL = False
+
+# Client errors raised when the server went away, for instance after a
+# ProxySQL restart; the query is retried once on a new session.
+RECONNECT_ERRORS = (2006, 2013)
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, float) + integer_types + string_types):
+        return value
+    return to_text(value, errors='surrogate_or_strict')
+
+
+class Connection(NetworkConnectionBase):
+    """ProxySQL admin interface persistent connection"""
+
+    transport = 'community.proxysql.proxysql'
+    has_pipelining = True
+
+    def __init__(self, play_context, new_stdin, *args, **kwargs):
+        super(Connection, self).__init__(play_context, new_stdin, *args, **kwargs)
+        self._db = None
+        self._server_version = None
+
+    def _connect(self):
+        if self.connected:
+            return
+
+        if not HAS_PYMYSQL:
+            raise AnsibleConnectionFailure(missing_required_lib('PyMySQL'))
+
+        config = dict(
+            user=self.get_option('remote_user'),
+            password=self.get_option('password'),
+            connect_timeout=self.get_option('connect_timeout'),
+            autocommit=True,
+        )
+        if self.get_option('login_unix_socket'):
+            config['unix_socket'] = self.get_option('login_unix_socket')
+        else:
+            config['host'] = self.get_option('host')
+            config['port'] = self.get_option('port')
+
+        ssl = dict((key, self.get_option('ssl_' + key))
+                   for key in ('ca', 'cert', 'key')
+                   if self.get_option('ssl_' + key))
+        if ssl:
+            config['ssl'] = ssl
+
+        try:
+            self._db = pymysql.connect(**config)
+        except pymysql.Error as e:
+            raise AnsibleConnectionFailure(
+                "unable to connect to ProxySQL Admin Module.. %s" % to_text(e))
+
+        self.queue_message('vvvv', 'opened ProxySQL admin session to %s'
+                           % config.get('unix_socket', config.get('host')))
+        self._connected = True
+
+    def close(self):
+        if self._db is not None:
+            try:
+                self._db.close()
+            except pymysql.Error:
+                pass
+            self._db = None
+        self._server_version = None
+        super(Connection, self).close()
+
+    def _reconnect(self):
+        self.queue_message('vvvv', 'ProxySQL admin session lost, reconnecting')
+        self.close()
+        self._conn_closed = False
+        self._connect()
+
+    def _run(self, query, args, dict_cursor, retry=True):
+        cursor_class = pymysql.cursors.DictCursor if dict_cursor else pymysql.cursors.Cursor
+        try:
+            with self._db.cursor(cursor_class) as cursor:
+                cursor.execute(query, args)
+                rows = cursor.fetchall()
+                description = cursor.description
+                rowcount = cursor.rowcount
+                lastrowid = cursor.lastrowid
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError) as e:
+            code = e.args[0] if e.args else None
+            if retry and (code in RECONNECT_ERRORS or isinstance(e, pymysql.err.InterfaceError)):
+                self._reconnect()
+                return self._run(query, args, dict_cursor, retry=False)
+            raise ConnectionError(to_text(e), code=code)
+        except pymysql.Error as e:
+            raise ConnectionError(to_text(e), code=e.args[0] if e.args else None)
+
+        if dict_cursor:
+            rows = [dict((k, _json_value(v)) for k, v in row.items()) for row in rows]
+        else:
+            rows = [[_json_value(v) for v in row] for row in rows]
+
+        return dict(
+            rows=rows,
+            rowcount=rowcount,
+            lastrowid=lastrowid,
+            description=[[_json_value(v) for v in column] for column in description or []] or None,
+        )
+
+    def get_target(self):
+        """Return the admin interface of the session, for per host state files."""
+        if self.get_option('login_unix_socket'):
+            return self.get_option('login_unix_socket')
+        return "%s_%s" % (self.get_option('host'), self.get_option('port'))
+
+    @ensure_connect
+    def get_version(self):
+        """Return the raw ProxySQL version string, read once per session."""
+        if self._server_version is None:
+            result = self._run("select version();", None, False)
+            self._server_version = result['rows'][0][0]
+        return self._server_version
+
+    @ensure_connect
+    def execute(self, query, args=None, dict_cursor=False):
+        """Run one statement and return its rows, rowcount and lastrowid."""
+        return self._run(query, args, dict_cursor)
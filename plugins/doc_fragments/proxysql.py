@@ -40,9 +40,31 @@ options:
         are to be read.
     type: path
     default: ''
+  proxysql_version:
+    description:
+      - The version of ProxySQL, for example C(2.7.2) or C(2.5.5-10-g195bd70).
+      - When set, the version is not queried from the server and
+        I(version_cache_ttl) is ignored.
+    type: str
+    version_added: '1.9.0'
+  version_cache_ttl:
+    description:
+      - Number of seconds the ProxySQL version read from the server is
+        cached in C(~/.ansible/proxysql) on the host running the module,
+        per admin interface.
+      - Later tasks within that time do not query the version. C(0)
+        disables the cache.
+    type: int
+    default: 0
+    version_added: '1.9.0'
 requirements:
    - PyMySQL
    - mysqlclient
+notes:
+   - When the task runs over the C(community.proxysql.proxysql) connection
+     plugin, the module reuses the admin session of that plugin and the
+     I(login_user), I(login_password), I(login_host), I(login_port),
+     I(login_unix_socket) and I(config_file) options are ignored.
 '''
 
     # Documentation fragment for managing ProxySQL configuration
@@ -58,4 +80,96 @@ options:
       - Dynamically load config to runtime memory.
     type: bool
     default: true
+  defer_flush:
+    description:
+      - Do not save the changed config to disk or load it to runtime in this
+        task. Instead record the config family, together with
+        I(save_to_disk) and I(load_to_runtime), in a state file under
+        C(~/.ansible/proxysql) on the host running the module.
+      - The state file is kept per admin interface, the I(login_host) and
+        I(login_port) or I(login_unix_socket) of the task, or the host, port
+        or socket of the community.proxysql.proxysql connection plugin.
+      - A later M(community.proxysql.proxysql_manage_config) task with
+        I(flush_deferred=true) saves and loads every recorded family once.
+    type: bool
+    default: false
+    version_added: '1.9.0'
+'''
+
+    # Documentation fragment for checking query rule patterns
+    REGEX_CHECK = r'''
+options:
+  regex_check:
+    description:
+      - Before the rules are written, compile their I(match_digest) and
+        I(match_pattern) locally, honouring the C(CASELESS) modifier of
+        I(re_modifiers), and time them against sample queries.
+      - With C(warn) the patterns that do not compile, that take longer than
+        I(regex_budget) to match a sample, or that start with an unanchored
+        C(.*) are reported as warnings. With C(fail) the module fails and
+        nothing is written.
+      - The patterns are compiled with the Python C(re) module, not the RE2
+        or PCRE engine of ProxySQL. RE2 syntax that Python does not support
+        is reported as not compiling, and the timings are an estimate of
+        the relative cost of the patterns.
+    type: str
+    choices: [ "off", "warn", "fail" ]
+    default: "off"
+    version_added: '1.9.0'
+  regex_samples:
+    description:
+      - The queries the patterns are matched against.
+      - If omitted, the I(regex_sample_size) most frequent digests of the
+        query digest stats table are used.
+    type: list
+    elements: str
+    version_added: '1.9.0'
+  regex_sample_size:
+    description:
+      - Number of digests read from the query digest stats table when
+        I(regex_samples) is omitted.
+    type: int
+    default: 100
+    version_added: '1.9.0'
+  regex_budget:
+    description:
+      - The longest a pattern may take to match one sample, in microseconds.
+      - A pattern still running after ten times its budget for all the
+        samples is stopped and reported.
+    type: int
+    default: 100
+    version_added: '1.9.0'
+'''
+
+    CLUSTER = r'''
+options:
+  wait_for_cluster:
+    description:
+      - After the config is loaded to runtime, wait until every ProxySQL
+        Cluster peer has synchronised it.
+      - The module is meant to run against a single core node of the
+        cluster, for instance with C(run_once). The peers listed in
+        C(proxysql_servers) fetch the new config from it.
+      - The peers have converged when the checksums the core node reads from
+        them in C(stats_proxysql_servers_checksums) are its own checksums in
+        C(runtime_checksums_values). Every peer of
+        C(runtime_proxysql_servers) must report them, a peer that was just
+        added and has no checksums yet has not converged. The module fails
+        when the peers have not converged after I(cluster_timeout) seconds.
+      - Not done in check mode.
+    type: bool
+    default: false
+    version_added: '1.9.0'
+  cluster_timeout:
+    description:
+      - The longest to wait for the peers to converge, in seconds.
+    type: int
+    default: 60
+    version_added: '1.9.0'
+  cluster_poll_interval:
+    description:
+      - Seconds between two reads of the peer checksums.
+    type: float
+    default: 1
+    version_added: '1.9.0'
 '''
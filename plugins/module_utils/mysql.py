@@ -13,10 +13,22 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 import os
+import re
+import csv
+import json
+import time
+import fcntl
 import configparser
+import multiprocessing
+
+from collections import deque
+from itertools import cycle, islice
+from contextlib import contextmanager
 
 from ansible.module_utils.basic import missing_required_lib
-from hashlib import sha256
+from ansible.module_utils.common.text.converters import to_native
+from ansible.module_utils.connection import Connection, ConnectionError
+from hashlib import sha1, sha256
 from os import urandom
 from base64 import urlsafe_b64encode
 
@@ -36,6 +48,12 @@ except ImportError:
         HAS_MYSQL_PACKAGE = False
         mysql_driver = None
 
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
 
 def parse_from_mysql_config_file(cnf):
     cp = configparser.ConfigParser()
@@ -43,17 +61,52 @@ def parse_from_mysql_config_file(cnf):
     return cp
 
 
+# Small per admin interface state files (deferred flushes, cached version)
+# are kept on the host running the module.
+STATE_DIR = "~/.ansible/proxysql"
+
+
+def state_file_path(module, kind):
+    if getattr(module, '_socket_path', None):
+        # The login_* options are ignored by the connection plugin, key the
+        # file on the admin interface of the persistent session instead.
+        try:
+            target = Connection(module._socket_path).get_target()
+        except ConnectionError as e:
+            module.fail_json(msg="unable to read the ProxySQL admin interface"
+                                 " of the connection.. %s" % to_native(e))
+    elif module.params["login_unix_socket"]:
+        target = module.params["login_unix_socket"]
+    else:
+        target = "%s_%s" % (module.params["login_host"],
+                            module.params["login_port"])
+
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", target).strip("_.")
+    return os.path.join(os.path.expanduser(STATE_DIR),
+                        "%s_%s.json" % (kind, name))
+
+
+def _ensure_state_dir(path):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+
 def _version(cursor):
     cursor.execute("select version();")
     res = cursor.fetchone()
 
+    return _parse_version(res.get('version()'))
+
+
+def _parse_version(full_version):
     # 2.2.0-72-ge14accd
     # 2.3.2-percona-1.1
-    raw_version = res.get('version()').split('-', 1)
+    raw_version = full_version.split('-', 1)
     _version = raw_version[0].split('.')
 
     version = dict()
-    version['full'] = res.get('version()')
+    version['full'] = full_version
     version['major'] = int(_version[0])
     version['minor'] = int(_version[1])
     version['release'] = int(_version[2])
@@ -62,6 +115,48 @@ def _version(cursor):
     return version
 
 
+def _known_version(module, use_cache=True):
+    """Return the version from proxysql_version or from a fresh cache entry.
+
+    None means the version has to be read from the server.
+    """
+    if module.params.get("proxysql_version"):
+        if not re.match(r"^\d+\.\d+\.\d+", module.params["proxysql_version"]):
+            module.fail_json(msg="proxysql_version must be a version like 2.7.2,"
+                                 " got %s" % module.params["proxysql_version"])
+        return _parse_version(module.params["proxysql_version"])
+
+    ttl = module.params.get("version_cache_ttl")
+    if not (use_cache and ttl):
+        return None
+
+    try:
+        with open(state_file_path(module, "version")) as cache_file:
+            cached = json.load(cache_file)
+        if 0 <= time.time() - cached["checked"] < ttl:
+            return _parse_version(cached["full"])
+    except (IOError, OSError, ValueError, KeyError, TypeError, IndexError):
+        pass
+
+    return None
+
+
+def _cache_version(module, version):
+    if not module.params.get("version_cache_ttl") or module.params.get("proxysql_version"):
+        return
+
+    path = state_file_path(module, "version")
+    try:
+        _ensure_state_dir(path)
+        tmp_path = "%s.%s.tmp" % (path, os.getpid())
+        with open(tmp_path, "w") as cache_file:
+            json.dump(dict(full=version["full"], checked=time.time()), cache_file)
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        # The cache is an optimisation only.
+        pass
+
+
 def mysql_connect(module, login_user=None, login_password=None, config_file='', ssl_cert=None,
                   ssl_key=None, ssl_ca=None, db=None, cursor_class=None,
                   connect_timeout=30, autocommit=False, config_overrides_defaults=False):
@@ -70,6 +165,9 @@ def mysql_connect(module, login_user=None, login_password=None, config_file='',
     if not HAS_MYSQL_PACKAGE:
         module.fail_json(msg=missing_required_lib("pymysql or MySQLdb"), exception=MYSQL_IMP_ERR)
 
+    if getattr(module, '_socket_path', None):
+        return persistent_connect(module, cursor_class)
+
     if module.params["login_port"] < 0 \
        or module.params["login_port"] > 65535:
         module.fail_json(
@@ -124,10 +222,14 @@ def mysql_connect(module, login_user=None, login_password=None, config_file='',
         if autocommit:
             db_connection.autocommit(True)
 
-    version = _version(db_connection.cursor(**{_mysql_cursor_param: mysql_driver.cursors.DictCursor}))
+    version = _known_version(module)
+    if version is None:
+        version = _version(db_connection.cursor(**{_mysql_cursor_param: mysql_driver.cursors.DictCursor}))
+        _cache_version(module, version)
 
-    if cursor_class == 'DictCursor':
-        return (db_connection.cursor(**{_mysql_cursor_param: mysql_driver.cursors.DictCursor}),
+    if cursor_class in ('DictCursor', 'SSDictCursor'):
+        cursor = getattr(mysql_driver.cursors, cursor_class)
+        return (db_connection.cursor(**{_mysql_cursor_param: cursor}),
                 db_connection,
                 version)
     else:
@@ -136,6 +238,103 @@ def mysql_connect(module, login_user=None, login_password=None, config_file='',
                 version)
 
 
+class PersistentCursor(object):
+    """DB-API style cursor that runs its queries over the
+    community.proxysql.proxysql persistent connection.
+    """
+
+    def __init__(self, connection, dict_cursor=False):
+        self._connection = connection
+        self._dict_cursor = dict_cursor
+        self._rows = deque()
+        self.rowcount = -1
+        self.lastrowid = None
+        self.description = None
+
+    def execute(self, query, args=None):
+        try:
+            result = self._connection.execute(query, args, self._dict_cursor)
+        except ConnectionError as e:
+            raise mysql_driver.Error(to_native(e))
+
+        rows = result['rows']
+        if not self._dict_cursor:
+            rows = [tuple(row) for row in rows]
+        self._rows = deque(rows)
+        self.rowcount = result['rowcount']
+        self.lastrowid = result['lastrowid']
+        self.description = result['description']
+
+        return self.rowcount
+
+    def fetchone(self):
+        return self._rows.popleft() if self._rows else None
+
+    def fetchmany(self, size=1):
+        return [self._rows.popleft() for dummy in range(min(size, len(self._rows)))]
+
+    def fetchall(self):
+        rows, self._rows = list(self._rows), deque()
+        return rows
+
+    def __iter__(self):
+        while self._rows:
+            yield self._rows.popleft()
+
+    def close(self):
+        self._rows = deque()
+
+
+class PersistentConnection(object):
+    """Stand-in for the driver connection returned by mysql_connect().
+
+    The admin session belongs to the connection plugin, so closing it here
+    is a no-op and statements are already autocommitted.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, dict_cursor=False):
+        return PersistentCursor(self._connection, dict_cursor)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def persistent_connect(module, cursor_class=None):
+    connection = Connection(module._socket_path)
+    # The connection plugin already reads the version once per session.
+    version = _known_version(module, use_cache=False)
+    if version is None:
+        try:
+            version = _parse_version(connection.get_version())
+        except ConnectionError as e:
+            raise mysql_driver.Error(to_native(e))
+
+    # Rows are returned in one response, an SSDictCursor does not stream.
+    db_connection = PersistentConnection(connection)
+    return (db_connection.cursor(dict_cursor=cursor_class in ('DictCursor', 'SSDictCursor')),
+            db_connection,
+            version)
+
+
+def fetch_rows(cursor, fetch_size):
+    """Yield the rows of the last query, reading fetch_size rows at a time."""
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield row
+
+
 def proxysql_common_argument_spec():
     return dict(
         login_user=dict(type='str', default=None),
@@ -144,55 +343,562 @@ def proxysql_common_argument_spec():
         login_port=dict(type='int', default=6032),
         login_unix_socket=dict(type='str'),
         config_file=dict(type='path', default=''),
+        proxysql_version=dict(type='str'),
+        version_cache_ttl=dict(type='int', default=0),
     )
 
 
-def save_config_to_disk(cursor, save_what, variable=None):
-    if variable and variable.startswith("admin"):
+def config_family(save_what, variable=None, family=None):
+    if family:
+        config_type = family
+    elif variable and variable.startswith("admin"):
         config_type = "ADMIN"
     elif variable and variable.startswith("pgsql"):
         config_type = "PGSQL"
     elif save_what == "SCHEDULER":
-        config_type = ""
+        return save_what
     else:
         config_type = "MYSQL"
 
-    cursor.execute("SAVE {0} {1} TO DISK".format(config_type, save_what))
+    return "{0} {1}".format(config_type, save_what)
+
+
+def save_config_to_disk(cursor, save_what, variable=None, family=None):
+    cursor.execute("SAVE {0} TO DISK".format(config_family(save_what, variable, family)))
 
     return True
 
 
-def load_config_to_runtime(cursor, save_what, variable=None):
-    if variable and variable.startswith("admin"):
-        config_type = "ADMIN"
-    elif variable and variable.startswith("pgsql"):
-        config_type = "PGSQL"
-    elif save_what == "SCHEDULER":
-        config_type = ""
-    else:
-        config_type = "MYSQL"
+def load_config_to_runtime(cursor, save_what, variable=None, family=None):
+    cursor.execute("LOAD {0} TO RUNTIME".format(config_family(save_what, variable, family)))
+
+    return True
+
 
-    cursor.execute("LOAD {0} {1} TO RUNTIME".format(config_type, save_what))
+# Deferred flushing.
+#
+# With defer_flush the modules do not SAVE/LOAD the config family they
+# changed; they record it in a state file on the host running the module,
+# one file per ProxySQL admin interface (see state_file_path()). proxysql_manage_config with
+# flush_deferred then saves and loads every recorded family once, in
+# DEFERRED_FLUSH_ORDER.
+DEFERRED_FLUSH_ORDER = [
+    "MYSQL SERVERS",
+    "MYSQL USERS",
+    "MYSQL QUERY RULES",
+    "MYSQL VARIABLES",
+    "PGSQL SERVERS",
+    "PGSQL USERS",
+    "PGSQL QUERY RULES",
+    "PGSQL VARIABLES",
+    "ADMIN VARIABLES",
+    "SCHEDULER",
+    "PROXYSQL SERVERS",
+]
+
+
+def deferred_flush_path(module):
+    return state_file_path(module, "deferred_flush")
+
+
+@contextmanager
+def deferred_flush(path):
+    """Yield the pending families recorded in path, under an exclusive lock.
+
+    The dict maps a family such as "MYSQL SERVERS" to its save_to_disk and
+    load_to_runtime flags; changes made to it are written back on exit.
+    """
+    _ensure_state_dir(path)
+
+    with open(path, "a+") as state_file:
+        fcntl.flock(state_file, fcntl.LOCK_EX)
+        state_file.seek(0)
+        content = state_file.read()
+        pending = json.loads(content) if content.strip() else {}
+
+        yield pending
+
+        state_file.seek(0)
+        state_file.truncate()
+        json.dump(pending, state_file, sort_keys=True)
+
+
+def record_deferred_flush(path, save_what, variable=None,
+                          save_to_disk=True, load_to_runtime=True, family=None):
+    if not (save_to_disk or load_to_runtime):
+        return
+
+    with deferred_flush(path) as pending:
+        flags = pending.setdefault(config_family(save_what, variable, family),
+                                   dict(save_to_disk=False,
+                                        load_to_runtime=False))
+        flags["save_to_disk"] = flags["save_to_disk"] or save_to_disk
+        flags["load_to_runtime"] = flags["load_to_runtime"] or load_to_runtime
+
+
+def flush_config(cursor, params, flush_state, save_what, variable=None,
+                 family=None):
+    """Save and load a changed config family as the module params ask.
+
+    With defer_flush the family is recorded in flush_state instead. Returns
+    True when the family was loaded to runtime.
+    """
+    if params["defer_flush"]:
+        record_deferred_flush(flush_state, save_what, variable,
+                              save_to_disk=params["save_to_disk"],
+                              load_to_runtime=params["load_to_runtime"],
+                              family=family)
+        return False
+
+    if params["save_to_disk"]:
+        save_config_to_disk(cursor, save_what, variable, family)
+    if params["load_to_runtime"]:
+        load_config_to_runtime(cursor, save_what, variable, family)
+        return True
+    return False
+
+
+# Table reconciliation.
+#
+# A table is read once with fetch_table(), indexed by its primary key, and
+# compared with the wanted rows by compute_changeset(). apply_changeset()
+# then turns the changeset into batched INSERT/UPDATE/DELETE statements, so
+# the number of round trips does not depend on the size of the table.
+RECONCILE_BATCH_SIZE = 500
+
+# Keys of several columns are matched with one OR term per row, and SQLite
+# limits the depth of an expression to 1000.
+RECONCILE_MAX_KEY_TERMS = 250
+
+
+def normalize_value(value):
+    """ProxySQL admin returns every column as a string, compare on that."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value)
+
+
+def row_key(row, key_columns):
+    return tuple(normalize_value(row.get(col)) for col in key_columns)
+
+
+def fetch_table(cursor, table, key_columns, match=None):
+    """Read a table once and index its rows by primary key.
+
+    Args:
+        cursor: DictCursor connected to the admin interface.
+        table (str): table to read.
+        key_columns (list): columns making up the primary key.
+        match (dict): optional column/value pairs restricting the rows read.
+
+    Returns:
+        dict: rows keyed by the normalized primary key tuple.
+    """
+    query_string = "SELECT * FROM {0}".format(table)
+    query_data = []
+
+    if match:
+        cols = list(match.keys())
+        query_string += " WHERE " + " AND ".join(
+            "{0} = %s".format(col) for col in cols)
+        query_data = [match[col] for col in cols]
+
+    cursor.execute(query_string, query_data)
+    return dict((row_key(row, key_columns), row) for row in cursor.fetchall())
+
+
+def compute_changeset(current, key_columns, present=None, absent=None,
+                      purge=False):
+    """Compute the minimal changes turning current into the wanted rows.
+
+    Columns set to None in a wanted row are left unmanaged: they are not
+    compared and not written, so the table default applies on insert.
+
+    Args:
+        current (dict): rows as returned by fetch_table().
+        key_columns (list): columns making up the primary key.
+        present (list): rows (dicts) that must exist with the given values.
+        absent (list): rows (dicts, key columns only needed) to delete.
+        purge (bool): delete every current row not listed in present.
+
+    Returns:
+        dict: 'insert' is a list of rows, 'update' a list of
+        (key, changes) tuples and 'delete' a list of keys, keys being dicts
+        of key column values.
+    """
+    changeset = dict(insert=[], update=[], delete=[])
+    wanted = set()
+
+    for row in present or []:
+        key = row_key(row, key_columns)
+        if key in wanted:
+            continue
+        wanted.add(key)
+
+        existing = current.get(key)
+        if existing is None:
+            changeset['insert'].append(
+                dict((col, val) for col, val in row.items() if val is not None))
+            continue
+
+        changes = dict(
+            (col, val) for col, val in row.items()
+            if val is not None and col not in key_columns and
+            normalize_value(val) != normalize_value(existing.get(col))
+        )
+        if changes:
+            changeset['update'].append(
+                (dict((col, row[col]) for col in key_columns), changes))
+
+    deleted = set()
+    for row in absent or []:
+        key = row_key(row, key_columns)
+        if key in current and key not in deleted:
+            deleted.add(key)
+            changeset['delete'].append(
+                dict((col, row[col]) for col in key_columns))
+
+    if purge:
+        for key, row in current.items():
+            if key not in wanted and key not in deleted:
+                deleted.add(key)
+                changeset['delete'].append(
+                    dict((col, row[col]) for col in key_columns))
+
+    return changeset
+
+
+def merge_changes(row, changes):
+    """Return row as it reads back once changes have been applied."""
+    merged = dict(row)
+    merged.update((col, normalize_value(val)) for col, val in changes.items())
+    return merged
+
+
+def _batches(items, batch_size):
+    for i in range(0, len(items), batch_size):
+        yield items[i:i + batch_size]
+
+
+def _key_condition(keys, key_columns):
+    if len(key_columns) == 1:
+        col = key_columns[0]
+        return ("{0} IN ({1})".format(col, ", ".join(["%s"] * len(keys))),
+                [key[col] for key in keys])
+
+    match_one = "(" + " AND ".join(
+        "{0} = %s".format(col) for col in key_columns) + ")"
+    return (" OR ".join([match_one] * len(keys)),
+            [key[col] for key in keys for col in key_columns])
+
+
+def _insert_rows(cursor, verb, table, rows, batch_size):
+    grouped = dict()
+    for row in rows:
+        grouped.setdefault(tuple(row.keys()), []).append(row)
+
+    for cols, rows in grouped.items():
+        values = "(" + ", ".join(["%s"] * len(cols)) + ")"
+        for batch in _batches(rows, batch_size):
+            query_string = "{0} INTO {1} ({2}) VALUES {3}".format(
+                verb, table, ", ".join(cols), ", ".join([values] * len(batch)))
+            cursor.execute(query_string,
+                           [row[col] for row in batch for col in cols])
+
+
+def apply_changeset(cursor, table, key_columns, changeset,
+                    batch_size=RECONCILE_BATCH_SIZE, current=None):
+    """Write a changeset computed by compute_changeset().
+
+    Deletes are issued first, then inserts grouped by column list and finally
+    updates grouped by identical changes, at most batch_size rows per
+    statement.
+
+    When current, the rows the changeset was computed from, is given the
+    updated rows are written whole with multi-row REPLACE statements
+    instead. Use it when the changes differ from row to row, as they
+    can not be grouped into a single UPDATE.
+    """
+    key_batch_size = batch_size
+    if len(key_columns) > 1:
+        key_batch_size = min(batch_size, RECONCILE_MAX_KEY_TERMS)
+
+    for keys in _batches(changeset['delete'], key_batch_size):
+        condition, query_data = _key_condition(keys, key_columns)
+        cursor.execute("DELETE FROM {0} WHERE {1}".format(table, condition),
+                       query_data)
+
+    _insert_rows(cursor, "INSERT", table, changeset['insert'], batch_size)
+
+    if current is not None:
+        _insert_rows(cursor, "REPLACE", table,
+                     [merge_changes(current[row_key(key, key_columns)], changes)
+                      for key, changes in changeset['update']],
+                     batch_size)
+        return
+
+    updates = dict()
+    for key, changes in changeset['update']:
+        signature = tuple(sorted(
+            (col, normalize_value(val)) for col, val in changes.items()))
+        updates.setdefault(signature, (changes, []))[1].append(key)
+
+    for changes, keys in updates.values():
+        cols = list(changes.keys())
+        assignments = ", ".join("{0} = %s".format(col) for col in cols)
+        for batch in _batches(keys, key_batch_size):
+            condition, query_data = _key_condition(batch, key_columns)
+            cursor.execute(
+                "UPDATE {0} SET {1} WHERE {2}".format(table, assignments,
+                                                      condition),
+                [changes[col] for col in cols] + query_data)
+
+
+def read_rows_file(module, path):
+    """Read a list of rows from a CSV, JSON or YAML file on the managed host.
+
+    The format is chosen by the file extension. A CSV file needs a header
+    line with the column names, and its empty fields are returned as None.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ('.csv', '.json', '.yml', '.yaml'):
+        module.fail_json(msg="unsupported file type for %s, use .csv, .json,"
+                             " .yml or .yaml" % path)
+    if extension in ('.yml', '.yaml') and not HAS_YAML:
+        module.fail_json(msg=missing_required_lib('PyYAML'))
+
+    errors = (IOError, OSError, ValueError)
+    if HAS_YAML:
+        errors += (yaml.YAMLError,)
 
+    try:
+        with open(path, newline='') as stream:
+            if extension == '.csv':
+                rows = [dict((col, val if val != '' else None)
+                             for col, val in row.items())
+                        for row in csv.DictReader(stream)]
+            elif extension == '.json':
+                rows = json.load(stream)
+            else:
+                rows = yaml.safe_load(stream)
+    except errors as e:
+        module.fail_json(msg="unable to read %s: %s" % (path, to_native(e)))
+
+    if rows is None:
+        rows = []
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        module.fail_json(msg="%s must contain a list of rows" % path)
+    return rows
+
+
+# Layer comparison.
+#
+# A config family is made of one or more tables, present in the memory,
+# runtime (runtime_ prefix) and disk (disk schema) layers. Two layers of a
+# family hold the same config when the checksums of their rows are equal,
+# so a LOAD or SAVE between them would be a no-op.
+CONFIG_FAMILY_TABLES = {
+    "MYSQL SERVERS": ["mysql_servers",
+                      "mysql_replication_hostgroups",
+                      "mysql_group_replication_hostgroups",
+                      "mysql_galera_hostgroups",
+                      "mysql_aws_aurora_hostgroups",
+                      "mysql_hostgroup_attributes",
+                      "mysql_servers_ssl_params"],
+    "MYSQL USERS": ["mysql_users"],
+    "MYSQL QUERY RULES": ["mysql_query_rules",
+                          "mysql_query_rules_fast_routing"],
+    "MYSQL VARIABLES": ["global_variables"],
+    "PGSQL SERVERS": ["pgsql_servers",
+                      "pgsql_replication_hostgroups",
+                      "pgsql_hostgroup_attributes"],
+    "PGSQL USERS": ["pgsql_users"],
+    "PGSQL QUERY RULES": ["pgsql_query_rules",
+                          "pgsql_query_rules_fast_routing"],
+    "PGSQL VARIABLES": ["global_variables"],
+    "ADMIN VARIABLES": ["global_variables"],
+    "SCHEDULER": ["scheduler"],
+    "PROXYSQL SERVERS": ["proxysql_servers"],
+}
+
+# The variables families share global_variables, by name prefix.
+CONFIG_FAMILY_VARIABLES = {
+    "MYSQL VARIABLES": "mysql-",
+    "PGSQL VARIABLES": "pgsql-",
+    "ADMIN VARIABLES": "admin-",
+}
+
+CONFIG_LAYER_PREFIX = {
+    "MEMORY": "",
+    "RUNTIME": "runtime_",
+    "DISK": "disk.",
+}
+
+
+def config_layer_tables(cursor, layer):
+    """Return the names of the tables of a layer, without their prefix."""
+    cursor.execute("SHOW TABLES FROM disk" if layer == "DISK" else "SHOW TABLES")
+    names = set(list(row.values())[0] if isinstance(row, dict) else row[0]
+                for row in cursor.fetchall())
+    if layer == "RUNTIME":
+        return set(name[len("runtime_"):] for name in names
+                   if name.startswith("runtime_"))
+    return names
+
+
+def config_table_rows(cursor, family, layer, table):
+    """Read the rows of a family table in a layer, as sorted JSON strings.
+
+    The cursor must be a DictCursor. Values are normalized, so the rows of
+    two layers compare equal whatever the column order and types.
+    """
+    query_string = "SELECT * FROM {0}{1}".format(CONFIG_LAYER_PREFIX[layer], table)
+    query_data = []
+
+    prefix = CONFIG_FAMILY_VARIABLES.get(family)
+    if prefix:
+        query_string += " WHERE variable_name LIKE %s"
+        query_data = [prefix + "%"]
+
+    cursor.execute(query_string, query_data)
+    return sorted(json.dumps(sorted((col, normalize_value(val))
+                                    for col, val in row.items()))
+                  for row in cursor.fetchall())
+
+
+def config_table_checksum(rows):
+    digest = sha1()
+    for row in rows:
+        digest.update(row.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def config_layers_match(cursor, family, source, target):
+    """Tell whether a config family holds the same rows in two layers.
+
+    A table only present in one of the layers, as after an upgrade, makes
+    the layers differ.
+    """
+    source_tables = config_layer_tables(cursor, source)
+    target_tables = config_layer_tables(cursor, target)
+
+    for table in CONFIG_FAMILY_TABLES[family]:
+        if table not in source_tables and table not in target_tables:
+            continue
+        if table not in source_tables or table not in target_tables:
+            return False
+        if (config_table_checksum(config_table_rows(cursor, family, source, table)) !=
+                config_table_checksum(config_table_rows(cursor, family, target, table))):
+            return False
     return True
 
 
+# ProxySQL Cluster.
+#
+# In a cluster the config is written to one core node only. Its peers
+# fetch the config families whose runtime checksum changed, and the core
+# node reports the checksums it last read from each peer in
+# stats_proxysql_servers_checksums. The cluster has converged when every
+# peer reports the runtime checksum of the core node.
+CLUSTER_CHECKSUM_NAMES = {
+    "MYSQL SERVERS": ["mysql_servers", "mysql_servers_v2"],
+    "MYSQL USERS": ["mysql_users"],
+    "MYSQL QUERY RULES": ["mysql_query_rules"],
+    "MYSQL VARIABLES": ["mysql_variables"],
+    "PGSQL SERVERS": ["pgsql_servers", "pgsql_servers_v2"],
+    "PGSQL USERS": ["pgsql_users"],
+    "PGSQL QUERY RULES": ["pgsql_query_rules"],
+    "PGSQL VARIABLES": ["pgsql_variables"],
+    "ADMIN VARIABLES": ["admin_variables"],
+    "PROXYSQL SERVERS": ["proxysql_servers"],
+}
+
+
+def proxysql_cluster_argument_spec():
+    return dict(
+        wait_for_cluster=dict(default=False, type='bool'),
+        cluster_timeout=dict(default=60, type='int'),
+        cluster_poll_interval=dict(default=1, type='float'),
+    )
+
+
+def cluster_pending_peers(cursor, names):
+    """Return the peers whose checksum of names differs from the local one.
+
+    The peers are the ProxySQL Cluster members of runtime_proxysql_servers.
+    A peer without a checksum of a name yet, as a peer that was just added,
+    is pending too. Names without a local runtime checksum, as the families
+    this ProxySQL version does not synchronise, are ignored. The cursor must
+    be a DictCursor.
+    """
+    placeholders = ", ".join(["%s"] * len(names))
+
+    cursor.execute("SELECT name, checksum FROM runtime_checksums_values"
+                   " WHERE name IN ({0})".format(placeholders), names)
+    local = dict((row["name"], row["checksum"]) for row in cursor.fetchall())
+    if not local:
+        return []
+
+    cursor.execute("SELECT hostname, port FROM runtime_proxysql_servers"
+                   " ORDER BY hostname, port")
+    peers = [(row["hostname"], int(row["port"])) for row in cursor.fetchall()]
+    if not peers:
+        return []
+
+    cursor.execute("SELECT hostname, port, name, checksum"
+                   " FROM stats_proxysql_servers_checksums"
+                   " WHERE name IN ({0})".format(placeholders), names)
+    reported = dict(((row["hostname"], int(row["port"]), row["name"]),
+                     row["checksum"])
+                    for row in cursor.fetchall())
+
+    pending = []
+    for hostname, port in peers:
+        for name in sorted(local):
+            checksum = reported.get((hostname, port, name))
+            if checksum != local[name]:
+                pending.append(dict(hostname=hostname, port=port, name=name,
+                                    checksum=checksum, expected=local[name]))
+    return pending
+
+
+def wait_for_cluster(cursor, families, timeout, interval):
+    """Poll the peers until they report the local checksums of families.
+
+    Returns:
+        dict: 'converged', the seconds 'elapsed' until the peers converged
+        or the timeout, and the 'pending' peers.
+    """
+    names = []
+    for family in families:
+        names.extend(CLUSTER_CHECKSUM_NAMES.get(family, []))
+
+    started = time.monotonic()
+    while True:
+        pending = cluster_pending_peers(cursor, names) if names else []
+        elapsed = time.monotonic() - started
+        if not pending or elapsed >= timeout:
+            return dict(converged=not pending, elapsed=round(elapsed, 3),
+                        pending=pending)
+        time.sleep(min(interval, max(timeout - elapsed, 0)))
+
+
 # Imported code from @Aohzan
 # community.mysql/plugins/module_utils/implementations/mysql/hash.py
+_I64 = "./0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+
 def _to64(v, n):
     """Convert a 32-bit integer to a base-64 string"""
-    i64 = (
-        [".", "/"]
-        + [chr(x) for x in range(48, 58)]
-        + [chr(x) for x in range(65, 91)]
-        + [chr(x) for x in range(97, 123)]
-    )
-    result = ""
+    result = []
     while n > 0:
         n -= 1
-        result += i64[v & 0x3F]
+        result.append(_I64[v & 0x3F])
         v >>= 6
-    return result
+    return "".join(result)
 
 
 def _hashlib_sha256(data):
@@ -200,77 +906,85 @@ def _hashlib_sha256(data):
     return sha256(data).digest()
 
 
+def _repeat_digest(digest, length):
+    """Return digest repeated as often as needed, cut to length bytes."""
+    return (digest * (length // len(digest) + 1))[:length]
+
+
+def _round_patterns(byte_sequence_p, byte_sequence_s):
+    """Return the constant part of the input of the 42 distinct rounds.
+
+    Round i hashes P or C, then S if i % 3, then P if i % 7, then C or P,
+    with P first and C last on odd rounds. The pattern repeats every 42
+    rounds, and apart from C each input is constant, so it is built once as
+    (odd, constant) where C is prepended (even) or appended (odd) to it.
+    """
+    patterns = []
+    for i in range(42):
+        odd = bool(i & 1)
+        parts = [byte_sequence_p] if odd else []
+        if i % 3:
+            parts.append(byte_sequence_s)
+        if i % 7:
+            parts.append(byte_sequence_p)
+        if not odd:
+            parts.append(byte_sequence_p)
+        patterns.append((odd, b"".join(parts)))
+    return patterns
+
+
 def _sha256_digest(key, salt, loops):
     """Return a SHA-256 digest of the concatenation of the key, the salt, and the key, repeated as necessary."""
     # https://www.akkadia.org/drepper/SHA-crypt.txt
-    num_bytes = 32
+    # crypt(3) and passlib implement the same algorithm but cap the salt at
+    # 16 characters, while caching_sha2_password uses 20.
     bytes_key = key.encode()
     bytes_salt = salt.encode()
+    key_length = len(bytes_key)
     digest_b = _hashlib_sha256(bytes_key + bytes_salt + bytes_key)
 
-    tmp = bytes_key + bytes_salt
-    for i in range(len(bytes_key), 0, -num_bytes):
-        tmp += digest_b if i > num_bytes else digest_b[:i]
-
-    i = len(bytes_key)
+    parts = [bytes_key, bytes_salt, _repeat_digest(digest_b, key_length)]
+    i = key_length
     while i > 0:
-        tmp += digest_b if (i & 1) != 0 else bytes_key
+        parts.append(digest_b if (i & 1) != 0 else bytes_key)
         i >>= 1
 
-    digest_a = _hashlib_sha256(tmp)
-
-    tmp = b""
-    for i in range(len(bytes_key)):
-        tmp += bytes_key
-
-    digest_dp = _hashlib_sha256(tmp)
+    digest_a = _hashlib_sha256(b"".join(parts))
 
-    byte_sequence_p = b""
-    for i in range(len(bytes_key), 0, -num_bytes):
-        byte_sequence_p += digest_dp if i > num_bytes else digest_dp[:i]
+    digest_dp = _hashlib_sha256(bytes_key * key_length)
+    byte_sequence_p = _repeat_digest(digest_dp, key_length)
 
-    tmp = b""
-    til = 16 + digest_a[0]
-
-    for i in range(til):
-        tmp += bytes_salt
-
-    digest_ds = _hashlib_sha256(tmp)
-
-    byte_sequence_s = b""
-    for i in range(len(bytes_salt), 0, -num_bytes):
-        byte_sequence_s += digest_ds if i > num_bytes else digest_ds[:i]
+    digest_ds = _hashlib_sha256(bytes_salt * (16 + digest_a[0]))
+    byte_sequence_s = _repeat_digest(digest_ds, len(bytes_salt))
 
+    patterns = _round_patterns(byte_sequence_p, byte_sequence_s)
     digest_c = digest_a
 
-    for i in range(loops):
-        tmp = byte_sequence_p if (i & 1) else digest_c
-        if i % 3:
-            tmp += byte_sequence_s
-        if i % 7:
-            tmp += byte_sequence_p
-        tmp += digest_c if (i & 1) else byte_sequence_p
-        digest_c = _hashlib_sha256(tmp)
+    for odd, constant in islice(cycle(patterns), loops):
+        if odd:
+            digest_c = sha256(constant + digest_c).digest()
+        else:
+            digest_c = sha256(digest_c + constant).digest()
 
     inc1, inc2, mod, end = (10, 21, 30, 0)
 
     i = 0
-    tmp = ""
+    result = []
 
     while True:
-        tmp += _to64(
+        result.append(_to64(
             (digest_c[i] << 16)
             | (digest_c[(i + inc1) % mod] << 8)
             | digest_c[(i + inc1 * 2) % mod],
             4,
-        )
+        ))
         i = (i + inc2) % mod
         if i == end:
             break
 
-    tmp += _to64((digest_c[31] << 8) | digest_c[30], 3)
+    result.append(_to64((digest_c[31] << 8) | digest_c[30], 3))
 
-    return tmp
+    return "".join(result)
 
 
 def mysql_sha256_password_hash(password, salt):
@@ -289,9 +1003,223 @@ def mysql_sha256_password_hash_hex(password, salt):
     """Return a MySQL compatible caching_sha2_password hash in hex format."""
     return mysql_sha256_password_hash(password, salt).encode().hex().upper()
 
+
 # End Imported code from @Aohzan
 
 
 def generate_random_salt(length=20):
     salt = urlsafe_b64encode(urandom(length)).decode('utf-8')
     return salt[:length]
+
+
+def mysql_sha256_password_salt(password_hash):
+    """Return the salt of a caching_sha2_password hash in raw or hex format.
+
+    None is returned when password_hash is not such a hash.
+    """
+    if not password_hash:
+        return None
+
+    if len(password_hash) == 140:
+        try:
+            password_hash = bytes.fromhex(password_hash).decode()
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    if len(password_hash) != 70 or not password_hash.startswith("$A$005$"):
+        return None
+
+    return password_hash[7:27]
+
+
+# Below this number of hashes forking a pool costs more than it saves.
+PARALLEL_HASH_MIN_JOBS = 64
+
+
+def _sha256_password_hash_job(job):
+    return mysql_sha256_password_hash(*job)
+
+
+def mysql_sha256_password_hashes(jobs, workers=None):
+    """Return the caching_sha2_password hashes of (password, salt) pairs.
+
+    The hashes are computed on a pool of worker processes when there are
+    enough of them, and in the current process when workers is 1 or when
+    the platform can not fork.
+    """
+    jobs = list(jobs)
+    if workers is None:
+        try:
+            workers = multiprocessing.cpu_count()
+        except NotImplementedError:
+            workers = 1
+
+    if workers > 1 and len(jobs) >= PARALLEL_HASH_MIN_JOBS:
+        try:
+            pool = multiprocessing.get_context('fork').Pool(workers)
+        except (OSError, ValueError):
+            pool = None
+
+        if pool is not None:
+            try:
+                return pool.map(_sha256_password_hash_job, jobs,
+                                chunksize=-(-len(jobs) // (workers * 4)))
+            finally:
+                pool.close()
+                pool.join()
+
+    return [_sha256_password_hash_job(job) for job in jobs]
+
+
+def proxysql_regex_check_argument_spec():
+    return dict(
+        regex_check=dict(type='str', default='off', choices=['off', 'warn', 'fail']),
+        regex_samples=dict(type='list', elements='str'),
+        regex_sample_size=dict(type='int', default=100),
+        regex_budget=dict(type='int', default=100),
+    )
+
+
+# Every sample is matched this many times and the fastest run is kept, so
+# that scheduling noise is not reported as a slow pattern.
+REGEX_CHECK_ROUNDS = 3
+
+# A pattern still matching after this many times its budget for all the
+# samples is stopped and reported.
+REGEX_CHECK_TIMEOUT_FACTOR = 10
+
+# A leading .* that is not anchored is tried at every offset of the query.
+UNANCHORED_WILDCARD = re.compile(r'^\(*\.[*+]')
+
+
+def regex_flags(re_modifiers):
+    # ProxySQL defaults re_modifiers to CASELESS.
+    if re_modifiers is None:
+        re_modifiers = "CASELESS"
+    modifiers = [m.strip().upper() for m in re_modifiers.split(",")]
+    return re.IGNORECASE if "CASELESS" in modifiers else 0
+
+
+def get_regex_samples(cursor, protocol, limit):
+    cursor.execute("SELECT digest_text FROM stats_{0}_query_digest"
+                   " ORDER BY count_star DESC LIMIT %s".format(protocol),
+                   [limit])
+    return [row["digest_text"] for row in cursor.fetchall()
+            if row["digest_text"]]
+
+
+def _regex_cost(pattern, flags, samples):
+    try:
+        compiled = re.compile(pattern, flags)
+    except re.error as e:
+        return dict(error=to_native(e))
+
+    cost = dict(cost=0, sample=None)
+    for sample in samples:
+        fastest = None
+        for dummy in range(REGEX_CHECK_ROUNDS):
+            started = time.perf_counter()
+            compiled.search(sample)
+            elapsed = time.perf_counter() - started
+            if fastest is None or elapsed < fastest:
+                fastest = elapsed
+        if fastest * 1000000 > cost['cost']:
+            cost = dict(cost=int(fastest * 1000000), sample=sample)
+    return cost
+
+
+def _regex_cost_worker(jobs, samples, writer):
+    for pattern, flags in jobs:
+        writer.send(_regex_cost(pattern, flags, samples))
+    writer.close()
+
+
+def regex_costs(jobs, samples, timeout):
+    """Return the compile error or the slowest match, in microseconds, of
+    (pattern, flags) jobs against the samples.
+
+    The patterns are matched in a child process, which is killed when one
+    pattern runs for more than timeout seconds, so that catastrophic
+    backtracking is reported instead of hanging the module. The next
+    patterns are matched in a new child process.
+    """
+    jobs = list(jobs)
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        return [_regex_cost(pattern, flags, samples) for pattern, flags in jobs]
+
+    costs = []
+    while len(costs) < len(jobs):
+        reader, writer = context.Pipe(duplex=False)
+        worker = context.Process(target=_regex_cost_worker,
+                                 args=(jobs[len(costs):], samples, writer))
+        worker.start()
+        writer.close()
+        try:
+            while len(costs) < len(jobs):
+                if not reader.poll(timeout):
+                    costs.append(dict(timeout=timeout))
+                    break
+                costs.append(reader.recv())
+        except EOFError:
+            costs.append(dict(error="the pattern check exited unexpectedly"))
+        finally:
+            worker.terminate()
+            worker.join()
+            reader.close()
+    return costs
+
+
+def check_rule_regexes(module, cursor, rules, protocol="mysql"):
+    """Compile and time the match_digest and match_pattern of rules.
+
+    Depending on regex_check the problems found are returned as warnings,
+    or fail the module before the rules are written.
+    """
+    mode = module.params["regex_check"]
+    if mode == "off":
+        return
+
+    names = []
+    jobs = []
+    for rule in rules:
+        for col in ("match_digest", "match_pattern"):
+            if rule.get(col):
+                names.append("%s of rule_id %s" % (col, rule.get("rule_id")))
+                jobs.append((rule[col], regex_flags(rule.get("re_modifiers"))))
+    if not jobs:
+        return
+
+    if module.params["regex_sample_size"] < 1 or module.params["regex_budget"] < 1:
+        module.fail_json(msg="regex_sample_size and regex_budget must be 1 or greater")
+
+    samples = module.params["regex_samples"]
+    if samples is None:
+        samples = get_regex_samples(cursor, protocol,
+                                    module.params["regex_sample_size"])
+
+    budget = module.params["regex_budget"]
+    timeout = max(1.0, REGEX_CHECK_TIMEOUT_FACTOR * REGEX_CHECK_ROUNDS *
+                  len(samples) * budget / 1000000.0)
+
+    problems = []
+    for name, job, cost in zip(names, jobs, regex_costs(jobs, samples, timeout)):
+        if "error" in cost:
+            problems.append("%s does not compile: %s" % (name, cost["error"]))
+        elif "timeout" in cost:
+            problems.append("%s did not match the samples within %.1f seconds"
+                            % (name, cost["timeout"]))
+        elif cost["cost"] > budget:
+            problems.append("%s takes %dus to match, over the budget of %dus,"
+                            " on: %s" % (name, cost["cost"], budget,
+                                         cost["sample"][:200]))
+        if UNANCHORED_WILDCARD.match(job[0]):
+            problems.append("%s starts with an unanchored wildcard and is"
+                            " tried at every offset of every query" % name)
+
+    if problems and mode == "fail":
+        module.fail_json(msg="query rule patterns failed the regex check: %s"
+                         % "; ".join(problems), regex_problems=problems)
+    for problem in problems:
+        module.warn(problem)
@@ -24,8 +24,8 @@ options:
   hostname:
     description:
       - The ip address at which the mysqld instance can be contacted.
+      - Required unless I(servers) is used.
     type: str
-    required: true
   port:
     description:
       - The port at which the mysqld instance can be contacted.
@@ -93,9 +93,117 @@ options:
   state:
     description:
       - When C(present) - adds the host, when C(absent) - removes the host.
+      - When C(drain) - sets the host C(OFFLINE_SOFT), loads it to runtime
+        and waits until it has no connection in use in
+        C(stats_mysql_connection_pool) before removing it, so that in-flight
+        transactions are not cut. If connections are still in use after
+        I(drain_timeout) the module fails and the host is left
+        C(OFFLINE_SOFT). Requires I(load_to_runtime=true) and
+        I(defer_flush=false).
     type: str
-    choices: [ "present", "absent" ]
+    choices: [ "present", "absent", "drain" ]
     default: present
+  drain_timeout:
+    description:
+      - Seconds to wait for the connections in use to close with
+        I(state=drain).
+    type: int
+    default: 300
+    version_added: '1.9.0'
+  drain_poll_interval:
+    description:
+      - Seconds between two reads of C(stats_mysql_connection_pool) with
+        I(state=drain).
+      - The interval doubles, up to I(drain_max_poll_interval), whenever the
+        number of connections in use did not go down since the previous
+        read, and is reset when it did.
+    type: float
+    default: 1.0
+    version_added: '1.9.0'
+  drain_max_poll_interval:
+    description:
+      - The longest interval between two reads of
+        C(stats_mysql_connection_pool) with I(state=drain).
+    type: float
+    default: 10.0
+    version_added: '1.9.0'
+  servers:
+    description:
+      - A list of servers to manage in a single run.
+      - The C(mysql_servers) table is read once, the required inserts,
+        updates and deletes are computed in memory and written in one batch,
+        followed by a single save to disk and load to runtime, so the
+        runtime sees all the changes at once.
+      - Updates that only change I(status) or I(weight), as done to drain or
+        rebalance servers, are written grouped by value and returned in
+        I(servers_reweighted).
+      - I(hostgroup_id) and I(port) default to the value of the module
+        option of the same name.
+      - Options that are omitted from an item are not managed, their current
+        value is left untouched.
+      - With I(state=absent) the listed servers are removed, with
+        I(state=drain) they are drained together and then removed.
+      - Mutually exclusive with I(hostname) and the other single server
+        options.
+    type: list
+    elements: dict
+    version_added: '1.9.0'
+    suboptions:
+      hostgroup_id:
+        description:
+          - The hostgroup of the server.
+        type: int
+      hostname:
+        description:
+          - The ip address at which the mysqld instance can be contacted.
+        type: str
+        required: true
+      port:
+        description:
+          - The port at which the mysqld instance can be contacted.
+        type: int
+      status:
+        description:
+          - See the module option.
+        type: str
+        choices: [ "ONLINE", "OFFLINE_SOFT", "OFFLINE_HARD"]
+      weight:
+        description:
+          - See the module option.
+        type: int
+      compression:
+        description:
+          - See the module option.
+        type: int
+      max_connections:
+        description:
+          - See the module option.
+        type: int
+      max_replication_lag:
+        description:
+          - See the module option.
+        type: int
+      use_ssl:
+        description:
+          - See the module option.
+        type: bool
+      max_latency_ms:
+        description:
+          - See the module option.
+        type: int
+      comment:
+        description:
+          - See the module option.
+        type: str
+  purge:
+    description:
+      - Only used with I(servers) and I(state=present).
+      - If C(True), servers that exist in C(mysql_servers) but are not listed
+        in I(servers) are deleted from the hostgroups that appear in
+        I(servers). Other hostgroups are left untouched.
+    type: bool
+    default: false
+    version_added: '1.9.0'
 extends_documentation_fragment:
 - community.proxysql.proxysql.managing_config
 - community.proxysql.proxysql.connectivity
@@ -129,6 +237,37 @@ EXAMPLES = '''
     config_file: '~/proxysql.cnf'
     hostname: 'mysql02'
     state: absent
+
+# This example drains a server before removing it, waiting up to ten minutes
+# for the transactions in flight to complete.
+
+- name: Drain and remove a server
+  community.proxysql.proxysql_backend_servers:
+    login_user: 'admin'
+    login_password: 'admin'
+    hostname: 'mysql02'
+    hostgroup_id: 2
+    state: drain
+    drain_timeout: 600
+
+# This example sets the servers of the writer and reader hostgroups in a single
+# task, drains mysql03 and removes the servers of these hostgroups that are not
+# listed. The servers are loaded to runtime once.
+
+- name: Manage the servers of hostgroups 1 and 2
+  community.proxysql.proxysql_backend_servers:
+    login_user: 'admin'
+    login_password: 'admin'
+    servers:
+      - hostname: mysql01
+        hostgroup_id: 1
+      - hostname: mysql02
+        hostgroup_id: 2
+        weight: 100
+      - hostname: mysql03
+        hostgroup_id: 2
+        status: OFFLINE_SOFT
+    purge: true
 '''
 
 RETURN = '''
@@ -156,210 +295,246 @@ stdout:
         },
         "state": "present"
     }
+conn_used:
+    description: The connections still in use when the drain ended.
+    returned: When I(state=drain) and a server was drained.
+    type: int
+    sample: 0
+    version_added: '1.9.0'
+drain_time:
+    description: The seconds waited for the connections in use to close.
+    returned: When I(state=drain) and a server was drained.
+    type: float
+    sample: 12.417
+    version_added: '1.9.0'
+servers_added:
+    description: The servers added when I(servers) is used.
+    returned: When I(servers) is used.
+    type: list
+    elements: dict
+    sample: [{"hostgroup_id": 1, "hostname": "mysql01", "port": 3306}]
+    version_added: '1.9.0'
+servers_updated:
+    description:
+      - The servers updated when I(servers) is used, apart from those in
+        I(servers_reweighted).
+    returned: When I(servers) is used.
+    type: list
+    elements: dict
+    sample: [{"hostgroup_id": 2, "hostname": "mysql02", "port": 3306}]
+    version_added: '1.9.0'
+servers_reweighted:
+    description:
+      - The servers of which only I(status) or I(weight) was updated when
+        I(servers) is used.
+    returned: When I(servers) is used.
+    type: list
+    elements: dict
+    sample: [{"hostgroup_id": 2, "hostname": "mysql03", "port": 3306}]
+    version_added: '1.9.0'
+servers_deleted:
+    description: The servers deleted when I(servers) is used.
+    returned: When I(servers) is used.
+    type: list
+    elements: dict
+    sample: [{"hostgroup_id": 2, "hostname": "mysql04", "port": 3306}]
+    version_added: '1.9.0'
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
     load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
+    normalize_value,
+    row_key,
 )
 from ansible.module_utils._text import to_native
+import time
 
 # ===========================================
 # proxysql module specific support methods.
 #
 
 
-def perform_checks(module):
-    if module.params["port"] < 0 \
-       or module.params["port"] > 65535:
+def perform_checks(module, params=None):
+    params = params or module.params
+
+    if params["port"] < 0 \
+       or params["port"] > 65535:
         module.fail_json(
             msg="port must be a valid unix port number (0-65535)"
         )
 
-    if module.params["compression"]:
-        if module.params["compression"] < 0 \
-           or module.params["compression"] > 102400:
+    if params["compression"]:
+        if params["compression"] < 0 \
+           or params["compression"] > 102400:
             module.fail_json(
                 msg="compression must be set between 0 and 102400"
             )
 
-    if module.params["max_replication_lag"]:
-        if module.params["max_replication_lag"] < 0 \
-           or module.params["max_replication_lag"] > 126144000:
+    if params["max_replication_lag"]:
+        if params["max_replication_lag"] < 0 \
+           or params["max_replication_lag"] > 126144000:
             module.fail_json(
                 msg="max_replication_lag must be set between 0 and 102400"
             )
 
+    if module.params["state"] == "drain":
+        if not module.params["load_to_runtime"] or module.params["defer_flush"]:
+            module.fail_json(
+                msg="state=drain loads the servers to runtime, it requires"
+                    " load_to_runtime=true and defer_flush=false"
+            )
+        if module.params["drain_poll_interval"] <= 0 \
+           or module.params["drain_max_poll_interval"] < module.params["drain_poll_interval"]:
+            module.fail_json(
+                msg="drain_poll_interval must be greater than 0 and not"
+                    " greater than drain_max_poll_interval"
+            )
 
-class ProxySQLServer(object):
 
-    def __init__(self, module):
-        self.state = module.params["state"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+SERVER_KEY_COLUMNS = ["hostgroup_id", "hostname", "port"]
 
-        self.hostgroup_id = module.params["hostgroup_id"]
-        self.hostname = module.params["hostname"]
-        self.port = module.params["port"]
+SERVER_CONFIG_KEYS = ["status",
+                      "weight",
+                      "compression",
+                      "max_connections",
+                      "max_replication_lag",
+                      "use_ssl",
+                      "max_latency_ms",
+                      "comment"]
 
-        config_data_keys = ["status",
-                            "weight",
-                            "compression",
-                            "max_connections",
-                            "max_replication_lag",
-                            "use_ssl",
-                            "max_latency_ms",
-                            "comment"]
+# Updates touching only these columns are cheap for the runtime and are
+# written grouped by value, as drains and rebalances produce many of them.
+SERVER_LIGHT_KEYS = frozenset(["status", "weight"])
 
-        self.config_data = dict((k, module.params[k])
-                                for k in config_data_keys)
-
-    def check_server_config_exists(self, cursor):
-        query_string = \
-            """SELECT count(*) AS `host_count`
-               FROM mysql_servers
-               WHERE hostgroup_id = %s
-                 AND hostname = %s
-                 AND port = %s"""
-
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['host_count']) > 0)
-
-    def check_server_config(self, cursor):
-        query_string = \
-            """SELECT count(*) AS `host_count`
-               FROM mysql_servers
-               WHERE hostgroup_id = %s
-                 AND hostname = %s
-                 AND port = %s"""
-
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += "\n  AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-
-        if isinstance(check_count, tuple):
-            return int(check_count[0]) > 0
-
-        return (int(check_count['host_count']) > 0)
 
-    def get_server_config(self, cursor):
-        query_string = \
-            """SELECT *
-               FROM mysql_servers
-               WHERE hostgroup_id = %s
-                 AND hostname = %s
-                 AND port = %s"""
-
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        cursor.execute(query_string, query_data)
-        server = cursor.fetchone()
-        return server
-
-    def create_server_config(self, cursor):
-        query_string = \
-            """INSERT INTO mysql_servers (
-               hostgroup_id,
-               hostname,
-               port"""
-
-        cols = 3
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                query_string += ",\n" + col
-
-        query_string += \
-            (")\n" +
-             "VALUES (" +
-             "%s ," * cols)
-
-        query_string = query_string[:-2]
-        query_string += ")"
-
-        cursor.execute(query_string, query_data)
-        return True
+def get_conn_used(cursor, servers):
+    condition = " OR ".join(
+        ["(hostgroup = %s AND srv_host = %s AND srv_port = %s)"] * len(servers))
+    query_data = [server[col] for server in servers
+                  for col in SERVER_KEY_COLUMNS]
 
-    def update_server_config(self, cursor):
-        query_string = """UPDATE mysql_servers"""
+    cursor.execute("SELECT COALESCE(SUM(ConnUsed), 0) AS conn_used"
+                   " FROM stats_mysql_connection_pool"
+                   " WHERE " + condition, query_data)
+    return int(cursor.fetchone()["conn_used"])
 
-        cols = 0
-        query_data = []
 
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                if cols == 1:
-                    query_string += "\nSET " + col + "= %s,"
-                else:
-                    query_string += "\n    " + col + " = %s,"
+def wait_for_drain(cursor, servers, timeout, poll_interval, max_poll_interval):
+    """Poll the connection pool until servers have no connection in use.
 
-        query_string = query_string[:-1]
-        query_string += ("\nWHERE hostgroup_id = %s\n  AND hostname = %s" +
-                         "\n  AND port = %s")
+    The poll interval doubles, up to max_poll_interval, whenever the number
+    of connections in use did not go down since the previous poll, and is
+    reset to poll_interval when it did.
 
-        query_data.append(self.hostgroup_id)
-        query_data.append(self.hostname)
-        query_data.append(self.port)
+    Returns:
+        tuple: the connections still in use and the seconds waited.
+    """
+    start = time.monotonic()
+    interval = poll_interval
+    previous = None
 
-        cursor.execute(query_string, query_data)
-        return True
+    while True:
+        conn_used = get_conn_used(cursor, servers)
+        waited = time.monotonic() - start
+        if conn_used == 0 or waited >= timeout:
+            return conn_used, waited
+
+        if previous is not None and conn_used >= previous:
+            interval = min(interval * 2, max_poll_interval)
+        else:
+            interval = poll_interval
+        previous = conn_used
+        time.sleep(min(interval, timeout - waited))
+
+
+def drain_servers(cursor, changeset, drain):
+    """Set the servers about to be deleted OFFLINE_SOFT, load them to
+    runtime and wait until they have no connection in use.
+    """
+    offline_soft = dict(status="OFFLINE_SOFT")
+    apply_changeset(cursor, "mysql_servers", SERVER_KEY_COLUMNS,
+                    dict(insert=[], delete=[],
+                         update=[(key, offline_soft)
+                                 for key in changeset['delete']]))
+    load_config_to_runtime(cursor, "SERVERS")
+    return wait_for_drain(cursor, changeset['delete'], **drain)
+
+
+def drain_result(result, conn_used, waited):
+    result['conn_used'] = conn_used
+    result['drain_time'] = round(waited, 3)
+    if conn_used:
+        result['msg'] = ("%d connections were still in use after %d seconds,"
+                         " the servers were left OFFLINE_SOFT" %
+                         (conn_used, waited))
+
+
+def server_key(server):
+    return dict(hostgroup_id=int(server["hostgroup_id"]),
+                hostname=server["hostname"],
+                port=int(server["port"]))
+
+
+class ProxySQLServer(object):
+
+    def __init__(self, module):
+        self.state = module.params["state"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
+        self.drain = dict(timeout=module.params["drain_timeout"],
+                          poll_interval=module.params["drain_poll_interval"],
+                          max_poll_interval=module.params["drain_max_poll_interval"])
+
+        self.hostgroup_id = module.params["hostgroup_id"]
+        self.hostname = module.params["hostname"]
+        self.port = module.params["port"]
 
-    def delete_server_config(self, cursor):
-        query_string = \
-            """DELETE FROM mysql_servers
-               WHERE hostgroup_id = %s
-                 AND hostname = %s
-                 AND port = %s"""
+        self.key_data = dict((k, module.params[k])
+                             for k in SERVER_KEY_COLUMNS)
 
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
+        self.config_data = dict((k, module.params[k])
+                                for k in SERVER_CONFIG_KEYS)
+
+    def get_servers_config(self, cursor):
+        return fetch_table(cursor, "mysql_servers", SERVER_KEY_COLUMNS,
+                           match=self.key_data)
 
-        cursor.execute(query_string, query_data)
+    def get_server_config(self, cursor):
+        servers = self.get_servers_config(cursor)
+        return servers.get(row_key(self.key_data, SERVER_KEY_COLUMNS))
+
+    def compute_changes(self, current_servers):
+        if self.state == "present":
+            server = dict(self.key_data)
+            server.update(self.config_data)
+            return compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                     present=[server])
+        return compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                 absent=[self.key_data])
+
+    def apply_server_config(self, cursor, changeset):
+        apply_changeset(cursor, "mysql_servers", SERVER_KEY_COLUMNS,
+                        changeset)
         return True
 
     def manage_config(self, cursor, state):
         if state:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "SERVERS")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "SERVERS")
+            flush_config(cursor, self.params, self.flush_state, "SERVERS")
 
-    def create_server(self, check_mode, result, cursor):
+    def create_server(self, check_mode, result, cursor, changeset):
         if not check_mode:
             result['changed'] = \
-                self.create_server_config(cursor)
+                self.apply_server_config(cursor, changeset)
             result['msg'] = "Added server to mysql_hosts"
             result['server'] = \
                 self.get_server_config(cursor)
@@ -371,13 +546,13 @@ class ProxySQLServer(object):
                              " mysql_hosts, however check_mode" +
                              " is enabled.")
 
-    def update_server(self, check_mode, result, cursor):
+    def update_server(self, check_mode, result, cursor, changeset, server):
         if not check_mode:
             result['changed'] = \
-                self.update_server_config(cursor)
+                self.apply_server_config(cursor, changeset)
             result['msg'] = "Updated server in mysql_hosts"
             result['server'] = \
-                self.get_server_config(cursor)
+                merge_changes(server, changeset['update'][0][1])
             self.manage_config(cursor,
                                result['changed'])
         else:
@@ -386,12 +561,27 @@ class ProxySQLServer(object):
                              " mysql_hosts, however check_mode" +
                              " is enabled.")
 
-    def delete_server(self, check_mode, result, cursor):
+    def drain_server(self, check_mode, result, cursor, changeset, server):
         if not check_mode:
-            result['server'] = \
-                self.get_server_config(cursor)
+            result['server'] = server
+            result['changed'] = True
+            drain_result(result, *drain_servers(cursor, changeset, self.drain))
+            if not result['conn_used']:
+                self.apply_server_config(cursor, changeset)
+                result['msg'] = "Drained and deleted server from mysql_hosts"
+                self.manage_config(cursor,
+                                   result['changed'])
+        else:
+            result['changed'] = True
+            result['msg'] = ("Server would have been drained and deleted" +
+                             " from mysql_hosts, however check_mode is" +
+                             " enabled.")
+
+    def delete_server(self, check_mode, result, cursor, changeset, server):
+        if not check_mode:
+            result['server'] = server
             result['changed'] = \
-                self.delete_server_config(cursor)
+                self.apply_server_config(cursor, changeset)
             result['msg'] = "Deleted server from mysql_hosts"
             self.manage_config(cursor,
                                result['changed'])
@@ -401,6 +591,109 @@ class ProxySQLServer(object):
                              " mysql_hosts, however check_mode is" +
                              " enabled.")
 
+
+class ProxySQLServerSet(object):
+
+    def __init__(self, module):
+        self.state = module.params["state"]
+        self.purge = module.params["purge"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
+        self.drain = dict(timeout=module.params["drain_timeout"],
+                          poll_interval=module.params["drain_poll_interval"],
+                          max_poll_interval=module.params["drain_max_poll_interval"])
+
+        self.servers = dict()
+
+        for server in module.params["servers"]:
+            config_data = dict(server)
+            for col in ["hostgroup_id", "port"]:
+                if config_data[col] is None:
+                    config_data[col] = module.params[col]
+            perform_checks(module, config_data)
+
+            key = row_key(config_data, SERVER_KEY_COLUMNS)
+            if key in self.servers:
+                module.fail_json(
+                    msg="server %s:%s in hostgroup %s is listed more than"
+                        " once in servers" % (config_data["hostname"],
+                                              config_data["port"],
+                                              config_data["hostgroup_id"])
+                )
+            self.servers[key] = config_data
+
+    def get_servers_config(self, cursor):
+        return fetch_table(cursor, "mysql_servers", SERVER_KEY_COLUMNS)
+
+    def compute_changes(self, current_servers):
+        servers = list(self.servers.values())
+
+        if self.state in ("absent", "drain"):
+            return compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                     absent=servers)
+
+        changeset = compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                      present=servers)
+        if self.purge:
+            # Only the hostgroups that are listed are purged.
+            hostgroups = set(normalize_value(server["hostgroup_id"])
+                             for server in servers)
+            changeset['delete'] = [
+                dict((col, server[col]) for col in SERVER_KEY_COLUMNS)
+                for key, server in current_servers.items()
+                if key not in self.servers and
+                normalize_value(server["hostgroup_id"]) in hostgroups
+            ]
+        return changeset
+
+    def manage_config(self, cursor, state):
+        if state:
+            flush_config(cursor, self.params, self.flush_state, "SERVERS")
+
+    def apply_servers(self, check_mode, result, cursor):
+        current_servers = self.get_servers_config(cursor)
+        changeset = self.compute_changes(current_servers)
+
+        light_updates = [(key, changes) for key, changes in changeset['update']
+                         if SERVER_LIGHT_KEYS.issuperset(changes)]
+        other_updates = [(key, changes) for key, changes in changeset['update']
+                         if not SERVER_LIGHT_KEYS.issuperset(changes)]
+
+        result['servers_added'] = [server_key(server)
+                                   for server in changeset['insert']]
+        result['servers_updated'] = [server_key(key)
+                                     for key, changes in other_updates]
+        result['servers_reweighted'] = [server_key(key)
+                                        for key, changes in light_updates]
+        result['servers_deleted'] = [server_key(key)
+                                     for key in changeset['delete']]
+        result['changed'] = any(changeset.values())
+
+        if not result['changed']:
+            result['msg'] = ("The servers in mysql_servers don't need to" +
+                             " be updated.")
+        elif check_mode:
+            result['msg'] = ("Servers would have been updated in" +
+                             " mysql_servers, however check_mode" +
+                             " is enabled.")
+        else:
+            if self.state == "drain":
+                drain_result(result,
+                             *drain_servers(cursor, changeset, self.drain))
+                if result['conn_used']:
+                    return
+            apply_changeset(cursor, "mysql_servers", SERVER_KEY_COLUMNS,
+                            dict(changeset, update=other_updates),
+                            current=current_servers)
+            apply_changeset(cursor, "mysql_servers", SERVER_KEY_COLUMNS,
+                            dict(insert=[], update=light_updates, delete=[]))
+            if self.state == "drain":
+                result['msg'] = "Drained and deleted servers from mysql_servers"
+            else:
+                result['msg'] = "Updated servers in mysql_servers"
+            self.manage_config(cursor,
+                               result['changed'])
+
 # ===========================================
 # Module execution.
 #
@@ -410,7 +703,7 @@ def main():
     argument_spec = proxysql_common_argument_spec()
     argument_spec.update(
         hostgroup_id=dict(default=0, type='int'),
-        hostname=dict(required=True, type='str'),
+        hostname=dict(type='str'),
         port=dict(default=3306, type='int'),
         status=dict(choices=['ONLINE',
                              'OFFLINE_SOFT',
@@ -423,14 +716,39 @@ def main():
         max_latency_ms=dict(type='int'),
         comment=dict(default='', type='str'),
         state=dict(default='present', choices=['present',
-                                               'absent']),
+                                               'absent',
+                                               'drain']),
+        drain_timeout=dict(default=300, type='int'),
+        drain_poll_interval=dict(default=1.0, type='float'),
+        drain_max_poll_interval=dict(default=10.0, type='float'),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool'),
+        servers=dict(type='list', elements='dict', options=dict(
+            hostgroup_id=dict(type='int'),
+            hostname=dict(required=True, type='str'),
+            port=dict(type='int'),
+            status=dict(choices=['ONLINE',
+                                 'OFFLINE_SOFT',
+                                 'OFFLINE_HARD']),
+            weight=dict(type='int'),
+            compression=dict(type='int'),
+            max_connections=dict(type='int'),
+            max_replication_lag=dict(type='int'),
+            use_ssl=dict(type='bool'),
+            max_latency_ms=dict(type='int'),
+            comment=dict(type='str'),
+        )),
+        purge=dict(default=False, type='bool')
     )
 
     module = AnsibleModule(
         supports_check_mode=True,
-        argument_spec=argument_spec
+        argument_spec=argument_spec,
+        required_one_of=[('hostname', 'servers')],
+        mutually_exclusive=[('servers', k) for k in
+                            ["hostname"] + SERVER_CONFIG_KEYS
+                            if k != "comment"]
     )
 
     perform_checks(module)
@@ -451,41 +769,88 @@ def main():
             msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
         )
 
-    proxysql_server = ProxySQLServer(module)
     result = {}
 
+    if module.params["servers"] is not None:
+        proxysql_server_set = ProxySQLServerSet(module)
+        result['state'] = proxysql_server_set.state
+        try:
+            proxysql_server_set.apply_servers(module.check_mode,
+                                              result,
+                                              cursor)
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to modify servers.. %s" % to_native(e)
+            )
+        if result.get('conn_used'):
+            module.fail_json(**result)
+        module.exit_json(**result)
+
+    proxysql_server = ProxySQLServer(module)
+
     result['state'] = proxysql_server.state
     if proxysql_server.hostname:
         result['hostname'] = proxysql_server.hostname
 
+    try:
+        current_servers = proxysql_server.get_servers_config(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read servers.. %s" % to_native(e)
+        )
+
+    server = current_servers.get(row_key(proxysql_server.key_data,
+                                         SERVER_KEY_COLUMNS))
+    changeset = proxysql_server.compute_changes(current_servers)
+
     if proxysql_server.state == "present":
         try:
-            if not proxysql_server.check_server_config(cursor):
-                if not proxysql_server.check_server_config_exists(cursor):
-                    proxysql_server.create_server(module.check_mode,
-                                                  result,
-                                                  cursor)
-                else:
-                    proxysql_server.update_server(module.check_mode,
-                                                  result,
-                                                  cursor)
+            if changeset['insert']:
+                proxysql_server.create_server(module.check_mode,
+                                              result,
+                                              cursor,
+                                              changeset)
+            elif changeset['update']:
+                proxysql_server.update_server(module.check_mode,
+                                              result,
+                                              cursor,
+                                              changeset,
+                                              server)
             else:
                 result['changed'] = False
                 result['msg'] = ("The server already exists in mysql_hosts" +
                                  " and doesn't need to be updated.")
-                result['server'] = \
-                    proxysql_server.get_server_config(cursor)
+                result['server'] = server
         except mysql_driver.Error as e:
             module.fail_json(
                 msg="unable to modify server.. %s" % to_native(e)
             )
 
+    elif proxysql_server.state == "drain":
+        try:
+            if changeset['delete']:
+                proxysql_server.drain_server(module.check_mode,
+                                             result,
+                                             cursor,
+                                             changeset,
+                                             server)
+            else:
+                result['changed'] = False
+                result['msg'] = ("The server is already absent from the" +
+                                 " mysql_hosts memory configuration")
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to drain server.. %s" % to_native(e)
+            )
+
     elif proxysql_server.state == "absent":
         try:
-            if proxysql_server.check_server_config_exists(cursor):
+            if changeset['delete']:
                 proxysql_server.delete_server(module.check_mode,
                                               result,
-                                              cursor)
+                                              cursor,
+                                              changeset,
+                                              server)
             else:
                 result['changed'] = False
                 result['msg'] = ("The server is already absent from the" +
@@ -495,6 +860,9 @@ def main():
                 msg="unable to remove server.. %s" % to_native(e)
             )
 
+    if result.get('conn_used'):
+        module.fail_json(**result)
+
     module.exit_json(**result)
 
 
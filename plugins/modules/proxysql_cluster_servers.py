@@ -0,0 +1,305 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: proxysql_cluster_servers
+author: "Ansible ProxySQL community (@ansible-collections)"
+short_description: Manages the members of a ProxySQL Cluster
+description:
+   - The M(community.proxysql.proxysql_cluster_servers) module adds, updates
+     or removes the ProxySQL Cluster peers of the C(proxysql_servers) table.
+   - The table is read once, the required inserts, updates and deletes are
+     computed in memory and written in one batch, followed by a single save
+     to disk and load to runtime. A scaling event therefore changes the
+     C(proxysql_servers) checksum once, and the peers synchronise once.
+version_added: '1.9.0'
+options:
+  servers:
+    description:
+      - The ProxySQL Cluster peers to manage.
+      - Options that are omitted from an item are not managed, their current
+        value is left untouched.
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      hostname:
+        description:
+          - The address of the admin interface of the peer.
+        type: str
+        required: true
+      port:
+        description:
+          - The port of the admin interface of the peer.
+        type: int
+        default: 6032
+      weight:
+        description:
+          - The weight of the peer. Not used by ProxySQL yet.
+        type: int
+      comment:
+        description:
+          - Text field that can be used for any purposes defined by the user.
+        type: str
+  state:
+    description:
+      - When C(present) - adds or updates the listed peers, when C(absent) -
+        removes them.
+    type: str
+    choices: [ "present", "absent" ]
+    default: present
+  purge:
+    description:
+      - Only used with I(state=present).
+      - If C(True), the peers in C(proxysql_servers) that are not listed in
+        I(servers) are removed.
+    type: bool
+    default: false
+extends_documentation_fragment:
+- community.proxysql.proxysql.managing_config
+- community.proxysql.proxysql.connectivity
+- community.proxysql.proxysql.cluster
+notes:
+- Supports C(check_mode).
+'''
+
+EXAMPLES = '''
+---
+# This example sets the members of the cluster, and removes the other peers,
+# with a single load to runtime.
+
+- name: Set the ProxySQL Cluster members
+  community.proxysql.proxysql_cluster_servers:
+    login_user: 'admin'
+    login_password: 'admin'
+    servers:
+      - hostname: proxysql01
+      - hostname: proxysql02
+      - hostname: proxysql03
+        weight: 10
+    purge: true
+
+# This example adds a peer started by the autoscaler and waits until every
+# peer has the new membership.
+
+- name: Add a ProxySQL Cluster member
+  community.proxysql.proxysql_cluster_servers:
+    login_user: 'admin'
+    login_password: 'admin'
+    servers:
+      - hostname: proxysql04
+        comment: autoscaled
+    wait_for_cluster: true
+  run_once: true
+
+- name: Remove a ProxySQL Cluster member
+  community.proxysql.proxysql_cluster_servers:
+    login_user: 'admin'
+    login_password: 'admin'
+    servers:
+      - hostname: proxysql04
+    state: absent
+'''
+
+RETURN = '''
+servers_added:
+    description: The peers added.
+    returned: always
+    type: list
+    elements: dict
+    sample: [{"hostname": "proxysql04", "port": 6032}]
+servers_updated:
+    description: The peers updated.
+    returned: always
+    type: list
+    elements: dict
+    sample: [{"hostname": "proxysql02", "port": 6032}]
+servers_deleted:
+    description: The peers removed.
+    returned: always
+    type: list
+    elements: dict
+    sample: [{"hostname": "proxysql03", "port": 6032}]
+cluster:
+    description:
+      - Whether the peers converged, the seconds they took to converge, and
+        the peers that still report another checksum.
+    returned: When I(wait_for_cluster=true) and the servers were loaded to runtime.
+    type: dict
+    sample:
+        converged: true
+        elapsed: 1.527
+        pending: []
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    mysql_connect,
+    mysql_driver,
+    proxysql_cluster_argument_spec,
+    proxysql_common_argument_spec,
+    row_key,
+    deferred_flush_path,
+    flush_config,
+    wait_for_cluster,
+)
+from ansible.module_utils._text import to_native
+
+# ===========================================
+# proxysql module specific support methods.
+#
+
+SERVER_KEY_COLUMNS = ["hostname", "port"]
+
+
+def server_key(server):
+    return dict(hostname=server["hostname"], port=int(server["port"]))
+
+
+class ProxySQLClusterServers(object):
+
+    def __init__(self, module):
+        self.state = module.params["state"]
+        self.purge = module.params["purge"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
+        self.wait_for_cluster = module.params["wait_for_cluster"]
+        self.cluster_timeout = module.params["cluster_timeout"]
+        self.cluster_poll_interval = module.params["cluster_poll_interval"]
+
+        self.servers = dict()
+
+        for server in module.params["servers"]:
+            key = row_key(server, SERVER_KEY_COLUMNS)
+            if key in self.servers:
+                module.fail_json(
+                    msg="server %s:%s is listed more than once in servers" %
+                        (server["hostname"], server["port"])
+                )
+            self.servers[key] = dict(server)
+
+    def get_servers_config(self, cursor):
+        return fetch_table(cursor, "proxysql_servers", SERVER_KEY_COLUMNS)
+
+    def compute_changes(self, current_servers):
+        servers = list(self.servers.values())
+
+        if self.state == "absent":
+            return compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                     absent=servers)
+        return compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                 present=servers, purge=self.purge)
+
+    def manage_config(self, cursor, state):
+        if state:
+            return flush_config(cursor, self.params, self.flush_state,
+                                "SERVERS", family="PROXYSQL")
+        return False
+
+    def apply_servers(self, check_mode, result, cursor):
+        current_servers = self.get_servers_config(cursor)
+        changeset = self.compute_changes(current_servers)
+
+        result['servers_added'] = [server_key(server)
+                                   for server in changeset['insert']]
+        result['servers_updated'] = [server_key(key)
+                                     for key, changes in changeset['update']]
+        result['servers_deleted'] = [server_key(key)
+                                     for key in changeset['delete']]
+        result['changed'] = any(changeset.values())
+
+        if not result['changed']:
+            result['msg'] = ("The servers in proxysql_servers don't need to" +
+                             " be updated.")
+        elif check_mode:
+            result['msg'] = ("Servers would have been updated in" +
+                             " proxysql_servers, however check_mode" +
+                             " is enabled.")
+        else:
+            apply_changeset(cursor, "proxysql_servers", SERVER_KEY_COLUMNS,
+                            changeset, current=current_servers)
+            result['msg'] = "Updated servers in proxysql_servers"
+            loaded = self.manage_config(cursor, result['changed'])
+            if loaded and self.wait_for_cluster:
+                result['cluster'] = wait_for_cluster(cursor, ["PROXYSQL SERVERS"],
+                                                     self.cluster_timeout,
+                                                     self.cluster_poll_interval)
+
+# ===========================================
+# Module execution.
+#
+
+
+def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        servers=dict(required=True, type='list', elements='dict', options=dict(
+            hostname=dict(required=True, type='str'),
+            port=dict(default=6032, type='int'),
+            weight=dict(type='int'),
+            comment=dict(type='str'),
+        )),
+        state=dict(default='present', choices=['present',
+                                               'absent']),
+        purge=dict(default=False, type='bool'),
+        save_to_disk=dict(default=True, type='bool'),
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool'),
+    )
+    argument_spec.update(proxysql_cluster_argument_spec())
+
+    module = AnsibleModule(
+        supports_check_mode=True,
+        argument_spec=argument_spec
+    )
+
+    if module.params["cluster_timeout"] < 0:
+        module.fail_json(msg="cluster_timeout must be 0 or greater")
+    if module.params["cluster_poll_interval"] <= 0:
+        module.fail_json(msg="cluster_poll_interval must be greater than 0")
+
+    login_user = module.params["login_user"]
+    login_password = module.params["login_password"]
+    config_file = module.params["config_file"]
+
+    cursor = None
+    try:
+        cursor, db_conn, version = mysql_connect(module,
+                                                 login_user,
+                                                 login_password,
+                                                 config_file,
+                                                 cursor_class='DictCursor')
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
+        )
+
+    cluster_servers = ProxySQLClusterServers(module)
+    result = {}
+
+    try:
+        cluster_servers.apply_servers(module.check_mode, result, cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to modify servers.. %s" % to_native(e)
+        )
+
+    if result.get('cluster') and not result['cluster']['converged']:
+        result['msg'] = ("The ProxySQL Cluster peers did not converge within"
+                         " %s seconds" % cluster_servers.cluster_timeout)
+        module.fail_json(**result)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: proxysql_connection_pool_info
+author: "Ansible ProxySQL community (@ansible-collections)"
+short_description: Gathers the connection pool statistics of proxysql backends
+description:
+   - Reads C(stats_mysql_connection_pool) or C(stats_pgsql_connection_pool)
+     for the requested hostgroups only.
+   - When I(interval) is set, a second snapshot is taken I(interval) seconds
+     after the first one and the rates of the counters are returned per
+     backend.
+version_added: '1.9.0'
+options:
+  protocol:
+    description:
+      - Read the connection pool of the C(mysql) or the C(pgsql) backends.
+    type: str
+    choices: [ "mysql", "pgsql" ]
+    default: mysql
+  hostgroups:
+    description:
+      - The hostgroups to read. All hostgroups are read if omitted.
+    type: list
+    elements: int
+  interval:
+    description:
+      - Seconds between the two snapshots used to compute the rates.
+      - Only one snapshot is taken and no rates are returned when C(0).
+    type: float
+    default: 0
+extends_documentation_fragment:
+  - community.proxysql.proxysql.connectivity
+notes:
+  - Supports C(check_mode).
+'''
+
+EXAMPLES = '''
+- name: Read the connection pool of the writer hostgroup
+  community.proxysql.proxysql_connection_pool_info:
+    login_user: admin
+    login_password: admin
+    hostgroups: [1]
+
+- name: Measure the load of the backends over ten seconds
+  community.proxysql.proxysql_connection_pool_info:
+    login_user: admin
+    login_password: admin
+    interval: 10
+  register: pool
+
+- name: Fail when a backend reports connection errors
+  ansible.builtin.assert:
+    that: item.rates.conn_err_per_sec == 0
+  loop: "{{ pool.servers }}"
+  loop_control:
+    label: "{{ item.srv_host }}:{{ item.srv_port }}"
+'''
+
+RETURN = '''
+servers:
+    description:
+      - One entry per backend and hostgroup, with the columns of the
+        connection pool table. The counters are returned as integers.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - hostgroup: 1
+          srv_host: mysql01
+          srv_port: 3306
+          status: ONLINE
+          ConnUsed: 4
+          ConnFree: 6
+          ConnOK: 10
+          ConnERR: 0
+          MaxConnUsed: 10
+          Queries: 84120
+          Bytes_data_sent: 10293811
+          Bytes_data_recv: 290339281
+          Latency_us: 212
+          rates:
+            queries_per_sec: 1240.5
+            bytes_sent_per_sec: 151802.3
+            bytes_recv_per_sec: 4282187.9
+            conn_ok_per_sec: 0.0
+            conn_err_per_sec: 0.0
+            latency_us_delta: -14
+            latency_trend: down
+    contains:
+        rates:
+            description:
+              - The rates of the counters between the two snapshots.
+              - A rate is C(null) when its counter went down, for instance
+                after the backend was removed and added again.
+              - I(latency_trend) is C(up), C(down) or C(flat).
+            returned: When I(interval) is set and the backend is in both snapshots.
+            type: dict
+interval:
+    description: The seconds measured between the two snapshots.
+    returned: When I(interval) is set.
+    type: float
+    sample: 10.004
+'''
+
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    mysql_connect,
+    mysql_driver,
+    proxysql_common_argument_spec,
+)
+from ansible.module_utils._text import to_native
+
+# ===========================================
+# proxysql module specific support methods.
+#
+
+POOL_KEY_COLUMNS = ("hostgroup", "srv_host", "srv_port")
+
+POOL_TEXT_COLUMNS = ("srv_host", "status")
+
+# rate name: counter column
+POOL_RATES = (
+    ("queries_per_sec", "Queries"),
+    ("bytes_sent_per_sec", "Bytes_data_sent"),
+    ("bytes_recv_per_sec", "Bytes_data_recv"),
+    ("conn_ok_per_sec", "ConnOK"),
+    ("conn_err_per_sec", "ConnERR"),
+)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def get_connection_pool(cursor, protocol, hostgroups=None):
+    query_string = "SELECT * FROM stats_{0}_connection_pool".format(protocol)
+    query_data = []
+
+    if hostgroups:
+        query_string += " WHERE hostgroup IN ({0})".format(
+            ", ".join(["%s"] * len(hostgroups)))
+        query_data = list(hostgroups)
+
+    cursor.execute(query_string, query_data)
+
+    servers = []
+    for row in cursor.fetchall():
+        servers.append(dict(
+            (col, val if col in POOL_TEXT_COLUMNS else _to_int(val))
+            for col, val in row.items()))
+    return servers
+
+
+def pool_key(server):
+    return tuple(server[col] for col in POOL_KEY_COLUMNS)
+
+
+def compute_rates(first, second, elapsed):
+    rates = dict()
+    for rate, counter in POOL_RATES:
+        if counter not in first or counter not in second:
+            continue
+        delta = second[counter] - first[counter]
+        rates[rate] = round(delta / elapsed, 1) if delta >= 0 else None
+
+    if "Latency_us" in first and "Latency_us" in second:
+        delta = second["Latency_us"] - first["Latency_us"]
+        rates["latency_us_delta"] = delta
+        rates["latency_trend"] = "up" if delta > 0 else "down" if delta < 0 else "flat"
+
+    return rates
+
+
+def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        protocol=dict(default='mysql', choices=['mysql', 'pgsql']),
+        hostgroups=dict(type='list', elements='int'),
+        interval=dict(default=0, type='float'),
+    )
+
+    module = AnsibleModule(
+        supports_check_mode=True,
+        argument_spec=argument_spec
+    )
+
+    protocol = module.params["protocol"]
+    hostgroups = module.params["hostgroups"]
+    interval = module.params["interval"]
+
+    if interval < 0:
+        module.fail_json(msg="interval must be 0 or greater")
+
+    login_user = module.params["login_user"]
+    login_password = module.params["login_password"]
+    config_file = module.params["config_file"]
+
+    cursor = None
+    try:
+        cursor, db_conn, version = mysql_connect(
+            module,
+            login_user,
+            login_password,
+            config_file,
+            cursor_class='DictCursor'
+        )
+    except mysql_driver.Error as e:
+        module.fail_json(msg="unable to connect to ProxySQL Admin Module: %s" % to_native(e))
+
+    result = dict(changed=False)
+
+    try:
+        servers = get_connection_pool(cursor, protocol, hostgroups)
+        started = time.monotonic()
+
+        if interval:
+            time.sleep(interval)
+            first = dict((pool_key(server), server) for server in servers)
+            servers = get_connection_pool(cursor, protocol, hostgroups)
+            elapsed = time.monotonic() - started
+            result['interval'] = round(elapsed, 3)
+
+            for server in servers:
+                previous = first.get(pool_key(server))
+                if previous is not None:
+                    server['rates'] = compute_rates(previous, server, elapsed)
+    except mysql_driver.Error as e:
+        module.fail_json(msg="unable to read the connection pool: %s" % to_native(e))
+
+    result['servers'] = servers
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: proxysql_drift_info
+author: "Ansible ProxySQL community (@ansible-collections)"
+short_description: Finds the proxysql config that differs between memory, runtime and disk
+description:
+   - The M(community.proxysql.proxysql_drift_info) module compares the config
+     tables in memory with their C(runtime_) counterparts and with the
+     tables of the C(disk) schema, such as after a manual C(UPDATE) that was
+     never loaded, or a restart that loaded a stale disk config.
+   - Each table is read once per layer and compared by checksum. Only the
+     tables whose checksums differ are compared row by row, on their
+     primary key.
+version_added: '1.9.0'
+options:
+  config_settings:
+    description:
+      - The configurations to compare. All of them are compared if omitted.
+    type: list
+    elements: str
+    choices: [ "MYSQL USERS", "MYSQL SERVERS", "MYSQL QUERY RULES",
+               "MYSQL VARIABLES", "PGSQL USERS", "PGSQL SERVERS",
+               "PGSQL QUERY RULES", "PGSQL VARIABLES",
+               "ADMIN VARIABLES", "SCHEDULER", "PROXYSQL SERVERS" ]
+  layers:
+    description:
+      - The layers compared with memory.
+    type: list
+    elements: str
+    choices: [ "RUNTIME", "DISK" ]
+    default: [ "RUNTIME", "DISK" ]
+  details:
+    description:
+      - Compare the rows of the tables whose checksums differ and return the
+        differences. Only the checksums are returned when C(false).
+    type: bool
+    default: true
+  max_differences:
+    description:
+      - Maximum number of differences returned per table and layer.
+    type: int
+    default: 50
+extends_documentation_fragment:
+  - community.proxysql.proxysql.connectivity
+notes:
+  - Supports C(check_mode).
+  - ProxySQL keeps some tables differently at runtime. C(runtime_mysql_users)
+    holds a frontend and a backend row per user and may hold hashed
+    passwords, and C(runtime_mysql_servers) holds the current status of the
+    servers, so these tables can differ from memory without any change.
+'''
+
+EXAMPLES = '''
+- name: Find the config that was changed but not loaded or saved
+  community.proxysql.proxysql_drift_info:
+    login_user: admin
+    login_password: admin
+  register: drift
+
+- name: Fail when the query rules in memory are not the ones running
+  ansible.builtin.assert:
+    that: "'RUNTIME' not in drift.drift['MYSQL QUERY RULES'] | default([])"
+
+- name: Compare the servers with the disk config, checksums only
+  community.proxysql.proxysql_drift_info:
+    login_user: admin
+    login_password: admin
+    config_settings: ["MYSQL SERVERS"]
+    layers: ["DISK"]
+    details: false
+'''
+
+RETURN = '''
+drift:
+    description:
+      - The configurations with drift, and the layers that differ from
+        memory. Empty when every layer matches memory.
+    returned: always
+    type: dict
+    sample:
+        MYSQL SERVERS: ["RUNTIME"]
+tables:
+    description: One entry per table compared.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - config_settings: MYSQL SERVERS
+          table: mysql_servers
+          checksums:
+            MEMORY: 5c1ad7d19e5b4bd4fba4d4c1c7a1a8d3ab3ee0e1
+            RUNTIME: 0a4f36b2cbd1bb14a94c4f2c2d1d1a4a0fe6d7a2
+            DISK: 5c1ad7d19e5b4bd4fba4d4c1c7a1a8d3ab3ee0e1
+          differences:
+            RUNTIME:
+              only_in_memory:
+                - hostgroup_id: "1"
+                  hostname: mysql03
+                  port: "3306"
+              only_in_layer: []
+              changed:
+                - key:
+                    hostgroup_id: "1"
+                    hostname: mysql01
+                    port: "3306"
+                  columns:
+                    weight: ["10", "1"]
+    contains:
+        checksums:
+            description:
+              - SHA1 checksum of the rows of the table per layer, C(null)
+                when the table does not exist in the layer.
+            type: dict
+        differences:
+            description:
+              - Per layer that differs from memory, the keys of the rows only
+                in memory, the keys of the rows only in the layer, and the
+                columns that differ with their memory and layer values.
+            returned: When I(details=true) and the table has drift.
+            type: dict
+'''
+
+import json
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    CONFIG_FAMILY_TABLES,
+    DEFERRED_FLUSH_ORDER,
+    config_layer_tables,
+    config_table_checksum,
+    config_table_rows,
+    mysql_connect,
+    mysql_driver,
+    proxysql_common_argument_spec,
+)
+from ansible.module_utils._text import to_native
+
+# ===========================================
+# proxysql module specific support methods.
+#
+
+TABLE_KEYS = {
+    "mysql_servers": ["hostgroup_id", "hostname", "port"],
+    "mysql_replication_hostgroups": ["writer_hostgroup"],
+    "mysql_group_replication_hostgroups": ["writer_hostgroup"],
+    "mysql_galera_hostgroups": ["writer_hostgroup"],
+    "mysql_aws_aurora_hostgroups": ["writer_hostgroup"],
+    "mysql_hostgroup_attributes": ["hostgroup_id"],
+    "mysql_servers_ssl_params": ["hostname", "port", "username"],
+    "mysql_users": ["username", "frontend", "backend"],
+    "mysql_query_rules": ["rule_id"],
+    "mysql_query_rules_fast_routing": ["username", "schemaname", "flagIN"],
+    "global_variables": ["variable_name"],
+    "pgsql_servers": ["hostgroup_id", "hostname", "port"],
+    "pgsql_replication_hostgroups": ["writer_hostgroup"],
+    "pgsql_hostgroup_attributes": ["hostgroup_id"],
+    "pgsql_users": ["username", "frontend", "backend"],
+    "pgsql_query_rules": ["rule_id"],
+    "pgsql_query_rules_fast_routing": ["username", "database", "flagIN"],
+    "scheduler": ["id"],
+    "proxysql_servers": ["hostname", "port"],
+}
+
+
+def _sorted_keys(keys):
+    return sorted(keys, key=lambda key: tuple("" if val is None else val for val in key))
+
+
+def index_rows(rows, key_columns):
+    indexed = dict()
+    for row in rows:
+        row = dict(json.loads(row))
+        indexed[tuple(row.get(col) for col in key_columns)] = row
+    return indexed
+
+
+def diff_rows(memory_rows, layer_rows, key_columns, limit):
+    memory = index_rows(memory_rows, key_columns)
+    layer = index_rows(layer_rows, key_columns)
+
+    def key_dict(key):
+        return dict(zip(key_columns, key))
+
+    changed = []
+    for key in _sorted_keys(set(memory) & set(layer)):
+        columns = dict(
+            (col, [memory[key].get(col), layer[key].get(col)])
+            for col in sorted(set(memory[key]) | set(layer[key]))
+            if memory[key].get(col) != layer[key].get(col))
+        if columns:
+            changed.append(dict(key=key_dict(key), columns=columns))
+
+    return dict(
+        only_in_memory=[key_dict(key) for key in _sorted_keys(set(memory) - set(layer))][:limit],
+        only_in_layer=[key_dict(key) for key in _sorted_keys(set(layer) - set(memory))][:limit],
+        changed=changed[:limit],
+    )
+
+
+class ProxySQLDriftInfo(object):
+
+    def __init__(self, module):
+        self.config_settings = module.params["config_settings"] or list(CONFIG_FAMILY_TABLES)
+        self.layers = [layer for layer in ("RUNTIME", "DISK")
+                       if layer in module.params["layers"]]
+        self.details = module.params["details"]
+        self.max_differences = module.params["max_differences"]
+
+    def compare_table(self, cursor, family, table, tables):
+        rows = dict()
+        checksums = dict()
+        for layer in ["MEMORY"] + self.layers:
+            if table in tables[layer]:
+                rows[layer] = config_table_rows(cursor, family, layer, table)
+                checksums[layer] = config_table_checksum(rows[layer])
+            else:
+                checksums[layer] = None
+
+        entry = dict(config_settings=family, table=table, checksums=checksums)
+        drifted = [layer for layer in self.layers
+                   if checksums[layer] != checksums["MEMORY"]]
+
+        if self.details and drifted:
+            key_columns = TABLE_KEYS[table]
+            entry['differences'] = dict(
+                (layer, diff_rows(rows["MEMORY"], rows.get(layer, []),
+                                  key_columns, self.max_differences))
+                for layer in drifted)
+
+        return entry, drifted
+
+    def compare(self, cursor):
+        tables = dict((layer, config_layer_tables(cursor, layer))
+                      for layer in ["MEMORY"] + self.layers)
+
+        drift = dict()
+        entries = []
+        for family in sorted(set(self.config_settings), key=DEFERRED_FLUSH_ORDER.index):
+            for table in CONFIG_FAMILY_TABLES[family]:
+                if table not in tables["MEMORY"]:
+                    continue
+                entry, drifted = self.compare_table(cursor, family, table, tables)
+                entries.append(entry)
+                for layer in drifted:
+                    if layer not in drift.setdefault(family, []):
+                        drift[family].append(layer)
+
+        return dict(drift=drift, tables=entries)
+
+# ===========================================
+# Module execution.
+#
+
+
+def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        config_settings=dict(type='list', elements='str',
+                             choices=['MYSQL USERS',
+                                      'MYSQL SERVERS',
+                                      'MYSQL QUERY RULES',
+                                      'MYSQL VARIABLES',
+                                      'PGSQL USERS',
+                                      'PGSQL SERVERS',
+                                      'PGSQL QUERY RULES',
+                                      'PGSQL VARIABLES',
+                                      'ADMIN VARIABLES',
+                                      'SCHEDULER',
+                                      'PROXYSQL SERVERS']),
+        layers=dict(type='list', elements='str', default=['RUNTIME', 'DISK'],
+                    choices=['RUNTIME', 'DISK']),
+        details=dict(default=True, type='bool'),
+        max_differences=dict(default=50, type='int'),
+    )
+
+    module = AnsibleModule(
+        supports_check_mode=True,
+        argument_spec=argument_spec
+    )
+
+    if module.params["max_differences"] < 0:
+        module.fail_json(msg="max_differences must be 0 or greater")
+
+    login_user = module.params["login_user"]
+    login_password = module.params["login_password"]
+    config_file = module.params["config_file"]
+
+    cursor = None
+    try:
+        cursor, db_conn, version = mysql_connect(
+            module,
+            login_user,
+            login_password,
+            config_file,
+            cursor_class='DictCursor'
+        )
+    except mysql_driver.Error as e:
+        module.fail_json(msg="unable to connect to ProxySQL Admin Module: %s" % to_native(e))
+
+    drift_info = ProxySQLDriftInfo(module)
+    result = dict(changed=False)
+
+    try:
+        result.update(drift_info.compare(cursor))
+    except mysql_driver.Error as e:
+        module.fail_json(msg="unable to compare the config layers: %s" % to_native(e))
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -161,14 +161,21 @@ stdout:
 from ansible.module_utils._text import to_native
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
 )
 
 
+KEY_COLUMNS = ["writer_hostgroup"]
+
+
 def perform_checks(module):
     """ Perform validation of
         module.params variables
@@ -242,8 +249,8 @@ class ProxySQLGaleraHostgroup():
 
     def __init__(self, module, version):
         self.state = module.params["state"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
 
         config_data_keys = [
             "writer_hostgroup",
@@ -263,76 +270,37 @@ class ProxySQLGaleraHostgroup():
         self.galera_hostgroups_support = version.get("major") >= 2
         self.check_mode = module.check_mode
 
-    def check_galera_group_config(self, cursor):
-        query_string = """SELECT count(*) AS `galera_groups`
-               FROM mysql_galera_hostgroups
-               WHERE writer_hostgroup = %s"""
-
-        query_data = [self.config_data['writer_hostgroup']]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return int(check_count["galera_groups"]) > 0
+    def get_galera_groups_config(self, cursor):
+        return fetch_table(
+            cursor, "mysql_galera_hostgroups", KEY_COLUMNS,
+            match={'writer_hostgroup': self.config_data['writer_hostgroup']})
 
     def get_galera_group_config(self, cursor):
-        query_string = """SELECT *
-               FROM mysql_galera_hostgroups
-               WHERE writer_hostgroup = %s"""
-
-        query_data = [self.config_data['writer_hostgroup']]
-
-        cursor.execute(query_string, query_data)
-        galera_group = cursor.fetchone()
-        return galera_group
-
-    def create_galera_group_config(self, cursor):
-        query_string = """INSERT INTO mysql_galera_hostgroups (
-               writer_hostgroup,
-               backup_writer_hostgroup,
-               reader_hostgroup,
-               offline_hostgroup,
-               active,
-               max_writers,
-               writer_is_also_reader,
-               max_transactions_behind,
-               comment)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"""
-
-        query_data = [
-            self.config_data['writer_hostgroup'],
-            self.config_data['backup_writer_hostgroup'],
-            self.config_data['reader_hostgroup'],
-            self.config_data['offline_hostgroup'],
-            self.config_data['active'],
-            self.config_data['max_writers'],
-            self.config_data['writer_is_also_reader'],
-            self.config_data['max_transactions_behind'],
-            self.config_data['comment']
-        ]
-
-        cursor.execute(query_string, query_data)
-
-        return True
-
-    def delete_galera_group_config(self, cursor):
-        query_string = """DELETE FROM mysql_galera_hostgroups
-               WHERE writer_hostgroup = %s"""
-
-        query_data = [self.config_data['writer_hostgroup']]
-
-        cursor.execute(query_string, query_data)
+        galera_groups = self.get_galera_groups_config(cursor)
+        return next(iter(galera_groups.values()), None)
+
+    def compute_changes(self, current):
+        if self.state == "absent":
+            return compute_changeset(
+                current, KEY_COLUMNS,
+                absent=[{'writer_hostgroup':
+                         self.config_data['writer_hostgroup']}])
+        return compute_changeset(current, KEY_COLUMNS,
+                                 present=[self.config_data])
+
+    def apply_galera_group_config(self, cursor, changeset):
+        apply_changeset(cursor, "mysql_galera_hostgroups", KEY_COLUMNS,
+                        changeset)
         return True
 
     def manage_config(self, cursor, state):
         if state and not self.check_mode:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "SERVERS")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "SERVERS")
+            flush_config(cursor, self.params, self.flush_state, "SERVERS")
 
-    def create_galera_group(self, result, cursor):
+    def create_galera_group(self, result, cursor, changeset):
         if not self.check_mode:
-            result["changed"] = self.create_galera_group_config(cursor)
+            result["changed"] = self.apply_galera_group_config(cursor,
+                                                               changeset)
             result["msg"] = "Galera group have been added to mysql_galera_hostgroups"
             result["galera_group"] = self.get_galera_group_config(cursor)
             self.manage_config(cursor, result["changed"])
@@ -344,29 +312,24 @@ class ProxySQLGaleraHostgroup():
                 + " check_mode is enabled."
             )
 
-    def update_galera_group(self, result, cursor):
-        current = self.get_galera_group_config(cursor)
-
-        for key, value in current.items():
-            if key != "comment":
-                value = int(value)
-            if self.config_data.get(key):
-                if value != self.config_data[key]:
-                    result["changed"] = True
-                    result["msg"] = "Updated galera hostgroups in check_mode"
-                    if not self.check_mode:
-                        result["changed"] = True
-                        result["msg"] = "Updated galera hostgroups"
-                        self.update_attr(cursor, key)
-
-        result["galera_group"] = self.get_galera_group_config(cursor)
+    def update_galera_group(self, result, cursor, changeset, current):
+        result["changed"] = True
+        if not self.check_mode:
+            result["msg"] = "Updated galera hostgroups"
+            self.apply_galera_group_config(cursor, changeset)
+            result["galera_group"] = merge_changes(current,
+                                                   changeset["update"][0][1])
+        else:
+            result["msg"] = "Updated galera hostgroups in check_mode"
+            result["galera_group"] = current
 
         self.manage_config(cursor, result["changed"])
 
-    def delete_galera_group(self, result, cursor):
+    def delete_galera_group(self, result, cursor, changeset, current):
         if not self.check_mode:
-            result["galera_group"] = self.get_galera_group_config(cursor)
-            result["changed"] = self.delete_galera_group_config(cursor)
+            result["galera_group"] = current
+            result["changed"] = self.apply_galera_group_config(cursor,
+                                                               changeset)
             result["msg"] = "Deleted galera group from mysql_galera_hostgroup"
             self.manage_config(cursor, result["changed"])
         else:
@@ -377,16 +340,6 @@ class ProxySQLGaleraHostgroup():
                 + " check_mode is enabled."
             )
 
-    def update_attr(self, cursor, attr):
-        query_string = """UPDATE mysql_galera_hostgroups
-               SET %s = %s
-               WHERE writer_hostgroup = %s"""
-
-        query_data = [attr, self.config_data[attr],
-                      self.config_data['writer_hostgroup']]
-
-        cursor.execute(query_string, query_data)
-
 
 # ===========================================
 # Module execution.
@@ -408,6 +361,7 @@ def main():
         state=dict(default="present", choices=["present", "absent"]),
         save_to_disk=dict(default=True, type="bool"),
         load_to_runtime=dict(default=True, type="bool"),
+        defer_flush=dict(default=False, type="bool"),
     )
 
     module = AnsibleModule(supports_check_mode=True,
@@ -440,15 +394,32 @@ def main():
         result["msg"] = "mysql_galera_hostgroups is only supported with proxysql 2.0.0 and above"
         module.exit_json(**result)
 
+    try:
+        current = proxysql_galera_group.get_galera_groups_config(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read galera hostgroup.. %s" % (to_native(e))
+        )
+
+    galera_group = next(iter(current.values()), None)
+    changeset = proxysql_galera_group.compute_changes(current)
+
     if proxysql_galera_group.state == "present":
         try:
-            if not proxysql_galera_group.check_galera_group_config(cursor):
-                proxysql_galera_group.create_galera_group(result, cursor)
+            if changeset["insert"]:
+                proxysql_galera_group.create_galera_group(result, cursor,
+                                                          changeset)
+            elif changeset["update"]:
+                proxysql_galera_group.update_galera_group(result, cursor,
+                                                          changeset,
+                                                          galera_group)
             else:
-                proxysql_galera_group.update_galera_group(result, cursor)
-
-                result["galera_group"] = proxysql_galera_group.get_galera_group_config(
-                    cursor)
+                result["msg"] = (
+                    "The galera group already exists in"
+                    + " mysql_galera_hostgroups and doesn't"
+                    + " need to be updated."
+                )
+                result["galera_group"] = galera_group
 
         except mysql_driver.Error as e:
             module.fail_json(
@@ -457,8 +428,10 @@ def main():
 
     elif proxysql_galera_group.state == "absent":
         try:
-            if proxysql_galera_group.check_galera_group_config(cursor):
-                proxysql_galera_group.delete_galera_group(result, cursor)
+            if changeset["delete"]:
+                proxysql_galera_group.delete_galera_group(result, cursor,
+                                                          changeset,
+                                                          galera_group)
             else:
                 result["changed"] = False
                 result["msg"] = (
@@ -19,13 +19,28 @@ options:
     description:
       - Defines which variable should be returned, or if I(value) is specified
         which variable should be updated.
+      - Required unless I(variables) is used.
     type: str
-    required: true
   value:
     description:
       - Defines a value the variable specified using I(variable) should be set
         to.
+      - The variable is not updated when its current value is the same once
+        normalised, such as C(true) and C(1) or C(100) and C(100.0).
     type: str
+  variables:
+    description:
+      - Sets many variables at once, as a dictionary of variable names and
+        values.
+      - The C(global_variables) table is read once and only the variables
+        whose value differs are updated. The C(ADMIN), C(MYSQL) and C(PGSQL)
+        variables are then saved to disk and loaded to runtime once per
+        prefix that changed.
+      - Boolean values are written as C(true) or C(false). The values are
+        compared normalised, as for I(value).
+      - Mutually exclusive with I(variable) and I(value).
+    type: dict
+    version_added: '1.9.0'
 extends_documentation_fragment:
 - community.proxysql.proxysql.managing_config
 - community.proxysql.proxysql.connectivity
@@ -54,6 +69,18 @@ EXAMPLES = '''
   community.proxysql.proxysql_global_variables:
     config_file: '~/proxysql.cnf'
     variable: 'mysql-default_query_delay'
+
+# This example sets several admin and mysql variables, and saves and loads
+# the admin and the mysql variables only once each.
+
+- name: Set the value of several variables
+  community.proxysql.proxysql_global_variables:
+    login_user: 'admin'
+    login_password: 'admin'
+    variables:
+      admin-refresh_interval: 2000
+      mysql-max_connections: 4096
+      mysql-monitor_enabled: true
 '''
 
 RETURN = '''
@@ -70,15 +97,36 @@ stdout:
             "variable_value": "3000"
         }
     }
+variables:
+    description: The variables supplied in I(variables) with their value.
+    returned: When I(variables) is used.
+    type: dict
+    sample:
+        mysql-max_connections: "4096"
+        mysql-monitor_enabled: "true"
+    version_added: '1.9.0'
+changed_variables:
+    description: The variables of I(variables) that were, or would have been, updated.
+    returned: When I(variables) is used.
+    type: list
+    elements: str
+    sample: ["mysql-max_connections"]
+    version_added: '1.9.0'
 '''
 
+import re
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    config_family,
+    fetch_table,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
 )
 from ansible.module_utils._text import to_native
 
@@ -87,24 +135,6 @@ from ansible.module_utils._text import to_native
 #
 
 
-def check_config(variable, value, cursor):
-    query_string = \
-        """SELECT count(*) AS `variable_count`
-           FROM global_variables
-           WHERE variable_name = %s and variable_value = %s"""
-
-    query_data = \
-        [variable, value]
-
-    cursor.execute(query_string, query_data)
-    check_count = cursor.fetchone()
-
-    if isinstance(check_count, tuple):
-        return int(check_count[0]) > 0
-
-    return (int(check_count['variable_count']) > 0)
-
-
 def get_config(variable, cursor):
 
     query_string = \
@@ -139,12 +169,75 @@ def set_config(variable, value, cursor):
     return True
 
 
-def manage_config(variable, save_to_disk, load_to_runtime, cursor, state):
-    if state:
-        if save_to_disk:
-            save_config_to_disk(cursor, "VARIABLES", variable)
-        if load_to_runtime:
-            load_config_to_runtime(cursor, "VARIABLES", variable)
+def variable_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return to_native(value)
+
+
+def normalize_variable(value):
+    """Comparable form of a variable value.
+
+    ProxySQL accepts 1/0 for its boolean variables, so 'true' and '1' are the
+    same value. Any other value is compared as the string ProxySQL returns.
+    """
+    value = variable_value(value).strip()
+    if value.lower() in ("true", "false"):
+        return int(value.lower() == "true")
+    if re.match(r'^-?(0|[1-9][0-9]*)$', value):
+        return int(value)
+    return value
+
+
+def differs(current, value):
+    return normalize_variable(current) != normalize_variable(value)
+
+
+def get_variables(cursor):
+    return fetch_table(cursor, "global_variables", ["variable_name"])
+
+
+def manage_variables(module, cursor, variables, flush_state):
+    wanted = dict((name, variable_value(value))
+                  for name, value in variables.items())
+
+    current = get_variables(cursor)
+    missing = sorted(name for name in wanted if (name,) not in current)
+    if missing:
+        module.fail_json(
+            msg="The variables \"%s\" were not found" % "\", \"".join(missing)
+        )
+
+    changed = sorted(name for name, value in wanted.items()
+                     if differs(current[(name,)]["variable_value"], value))
+    changeset = compute_changeset(
+        current, ["variable_name"],
+        present=[dict(variable_name=name, variable_value=wanted[name])
+                 for name in changed])
+
+    result = dict(changed=bool(changed),
+                  changed_variables=changed,
+                  variables=dict((name, current[(name,)]["variable_value"])
+                                 for name in wanted))
+
+    if not changed:
+        result['msg'] = "The variables are already set to the supplied values"
+    elif module.check_mode:
+        result['msg'] = ("Variables would have been set to the supplied" +
+                         " values, however check_mode is enabled.")
+    else:
+        apply_changeset(cursor, "global_variables", ["variable_name"], changeset)
+        result['msg'] = "Set the variables to the supplied values"
+        result['variables'].update((name, wanted[name]) for name in changed)
+
+        # One save and load per prefix, whatever the number of variables.
+        families = dict((config_family("VARIABLES", name), name)
+                        for name in changed)
+        for family in sorted(families):
+            flush_config(cursor, module.params, flush_state, "VARIABLES",
+                         families[family])
+
+    return result
 
 # ===========================================
 # Module execution.
@@ -154,15 +247,19 @@ def manage_config(variable, save_to_disk, load_to_runtime, cursor, state):
 def main():
     argument_spec = proxysql_common_argument_spec()
     argument_spec.update(
-        variable=dict(required=True, type='str'),
+        variable=dict(type='str'),
         value=dict(),
+        variables=dict(type='dict'),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool')
     )
 
     module = AnsibleModule(
         supports_check_mode=True,
-        argument_spec=argument_spec
+        argument_spec=argument_spec,
+        mutually_exclusive=[('variable', 'variables'), ('value', 'variables')],
+        required_one_of=[('variable', 'variables')]
     )
 
     login_user = module.params["login_user"]
@@ -170,8 +267,8 @@ def main():
     config_file = module.params["config_file"]
     variable = module.params["variable"]
     value = module.params["value"]
-    save_to_disk = module.params["save_to_disk"]
-    load_to_runtime = module.params["load_to_runtime"]
+    variables = module.params["variables"]
+    flush_state = deferred_flush_path(module)
 
     cursor = None
     try:
@@ -187,56 +284,51 @@ def main():
 
     result = {}
 
-    if not value:
+    if variables is not None:
         try:
-            if get_config(variable, cursor):
-                result['changed'] = False
-                result['msg'] = \
-                    "Returned the variable and it's current value"
-                result['var'] = get_config(variable, cursor)
-            else:
-                module.fail_json(
-                    msg="The variable \"%s\" was not found" % variable
-                )
-
+            result = manage_variables(module, cursor, variables, flush_state)
         except mysql_driver.Error as e:
             module.fail_json(
-                msg="unable to get config.. %s" % to_native(e)
+                msg="unable to set config.. %s" % to_native(e)
             )
     else:
         try:
-            if get_config(variable, cursor):
-                if not check_config(variable, value, cursor):
-                    if not module.check_mode:
-                        result['changed'] = set_config(variable, value, cursor)
-                        result['msg'] = \
-                            "Set the variable to the supplied value"
-                        result['var'] = get_config(variable, cursor)
-                        manage_config(variable,
-                                      save_to_disk,
-                                      load_to_runtime,
-                                      cursor,
-                                      result['changed'])
-                    else:
-                        result['changed'] = True
-                        result['msg'] = ("Variable would have been set to" +
-                                         " the supplied value, however" +
-                                         " check_mode is enabled.")
-                else:
-                    result['changed'] = False
-                    result['msg'] = ("The variable is already been set to" +
-                                     " the supplied value")
-                    result['var'] = get_config(variable, cursor)
-            else:
-                module.fail_json(
-                    msg="The variable \"%s\" was not found" % variable
-                )
-
+            current = get_config(variable, cursor)
         except mysql_driver.Error as e:
             module.fail_json(
-                msg="unable to set config.. %s" % to_native(e)
+                msg="unable to get config.. %s" % to_native(e)
+            )
+        if not current:
+            module.fail_json(
+                msg="The variable \"%s\" was not found" % variable
             )
 
+        result['var'] = current
+        if not value:
+            result['changed'] = False
+            result['msg'] = "Returned the variable and it's current value"
+        elif not differs(current['variable_value'], value):
+            result['changed'] = False
+            result['msg'] = ("The variable is already been set to" +
+                             " the supplied value")
+        elif module.check_mode:
+            result['changed'] = True
+            result['msg'] = ("Variable would have been set to" +
+                             " the supplied value, however" +
+                             " check_mode is enabled.")
+        else:
+            try:
+                result['changed'] = set_config(variable, value, cursor)
+                result['msg'] = "Set the variable to the supplied value"
+                result['var'] = dict(current, variable_value=value)
+                if result['changed']:
+                    flush_config(cursor, module.params, flush_state,
+                                 "VARIABLES", variable)
+            except mysql_driver.Error as e:
+                module.fail_json(
+                    msg="unable to set config.. %s" % to_native(e)
+                )
+
     module.exit_json(**result)
 
 
@@ -15,6 +15,45 @@ description:
    - Gathers information about proxysql server.
    - Caution. The number of tables that returns, depends on the underlying proyxsql server version.
 version_added: '1.2.0'
+options:
+  include:
+    description:
+      - Shell-style patterns of the tables to gather, for example
+        C(mysql_*) or C(runtime_mysql_servers).
+      - Tables whose name starts with C(stats_) can be large and are only
+        gathered when an I(include) pattern starts with C(stats), for
+        example C(stats_mysql_connection_pool) or C(stats_*).
+    type: list
+    elements: str
+    default: ['*']
+    version_added: '1.9.0'
+  exclude:
+    description:
+      - Shell-style patterns of the tables not to gather, applied after
+        I(include).
+    type: list
+    elements: str
+    default: []
+    version_added: '1.9.0'
+  columns:
+    description:
+      - The columns to gather per table, as a dictionary of table name to a
+        list of column names. Tables that are not listed return all columns.
+    type: dict
+    version_added: '1.9.0'
+  where:
+    description:
+      - A condition restricting the rows gathered per table, as a
+        dictionary of table name to an SQL expression such as
+        C(hostgroup_id = 1).
+    type: dict
+    version_added: '1.9.0'
+  limit:
+    description:
+      - The maximum number of rows gathered per table. Tables with more rows
+        are listed in I(truncated).
+    type: int
+    version_added: '1.9.0'
 extends_documentation_fragment:
   - community.proxysql.proxysql.connectivity
 notes:
@@ -26,6 +65,20 @@ EXAMPLES = '''
   community.proxysql.proxysql_info:
     login_user: admin
     login_password: admin
+
+- name: Receive the backend servers and the connection pool statistics
+  community.proxysql.proxysql_info:
+    login_user: admin
+    login_password: admin
+    include:
+      - mysql_servers
+      - runtime_mysql_servers
+      - stats_mysql_connection_pool
+    columns:
+      stats_mysql_connection_pool: [hostgroup, srv_host, srv_port, status, ConnUsed, ConnFree]
+    where:
+      stats_mysql_connection_pool: "status <> 'ONLINE'"
+    limit: 1000
 '''
 
 RETURN = '''
@@ -86,7 +139,14 @@ stdout:
         global_variables:
             description: Global variables of requested proxysql.
             type: dict
-            returned: Always
+            returned: When the C(global_variables) table is gathered.
+        truncated:
+            description: Tables that have more rows than I(limit).
+            sample:
+                - stats_mysql_query_digest
+            type: list
+            returned: When I(limit) is set.
+            version_added: '1.9.0'
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -96,42 +156,118 @@ from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
     proxysql_common_argument_spec,
 )
 from ansible.module_utils._text import to_native
+from fnmatch import fnmatchcase
+import re
 
 # ===========================================
 # proxysql module specific support methods.
 #
 
 
-def get_tables(cursor):
+IDENTIFIER = re.compile(r'^[A-Za-z0-9_]+$')
+
+# global_variables tables are returned as a dict when both are gathered.
+VARIABLE_COLUMNS = frozenset(['variable_name', 'variable_value'])
+
+
+def select_tables(tables, include, exclude):
+    stats_include = [pattern for pattern in include
+                     if pattern.startswith("stats")]
+
+    selected = list()
+    for table in tables:
+        patterns = stats_include if table.startswith("stats_") else include
+        if any(fnmatchcase(table, pattern) for pattern in patterns) and \
+           not any(fnmatchcase(table, pattern) for pattern in exclude):
+            selected.append(table)
+
+    return selected
+
+
+def get_table(cursor, table, columns=None, where=None, limit=None):
+    query_string = "select {columns} from {table}".format(
+        columns=", ".join(columns) if columns else "*", table=table)
+    if where:
+        query_string += " where {where}".format(where=where)
+    if limit is not None:
+        # One row more than the limit tells a truncated table apart.
+        query_string += " limit {limit}".format(limit=limit + 1)
+
+    cursor.execute(query_string)
+    return cursor.fetchall()
+
+
+def get_tables(cursor, include=None, exclude=None, columns=None, where=None,
+               limit=None):
     result = dict()
     tables = list()
+    include = include or ['*']
+    columns = columns or dict()
+    where = where or dict()
 
     cursor.execute("show tables")
 
     for table in cursor.fetchall():
         tables.append(table.get('tables'))
-    result['tables'] = tables
+
+    if any(pattern.startswith("stats") for pattern in include):
+        cursor.execute("show tables from stats")
+        for table in cursor.fetchall():
+            if table.get('tables') not in tables:
+                tables.append(table.get('tables'))
+
+    result['tables'] = select_tables(tables, include, exclude or [])
+    if limit is not None:
+        result['truncated'] = list()
 
     for table in result.get('tables'):
-        cursor.execute("select * from {table}".format(table=table))
+        rows = get_table(cursor, table, columns.get(table), where.get(table),
+                         limit)
 
-        if 'global_variables' in table:
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            result['truncated'].append(table)
+
+        if 'global_variables' in table and \
+           VARIABLE_COLUMNS.issubset(columns.get(table) or VARIABLE_COLUMNS):
             result[table] = dict()
-            for item in cursor.fetchall():
+            for item in rows:
                 result[table][item.get('variable_name')] = item.get('variable_value')
 
         else:
-            result[table] = cursor.fetchall()
+            result[table] = rows
 
     return result
 
 
 def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        include=dict(type='list', elements='str', default=['*']),
+        exclude=dict(type='list', elements='str', default=[]),
+        columns=dict(type='dict'),
+        where=dict(type='dict'),
+        limit=dict(type='int'),
+    )
+
     module = AnsibleModule(
         supports_check_mode=True,
-        argument_spec=proxysql_common_argument_spec()
+        argument_spec=argument_spec
     )
 
+    columns = module.params["columns"] or dict()
+    for table, table_columns in columns.items():
+        if not isinstance(table_columns, list) or not table_columns:
+            module.fail_json(msg="columns of %s must be a non-empty list" % table)
+        invalid = [col for col in [table] + table_columns
+                   if not IDENTIFIER.match(str(col))]
+        if invalid:
+            module.fail_json(msg="invalid table or column name in columns: %s" %
+                             ", ".join(str(col) for col in invalid))
+
+    if module.params["limit"] is not None and module.params["limit"] < 0:
+        module.fail_json(msg="limit must be 0 or greater")
+
     login_user = module.params["login_user"]
     login_password = module.params["login_password"]
     config_file = module.params["config_file"]
@@ -148,7 +284,15 @@ def main():
     except mysql_driver.Error as e:
         module.fail_json(msg="unable to connect to ProxySQL Admin Module: %s" % to_native(e))
 
-    result = get_tables(cursor)
+    try:
+        result = get_tables(cursor,
+                            include=module.params["include"],
+                            exclude=module.params["exclude"],
+                            columns=columns,
+                            where=module.params["where"],
+                            limit=module.params["limit"])
+    except mysql_driver.Error as e:
+        module.fail_json(msg="unable to read tables: %s" % to_native(e))
 
     result['version'] = version
 
@@ -14,10 +14,9 @@ author: "Ben Mildren (@bmildren)"
 short_description: Writes the proxysql configuration settings between layers
 description:
    - The M(community.proxysql.proxysql_global_variables) module writes the proxysql configuration
-     settings between layers. Currently this module will always report a
-     changed state, so should typically be used with WHEN however this will
-     change in a future version when the CHECKSUM table commands are available
-     for all tables in proxysql.
+     settings between layers. Unless I(skip_if_unchanged=true) this module
+     will always report a changed state, so should typically be used with
+     WHEN.
 options:
   action:
     description:
@@ -26,16 +25,19 @@ options:
         between the I(config_layers).
     type: str
     choices: [ "LOAD", "SAVE" ]
-    required: true
   config_settings:
     description:
       - The I(config_settings) specifies which configuration we're writing.
-    type: str
+      - Several configurations can be given as a list. They are then written
+        on one connection in dependency order, servers before users, query
+        rules, variables, the scheduler and the ProxySQL Cluster servers,
+        whatever the order of the list.
+    type: list
+    elements: str
     choices: [ "MYSQL USERS", "MYSQL SERVERS", "MYSQL QUERY RULES",
                "MYSQL VARIABLES", "PGSQL USERS", "PGSQL SERVERS",
                "PGSQL QUERY RULES", "PGSQL VARIABLES",
-               "ADMIN VARIABLES", "SCHEDULER" ]
-    required: true
+               "ADMIN VARIABLES", "SCHEDULER", "PROXYSQL SERVERS" ]
   direction:
     description:
       - FROM - denotes we're reading values FROM the supplied I(config_layer)
@@ -44,7 +46,6 @@ options:
              supplied I(config_layer)."
     type: str
     choices: [ "FROM", "TO" ]
-    required: true
   config_layer:
     description:
       - RUNTIME - represents the in-memory data structures of ProxySQL used by
@@ -56,9 +57,38 @@ options:
                  config file.
     type: str
     choices: [ "MEMORY", "DISK", "RUNTIME", "CONFIG" ]
-    required: true
+  flush_deferred:
+    description:
+      - Save and load every config family recorded by tasks that ran with
+        I(defer_flush=true) against the same ProxySQL admin interface, then
+        forget them.
+      - Each family is flushed once, in dependency order, with servers
+        before users, query rules, variables, the scheduler and the ProxySQL
+        Cluster servers. A family is only saved to disk or loaded to runtime
+        if one of the deferred tasks asked for it.
+      - I(action), I(config_settings), I(direction) and I(config_layer) are
+        required unless I(flush_deferred=true).
+    type: bool
+    default: false
+    version_added: '1.9.0'
+  skip_if_unchanged:
+    description:
+      - Compare the checksums of the rows of the I(config_settings) tables in
+        the layer read and the layer written, and only run the statement
+        when they differ. The module then reports a change only when the
+        statement ran.
+      - A LOAD to runtime of unchanged servers, users or query rules then
+        does not rebuild the runtime config of ProxySQL.
+      - The CONFIG layer can not be compared and is always loaded. The
+        runtime layer of some tables, such as C(mysql_users) with hashed
+        passwords or C(mysql_servers) with shunned servers, does not hold
+        the rows of the memory layer, and is then always loaded.
+    type: bool
+    default: false
+    version_added: '1.9.0'
 extends_documentation_fragment:
 - community.proxysql.proxysql.connectivity
+- community.proxysql.proxysql.cluster
 notes:
 - Supports C(check_mode).
 '''
@@ -87,23 +117,143 @@ EXAMPLES = '''
     config_settings: "MYSQL QUERY RULES"
     direction: "TO"
     config_layer: "RUNTIME"
+
+# This example loads the mysql servers config from memory to runtime, only
+# when the runtime config differs.
+
+- name: Load the mysql servers config to runtime if it changed
+  community.proxysql.proxysql_manage_config:
+    login_user: 'admin'
+    login_password: 'admin'
+    action: "LOAD"
+    config_settings: "MYSQL SERVERS"
+    direction: "TO"
+    config_layer: "RUNTIME"
+    skip_if_unchanged: true
+
+# This example promotes the whole mysql config from memory to runtime in one
+# task, servers first.
+
+- name: Load the mysql config from memory to runtime
+  community.proxysql.proxysql_manage_config:
+    login_user: 'admin'
+    login_password: 'admin'
+    action: "LOAD"
+    config_settings:
+      - "MYSQL QUERY RULES"
+      - "MYSQL SERVERS"
+      - "MYSQL USERS"
+      - "MYSQL VARIABLES"
+    direction: "TO"
+    config_layer: "RUNTIME"
+
+# This example flushes the config deferred on the core node of a ProxySQL
+# Cluster, then waits for the other nodes to fetch it.
+
+- name: Flush the deferred config and wait for the cluster to converge
+  community.proxysql.proxysql_manage_config:
+    login_user: 'admin'
+    login_password: 'admin'
+    flush_deferred: true
+    wait_for_cluster: true
+    cluster_timeout: 120
+  run_once: true
+
+# This example changes several servers and users without persisting them, then
+# saves and loads MYSQL SERVERS and MYSQL USERS once at the end.
+
+- name: Add servers, deferring save to disk and load to runtime
+  community.proxysql.proxysql_backend_servers:
+    login_user: 'admin'
+    login_password: 'admin'
+    hostname: "{{ item }}"
+    defer_flush: true
+  loop: "{{ backend_hosts }}"
+
+- name: Add a user, deferring save to disk and load to runtime
+  community.proxysql.proxysql_mysql_users:
+    login_user: 'admin'
+    login_password: 'admin'
+    username: 'app'
+    password: 'secret'
+    defer_flush: true
+
+- name: Flush all deferred config families
+  community.proxysql.proxysql_manage_config:
+    login_user: 'admin'
+    login_password: 'admin'
+    flush_deferred: true
 '''
 
 RETURN = '''
 stdout:
     description: Simply reports whether the action reported a change.
-    returned: Currently the returned value with always be changed=True.
+    returned: Always changed=True, unless I(skip_if_unchanged=true).
     type: dict
     "sample": {
         "changed": true
     }
+flushed:
+    description: The statements run to flush the deferred config families, in order.
+    returned: when I(flush_deferred=true)
+    type: list
+    elements: str
+    sample: ["SAVE MYSQL SERVERS TO DISK", "LOAD MYSQL SERVERS TO RUNTIME"]
+    version_added: '1.9.0'
+results:
+    description: One entry per I(config_settings), in the order they were written.
+    returned: unless I(flush_deferred=true)
+    type: list
+    elements: dict
+    sample:
+        - config_settings: "MYSQL SERVERS"
+          statement: "LOAD MYSQL SERVERS TO RUNTIME"
+          changed: true
+          elapsed: 0.012
+        - config_settings: "MYSQL USERS"
+          statement: "LOAD MYSQL USERS TO RUNTIME"
+          changed: false
+          msg: "MYSQL USERS already match in MEMORY and RUNTIME"
+          elapsed: 0.003
+    contains:
+        elapsed:
+            description: Seconds spent comparing the layers and running the statement.
+            type: float
+    version_added: '1.9.0'
+cluster:
+    description:
+      - Whether the ProxySQL Cluster peers converged, the seconds they took
+        to converge since the config was loaded to runtime, and the peers
+        that still report another checksum.
+    returned: when I(wait_for_cluster=true) and config was loaded to runtime
+    type: dict
+    sample:
+        converged: true
+        elapsed: 2.041
+        pending: []
+    version_added: '1.9.0'
+msg:
+    description: Why no statement was run.
+    returned: when I(skip_if_unchanged=true) and the layers already match
+    type: str
+    sample: "MYSQL SERVERS, MYSQL USERS already match in MEMORY and RUNTIME"
+    version_added: '1.9.0'
 '''
 
+import time
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    CONFIG_FAMILY_TABLES,
+    DEFERRED_FLUSH_ORDER,
+    config_layers_match,
+    deferred_flush,
+    deferred_flush_path,
     mysql_connect,
     mysql_driver,
-    proxysql_common_argument_spec
+    proxysql_cluster_argument_spec,
+    proxysql_common_argument_spec,
+    wait_for_cluster,
 )
 from ansible.module_utils._text import to_native
 
@@ -111,6 +261,18 @@ from ansible.module_utils._text import to_native
 # proxysql module specific support methods.
 #
 
+# (action, direction, config_layer): (layer read, layer written)
+CONFIG_TRANSFERS = {
+    ('LOAD', 'TO', 'RUNTIME'): ('MEMORY', 'RUNTIME'),
+    ('LOAD', 'FROM', 'MEMORY'): ('MEMORY', 'RUNTIME'),
+    ('LOAD', 'TO', 'MEMORY'): ('DISK', 'MEMORY'),
+    ('LOAD', 'FROM', 'DISK'): ('DISK', 'MEMORY'),
+    ('SAVE', 'TO', 'DISK'): ('MEMORY', 'DISK'),
+    ('SAVE', 'FROM', 'MEMORY'): ('MEMORY', 'DISK'),
+    ('SAVE', 'TO', 'MEMORY'): ('RUNTIME', 'MEMORY'),
+    ('SAVE', 'FROM', 'RUNTIME'): ('RUNTIME', 'MEMORY'),
+}
+
 
 def perform_checks(module):
     if module.params["config_layer"] == 'CONFIG' and \
@@ -136,6 +298,17 @@ def perform_checks(module):
             module.fail_json(msg=msg_string % module.params["direction"])
 
 
+def config_unchanged(manage_config_settings, cursor):
+    action, config_settings, direction, config_layer = manage_config_settings
+    layers = CONFIG_TRANSFERS.get((action, direction, config_layer))
+    if layers is None or config_settings not in CONFIG_FAMILY_TABLES:
+        return None
+
+    if config_layers_match(cursor, config_settings, *layers):
+        return layers
+    return None
+
+
 def manage_config(manage_config_settings, cursor, check_mode):
 
     if not check_mode:
@@ -144,6 +317,49 @@ def manage_config(manage_config_settings, cursor, check_mode):
 
     return True
 
+
+def flush_deferred_config(pending, cursor, check_mode):
+    statements = []
+    for family in DEFERRED_FLUSH_ORDER:
+        flags = pending.get(family)
+        if not flags:
+            continue
+        if flags.get("save_to_disk"):
+            statements.append("SAVE %s TO DISK" % family)
+        if flags.get("load_to_runtime"):
+            statements.append("LOAD %s TO RUNTIME" % family)
+
+    if not check_mode:
+        for statement in statements:
+            cursor.execute(statement)
+        pending.clear()
+
+    return statements
+
+
+def runtime_loaded(statements):
+    return [statement[len("LOAD "):-len(" TO RUNTIME")]
+            for statement in statements
+            if statement.startswith("LOAD ") and statement.endswith(" TO RUNTIME")]
+
+
+def wait_for_peers(module, cursor, result, families):
+    if not (module.params["wait_for_cluster"] and families) or module.check_mode:
+        return
+
+    timeout = module.params["cluster_timeout"]
+    try:
+        result['cluster'] = wait_for_cluster(cursor, families, timeout,
+                                             module.params["cluster_poll_interval"])
+    except mysql_driver.Error as e:
+        result['msg'] = "unable to read the cluster checksums.. %s" % to_native(e)
+        module.fail_json(**result)
+
+    if not result['cluster']['converged']:
+        result['msg'] = ("The ProxySQL Cluster peers did not converge within"
+                         " %s seconds" % timeout)
+        module.fail_json(**result)
+
 # ===========================================
 # Module execution.
 #
@@ -152,33 +368,46 @@ def manage_config(manage_config_settings, cursor, check_mode):
 def main():
     argument_spec = proxysql_common_argument_spec()
     argument_spec.update(
-        action=dict(required=True, choices=['LOAD',
-                                            'SAVE']),
-        config_settings=dict(required=True, choices=['MYSQL USERS',
-                                                     'MYSQL SERVERS',
-                                                     'MYSQL QUERY RULES',
-                                                     'MYSQL VARIABLES',
-                                                     'PGSQL USERS',
-                                                     'PGSQL SERVERS',
-                                                     'PGSQL QUERY RULES',
-                                                     'PGSQL VARIABLES',
-                                                     'ADMIN VARIABLES',
-                                                     'SCHEDULER']),
-        direction=dict(required=True, choices=['FROM',
-                                               'TO']),
-        config_layer=dict(required=True, choices=['MEMORY',
-                                                  'DISK',
-                                                  'RUNTIME',
-                                                  'CONFIG'])
+        action=dict(choices=['LOAD',
+                             'SAVE']),
+        config_settings=dict(type='list', elements='str',
+                             choices=['MYSQL USERS',
+                                      'MYSQL SERVERS',
+                                      'MYSQL QUERY RULES',
+                                      'MYSQL VARIABLES',
+                                      'PGSQL USERS',
+                                      'PGSQL SERVERS',
+                                      'PGSQL QUERY RULES',
+                                      'PGSQL VARIABLES',
+                                      'ADMIN VARIABLES',
+                                      'SCHEDULER',
+                                      'PROXYSQL SERVERS']),
+        direction=dict(choices=['FROM',
+                                'TO']),
+        config_layer=dict(choices=['MEMORY',
+                                   'DISK',
+                                   'RUNTIME',
+                                   'CONFIG']),
+        flush_deferred=dict(default=False, type='bool'),
+        skip_if_unchanged=dict(default=False, type='bool')
     )
+    argument_spec.update(proxysql_cluster_argument_spec())
 
     module = AnsibleModule(
         supports_check_mode=True,
-        argument_spec=argument_spec
+        argument_spec=argument_spec,
+        required_if=[('flush_deferred', False,
+                      ['action', 'config_settings', 'direction',
+                       'config_layer'])]
     )
 
     perform_checks(module)
 
+    if module.params["cluster_timeout"] < 0:
+        module.fail_json(msg="cluster_timeout must be 0 or greater")
+    if module.params["cluster_poll_interval"] <= 0:
+        module.fail_json(msg="cluster_poll_interval must be greater than 0")
+
     login_user = module.params["login_user"]
     login_password = module.params["login_password"]
     config_file = module.params["config_file"]
@@ -192,7 +421,8 @@ def main():
         cursor, db_conn, version = mysql_connect(module,
                                                  login_user,
                                                  login_password,
-                                                 config_file)
+                                                 config_file,
+                                                 cursor_class='DictCursor')
     except mysql_driver.Error as e:
         module.fail_json(
             msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
@@ -200,17 +430,55 @@ def main():
 
     result = {}
 
-    manage_config_settings = \
-        [action, config_settings, direction, config_layer]
-
+    if module.params["flush_deferred"]:
+        try:
+            with deferred_flush(deferred_flush_path(module)) as pending:
+                result['flushed'] = flush_deferred_config(pending, cursor,
+                                                          module.check_mode)
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to flush deferred config.. %s" % to_native(e)
+            )
+        result['changed'] = bool(result['flushed'])
+        wait_for_peers(module, cursor, result, runtime_loaded(result['flushed']))
+        module.exit_json(**result)
+
+    results = []
     try:
-        result['changed'] = manage_config(manage_config_settings,
-                                          cursor, module.check_mode)
+        for family in sorted(set(config_settings), key=DEFERRED_FLUSH_ORDER.index):
+            manage_config_settings = [action, family, direction, config_layer]
+            item = dict(config_settings=family,
+                        statement=' '.join(manage_config_settings))
+            results.append(item)
+            started = time.monotonic()
+
+            unchanged = None
+            if module.params["skip_if_unchanged"]:
+                unchanged = config_unchanged(manage_config_settings, cursor)
+            if unchanged:
+                item['changed'] = False
+                item['msg'] = "%s already match in %s and %s" % (
+                    (family,) + unchanged)
+            else:
+                item['changed'] = manage_config(manage_config_settings,
+                                                cursor, module.check_mode)
+            item['elapsed'] = round(time.monotonic() - started, 3)
     except mysql_driver.Error as e:
         module.fail_json(
-            msg="unable to manage config.. %s" % to_native(e)
+            msg="unable to manage config.. %s" % to_native(e),
+            results=results
         )
 
+    result['results'] = results
+    result['changed'] = any(item['changed'] for item in results)
+    if results and not result['changed']:
+        result['msg'] = "%s already match in %s and %s" % (
+            (", ".join(item['config_settings'] for item in results),) + unchanged)
+
+    if CONFIG_TRANSFERS.get((action, direction, config_layer), (None, None))[1] == 'RUNTIME':
+        wait_for_peers(module, cursor, result,
+                       [item['config_settings'] for item in results if item['changed']])
+
     module.exit_json(**result)
 
 
@@ -18,8 +18,8 @@ options:
   username:
     description:
       - Name of the user connecting to the mysqld or ProxySQL instance.
+      - Required unless I(users) is used.
     type: str
-    required: true
   password:
     description:
       - Password of the user connecting to the mysqld or ProxySQL instance.
@@ -39,8 +39,10 @@ options:
   salt:
     description:
       - Salt used when I(encryption_method) is set to C(caching_sha2_password).
-        If omitted the I(salt) is a randomly generated string and will change
-        value in ProxySQL database on each execution.
+      - If omitted and the user already has a C(caching_sha2_password) hash,
+        the password is hashed with the salt of that hash, so an unchanged
+        password is not written again. A randomly generated salt is used for
+        new users and when the password changed.
     type: str
     version_added: 1.7.0
   active:
@@ -105,6 +107,99 @@ options:
     type: str
     choices: [ "present", "absent" ]
     default: present
+  users:
+    description:
+      - A list of users to manage in a single run.
+      - The C(mysql_users) table is read once, the passwords are hashed and
+        the required inserts, updates and deletes are computed in memory,
+        then written with multi-row statements followed by a single save to
+        disk and load to runtime.
+      - I(backend), I(frontend), I(encrypt_password) and I(encryption_method)
+        default to the value of the module option of the same name.
+      - Options that are omitted from an item are not managed, their current
+        value is left untouched.
+      - With I(state=absent) the listed users are removed.
+      - Mutually exclusive with I(username) and the other single user
+        options.
+    type: list
+    elements: dict
+    version_added: '1.9.0'
+    suboptions:
+      username:
+        description:
+          - Name of the user.
+        type: str
+        required: true
+      password:
+        description:
+          - Password of the user, see I(encrypt_password).
+        type: str
+      encrypt_password:
+        description:
+          - Encrypt I(password) using I(encryption_method).
+        type: bool
+      encryption_method:
+        description:
+          - Encryption method used when I(encrypt_password) is set.
+        type: str
+        choices: [ "mysql_native_password", "caching_sha2_password" ]
+      salt:
+        description:
+          - Salt used with C(caching_sha2_password), see the module option.
+        type: str
+      active:
+        description:
+          - See the module option.
+        type: bool
+      use_ssl:
+        description:
+          - See the module option.
+        type: bool
+      default_hostgroup:
+        description:
+          - See the module option.
+        type: int
+      default_schema:
+        description:
+          - See the module option.
+        type: str
+      transaction_persistent:
+        description:
+          - See the module option.
+        type: bool
+      fast_forward:
+        description:
+          - See the module option.
+        type: bool
+      backend:
+        description:
+          - See the module option.
+        type: bool
+      frontend:
+        description:
+          - See the module option.
+        type: bool
+      max_connections:
+        description:
+          - See the module option.
+        type: int
+  purge:
+    description:
+      - Only used with I(users) and I(state=present).
+      - If C(True), users that exist in C(mysql_users) but are not listed in
+        I(users) are deleted.
+    type: bool
+    default: false
+    version_added: '1.9.0'
+  hash_workers:
+    description:
+      - Only used with I(users).
+      - Number of processes computing the C(caching_sha2_password) hashes.
+        The hashes are computed in the module process when there are only a
+        few of them, when set to C(1) or when the platform can't fork.
+      - Defaults to the number of CPUs.
+    type: int
+    version_added: '1.9.0'
 extends_documentation_fragment:
 - community.proxysql.proxysql.managing_config
 - community.proxysql.proxysql.connectivity
@@ -139,6 +234,25 @@ EXAMPLES = '''
     config_file: '~/proxysql.cnf'
     username: 'mysqlboy'
     state: absent
+
+# This example manages all application users in a single task, users that are
+# not listed are removed, and the users are saved to disk and loaded to
+# runtime once.
+
+- name: Manage all users
+  community.proxysql.proxysql_mysql_users:
+    login_user: 'admin'
+    login_password: 'admin'
+    encrypt_password: true
+    encryption_method: caching_sha2_password
+    users:
+      - username: app_ro
+        password: "{{ app_ro_password }}"
+        default_hostgroup: 2
+      - username: app_rw
+        password: "{{ app_rw_password }}"
+        default_hostgroup: 1
+    purge: true
 '''
 
 RETURN = '''
@@ -165,16 +279,44 @@ stdout:
             use_ssl: 0
             username: guest_ro
         username: guest_ro
+users_added:
+    description: The I(username) of the users added when I(users) is used.
+    returned: When I(users) is used.
+    type: list
+    elements: str
+    sample: ["app_ro", "app_rw"]
+    version_added: '1.9.0'
+users_updated:
+    description: The I(username) of the users updated when I(users) is used.
+    returned: When I(users) is used.
+    type: list
+    elements: str
+    sample: ["app_batch"]
+    version_added: '1.9.0'
+users_deleted:
+    description: The I(username) of the users deleted when I(users) is used.
+    returned: When I(users) is used.
+    type: list
+    elements: str
+    sample: ["old_app"]
+    version_added: '1.9.0'
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
+    row_key,
     mysql_sha256_password_hash,
+    mysql_sha256_password_hashes,
+    mysql_sha256_password_salt,
     generate_random_salt,
 )
 from ansible.module_utils._text import to_native, to_bytes
@@ -203,181 +345,141 @@ def encrypt_cleartext_password(password_to_encrypt, encryption_method, salt):
     return encrypted_password
 
 
+def _matches_stored_password(encrypted_password, stored_password):
+    return stored_password in (encrypted_password,
+                               encrypted_password.encode().hex().upper())
+
+
+def encrypt_cleartext_passwords(passwords, hash_workers=None):
+    """Hash many cleartext passwords at once.
+
+    passwords is a list of (cleartext_password, encryption_method, salt,
+    stored_password) tuples and the hashes are returned in the same order.
+    A caching_sha2_password without a salt is first hashed with the salt of
+    stored_password, which is kept when it still matches, and with a new
+    random salt otherwise.
+    """
+    encrypted = [None] * len(passwords)
+    sha2_jobs = []
+    stored_salt_jobs = []
+
+    for i, (cleartext_password, method, salt, stored_password) in enumerate(passwords):
+        if method != "caching_sha2_password":
+            encrypted[i] = encrypt_cleartext_password(cleartext_password,
+                                                      encryption_method_map[method],
+                                                      salt)
+            continue
+
+        if salt is None:
+            salt = mysql_sha256_password_salt(stored_password)
+            if salt is not None:
+                stored_salt_jobs.append(i)
+            else:
+                salt = generate_random_salt()
+        sha2_jobs.append((i, cleartext_password, salt))
+
+    hashes = mysql_sha256_password_hashes(
+        [(password, salt) for i, password, salt in sha2_jobs], hash_workers)
+    for (i, password, salt), encrypted_password in zip(sha2_jobs, hashes):
+        encrypted[i] = encrypted_password
+
+    changed = []
+    for i in stored_salt_jobs:
+        if _matches_stored_password(encrypted[i], passwords[i][3]):
+            encrypted[i] = passwords[i][3]
+        else:
+            changed.append(i)
+
+    hashes = mysql_sha256_password_hashes(
+        [(passwords[i][0], generate_random_salt()) for i in changed], hash_workers)
+    for i, encrypted_password in zip(changed, hashes):
+        encrypted[i] = encrypted_password
+
+    return encrypted
+
+
 encryption_method_map = {
     'mysql_native_password': _mysql_native_password,
     'caching_sha2_password': _caching_sha2_password
 }
 
 
+USER_KEY_COLUMNS = ["username", "backend", "frontend"]
+
+USER_CONFIG_KEYS = ["password",
+                    "active",
+                    "use_ssl",
+                    "default_hostgroup",
+                    "default_schema",
+                    "transaction_persistent",
+                    "fast_forward",
+                    "max_connections"]
+
+# Module options used for the items of users that don't set them.
+USER_ITEM_DEFAULT_KEYS = ["backend", "frontend", "encrypt_password",
+                          "encryption_method"]
+
+
 class ProxySQLUser(object):
 
     def __init__(self, module):
         self.state = module.params["state"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
 
         self.username = module.params["username"]
         self.backend = module.params["backend"]
         self.frontend = module.params["frontend"]
         self.salt = module.params["salt"]
 
-        config_data_keys = ["password",
-                            "active",
-                            "use_ssl",
-                            "default_hostgroup",
-                            "default_schema",
-                            "transaction_persistent",
-                            "fast_forward",
-                            "max_connections"
-                            ]
+        self.key_data = dict((k, module.params[k])
+                             for k in USER_KEY_COLUMNS)
 
         self.config_data = dict((k, module.params[k])
-                                for k in config_data_keys)
-
-        if module.params["password"] is not None and module.params["encrypt_password"]:
-            encryption_method = encryption_method_map[module.params["encryption_method"]]
-            salt = module.params["salt"]
-            encrypted_password = encrypt_cleartext_password(module.params["password"], encryption_method, salt)
-            self.config_data["password"] = encrypted_password
-
-    def check_user_config_exists(self, cursor):
-        query_string = \
-            """SELECT count(*) AS `user_count`
-               FROM mysql_users
-               WHERE username = %s
-                 AND backend = %s
-                 AND frontend = %s"""
-
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['user_count']) > 0)
-
-    def check_user_privs(self, cursor):
-        query_string = \
-            """SELECT count(*) AS `user_count`
-               FROM mysql_users
-               WHERE username = %s
-                 AND backend = %s
-                 AND frontend = %s"""
-
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += "\n  AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['user_count']) > 0)
+                                for k in USER_CONFIG_KEYS)
 
-    def get_user_config(self, cursor):
-        query_string = \
-            """SELECT *
-               FROM mysql_users
-               WHERE username = %s
-                 AND backend = %s
-                 AND frontend = %s"""
-
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        cursor.execute(query_string, query_data)
-        user = cursor.fetchone()
-        return user
-
-    def create_user_config(self, cursor):
-        query_string = \
-            """INSERT INTO mysql_users (
-               username,
-               backend,
-               frontend"""
-
-        cols = 3
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                query_string += ",\n" + col
-
-        query_string += \
-            (")\n" +
-             "VALUES (" +
-             "%s ," * cols)
-
-        query_string = query_string[:-2]
-        query_string += ")"
-
-        cursor.execute(query_string, query_data)
-        return True
-
-    def update_user_config(self, cursor):
-        query_string = """UPDATE mysql_users"""
-
-        cols = 0
-        query_data = []
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                if cols == 1:
-                    query_string += "\nSET " + col + "= %s,"
-                else:
-                    query_string += "\n    " + col + " = %s,"
+        self.encrypt_password = module.params["encrypt_password"]
+        self.encryption_method = module.params["encryption_method"]
 
-        query_string = query_string[:-1]
-        query_string += ("\nWHERE username = %s\n  AND backend = %s" +
-                         "\n  AND frontend = %s")
+    def set_encrypted_password(self, user):
+        cleartext_password = self.config_data["password"]
+        if cleartext_password is None or not self.encrypt_password:
+            return
 
-        query_data.append(self.username)
-        query_data.append(self.backend)
-        query_data.append(self.frontend)
+        stored_password = user["password"] if user else None
+        self.config_data["password"] = encrypt_cleartext_passwords(
+            [(cleartext_password, self.encryption_method, self.salt,
+              stored_password)], hash_workers=1)[0]
 
-        cursor.execute(query_string, query_data)
-        return True
-
-    def delete_user_config(self, cursor):
-        query_string = \
-            """DELETE FROM mysql_users
-               WHERE username = %s
-                 AND backend = %s
-                 AND frontend = %s"""
+    def get_users_config(self, cursor):
+        return fetch_table(cursor, "mysql_users", USER_KEY_COLUMNS,
+                           match=self.key_data)
 
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        cursor.execute(query_string, query_data)
+    def get_user_config(self, cursor):
+        users = self.get_users_config(cursor)
+        return users.get(row_key(self.key_data, USER_KEY_COLUMNS))
+
+    def compute_changes(self, current_users):
+        if self.state == "present":
+            user = dict(self.key_data)
+            user.update(self.config_data)
+            return compute_changeset(current_users, USER_KEY_COLUMNS,
+                                     present=[user])
+        return compute_changeset(current_users, USER_KEY_COLUMNS,
+                                 absent=[self.key_data])
+
+    def apply_user_config(self, cursor, changeset):
+        apply_changeset(cursor, "mysql_users", USER_KEY_COLUMNS, changeset)
         return True
 
     def manage_config(self, cursor, state):
         if state:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "USERS")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "USERS")
+            flush_config(cursor, self.params, self.flush_state, "USERS")
 
-    def create_user(self, check_mode, result, cursor):
+    def create_user(self, check_mode, result, cursor, changeset):
         if not check_mode:
             result['changed'] = \
-                self.create_user_config(cursor)
+                self.apply_user_config(cursor, changeset)
             result['msg'] = "Added user to mysql_users"
             result['user'] = \
                 self.get_user_config(cursor)
@@ -389,13 +491,13 @@ class ProxySQLUser(object):
                              " mysql_users, however check_mode" +
                              " is enabled.")
 
-    def update_user(self, check_mode, result, cursor):
+    def update_user(self, check_mode, result, cursor, changeset, user):
         if not check_mode:
             result['changed'] = \
-                self.update_user_config(cursor)
+                self.apply_user_config(cursor, changeset)
             result['msg'] = "Updated user in mysql_users"
             result['user'] = \
-                self.get_user_config(cursor)
+                merge_changes(user, changeset['update'][0][1])
             self.manage_config(cursor,
                                result['changed'])
         else:
@@ -404,12 +506,11 @@ class ProxySQLUser(object):
                              " mysql_users, however check_mode" +
                              " is enabled.")
 
-    def delete_user(self, check_mode, result, cursor):
+    def delete_user(self, check_mode, result, cursor, changeset, user):
         if not check_mode:
-            result['user'] = \
-                self.get_user_config(cursor)
+            result['user'] = user
             result['changed'] = \
-                self.delete_user_config(cursor)
+                self.apply_user_config(cursor, changeset)
             result['msg'] = "Deleted user from mysql_users"
             self.manage_config(cursor,
                                result['changed'])
@@ -419,6 +520,97 @@ class ProxySQLUser(object):
                              " mysql_users, however check_mode is" +
                              " enabled.")
 
+
+class ProxySQLUserSet(object):
+
+    def __init__(self, module):
+        self.state = module.params["state"]
+        self.purge = module.params["purge"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
+        self.hash_workers = module.params["hash_workers"]
+
+        self.users = dict()
+        self.encryption = dict()
+
+        for user in module.params["users"]:
+            values = dict(user)
+            for col in USER_ITEM_DEFAULT_KEYS:
+                if values[col] is None:
+                    values[col] = module.params[col]
+
+            key = row_key(values, USER_KEY_COLUMNS)
+            if key in self.users:
+                module.fail_json(
+                    msg="username %s is listed more than once in users" %
+                        values["username"]
+                )
+
+            self.users[key] = dict((col, values[col]) for col in
+                                   USER_KEY_COLUMNS + USER_CONFIG_KEYS)
+            self.encryption[key] = None
+            if values["password"] is not None and values["encrypt_password"]:
+                self.encryption[key] = (values["encryption_method"],
+                                        values["salt"])
+
+    def get_users_config(self, cursor):
+        return fetch_table(cursor, "mysql_users", USER_KEY_COLUMNS)
+
+    def set_encrypted_passwords(self, current_users):
+        keys = [key for key, encryption in self.encryption.items()
+                if encryption is not None]
+        passwords = []
+        for key in keys:
+            stored_user = current_users.get(key)
+            encryption_method, salt = self.encryption[key]
+            passwords.append((self.users[key]["password"], encryption_method,
+                              salt,
+                              stored_user["password"] if stored_user else None))
+
+        encrypted = encrypt_cleartext_passwords(passwords, self.hash_workers)
+        for key, encrypted_password in zip(keys, encrypted):
+            self.users[key]["password"] = encrypted_password
+
+    def compute_changes(self, current_users):
+        users = list(self.users.values())
+
+        if self.state == "present":
+            self.set_encrypted_passwords(current_users)
+            return compute_changeset(current_users, USER_KEY_COLUMNS,
+                                     present=users, purge=self.purge)
+        return compute_changeset(current_users, USER_KEY_COLUMNS,
+                                 absent=users)
+
+    def manage_config(self, cursor, state):
+        if state:
+            flush_config(cursor, self.params, self.flush_state, "USERS")
+
+    def apply_users(self, check_mode, result, cursor):
+        current_users = self.get_users_config(cursor)
+        changeset = self.compute_changes(current_users)
+
+        result['users_added'] = [user["username"]
+                                 for user in changeset['insert']]
+        result['users_updated'] = [key["username"]
+                                   for key, changes in changeset['update']]
+        result['users_deleted'] = [key["username"]
+                                   for key in changeset['delete']]
+        result['changed'] = any(changeset.values())
+
+        if not result['changed']:
+            result['msg'] = ("The users in mysql_users don't need to" +
+                             " be updated.")
+        elif check_mode:
+            result['msg'] = ("Users would have been updated in" +
+                             " mysql_users, however check_mode" +
+                             " is enabled.")
+        else:
+            apply_changeset(cursor, "mysql_users", USER_KEY_COLUMNS,
+                            changeset, current=current_users)
+            result['msg'] = "Updated users in mysql_users"
+            self.manage_config(cursor,
+                               result['changed'])
+
 # ===========================================
 # Module execution.
 #
@@ -427,7 +619,7 @@ class ProxySQLUser(object):
 def main():
     argument_spec = proxysql_common_argument_spec()
     argument_spec.update(
-        username=dict(required=True, type='str'),
+        username=dict(type='str'),
         password=dict(no_log=True, type='str'),
         salt=dict(no_log=True, type='str'),
         encrypt_password=dict(default=False, type='bool', no_log=False),
@@ -444,12 +636,34 @@ def main():
         state=dict(default='present', choices=['present',
                                                'absent']),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool'),
+        users=dict(type='list', elements='dict', options=dict(
+            username=dict(required=True, type='str'),
+            password=dict(no_log=True, type='str'),
+            salt=dict(no_log=True, type='str'),
+            encrypt_password=dict(type='bool', no_log=False),
+            encryption_method=dict(choices=list(encryption_method_map.keys())),
+            active=dict(type='bool'),
+            use_ssl=dict(type='bool'),
+            default_hostgroup=dict(type='int'),
+            default_schema=dict(type='str'),
+            transaction_persistent=dict(type='bool'),
+            fast_forward=dict(type='bool'),
+            backend=dict(type='bool'),
+            frontend=dict(type='bool'),
+            max_connections=dict(type='int'),
+        )),
+        purge=dict(default=False, type='bool'),
+        hash_workers=dict(type='int')
     )
 
     module = AnsibleModule(
         supports_check_mode=True,
-        argument_spec=argument_spec
+        argument_spec=argument_spec,
+        required_one_of=[('username', 'users')],
+        mutually_exclusive=[('users', k) for k in
+                            ["username", "salt"] + USER_CONFIG_KEYS]
     )
 
     login_user = module.params["login_user"]
@@ -468,30 +682,57 @@ def main():
             msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
         )
 
-    proxysql_user = ProxySQLUser(module)
     result = {}
 
+    if module.params["users"] is not None:
+        proxysql_user_set = ProxySQLUserSet(module)
+        result['state'] = proxysql_user_set.state
+        try:
+            proxysql_user_set.apply_users(module.check_mode,
+                                          result,
+                                          cursor)
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to modify users.. %s" % to_native(e)
+            )
+        module.exit_json(**result)
+
+    proxysql_user = ProxySQLUser(module)
+
     result['state'] = proxysql_user.state
     if proxysql_user.username:
         result['username'] = proxysql_user.username
 
+    try:
+        current_users = proxysql_user.get_users_config(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read users.. %s" % to_native(e)
+        )
+
+    user = current_users.get(row_key(proxysql_user.key_data,
+                                     USER_KEY_COLUMNS))
+    proxysql_user.set_encrypted_password(user)
+    changeset = proxysql_user.compute_changes(current_users)
+
     if proxysql_user.state == "present":
         try:
-            if not proxysql_user.check_user_privs(cursor):
-                if not proxysql_user.check_user_config_exists(cursor):
-                    proxysql_user.create_user(module.check_mode,
-                                              result,
-                                              cursor)
-                else:
-                    proxysql_user.update_user(module.check_mode,
-                                              result,
-                                              cursor)
+            if changeset['insert']:
+                proxysql_user.create_user(module.check_mode,
+                                          result,
+                                          cursor,
+                                          changeset)
+            elif changeset['update']:
+                proxysql_user.update_user(module.check_mode,
+                                          result,
+                                          cursor,
+                                          changeset,
+                                          user)
             else:
                 result['changed'] = False
                 result['msg'] = ("The user already exists in mysql_users" +
                                  " and doesn't need to be updated.")
-                result['user'] = \
-                    proxysql_user.get_user_config(cursor)
+                result['user'] = user
         except mysql_driver.Error as e:
             module.fail_json(
                 msg="unable to modify user.. %s" % to_native(e)
@@ -499,10 +740,12 @@ def main():
 
     elif proxysql_user.state == "absent":
         try:
-            if proxysql_user.check_user_config_exists(cursor):
+            if changeset['delete']:
                 proxysql_user.delete_user(module.check_mode,
                                           result,
-                                          cursor)
+                                          cursor,
+                                          changeset,
+                                          user)
             else:
                 result['changed'] = False
                 result['msg'] = ("The user is already absent from the" +
@@ -212,15 +212,23 @@ stdout:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
+    row_key,
 )
 from ansible.module_utils._text import to_native
 
 
+KEY_COLUMNS = ["hostgroup_id"]
+
+
 def validate_args(module):
     if not module.params["hostgroup_id"] >= 0:
         module.fail_json(
@@ -250,8 +258,8 @@ class ProxySQLPgSQLHostgroupAttributes(object):
 
     def __init__(self, module, version):
         self.state = module.params["state"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
         self.check_mode = module.check_mode
 
         self.hostgroup_id = module.params["hostgroup_id"]
@@ -269,28 +277,27 @@ class ProxySQLPgSQLHostgroupAttributes(object):
         self.servers_defaults = module.params["servers_defaults"]
         self.comment = module.params["comment"]
 
-    def check_exists(self, cursor, keys):
-        query_string = ("SELECT count(*) AS `attributes`"
-                        " FROM pgsql_hostgroup_attributes"
-                        " WHERE hostgroup_id = %s")
-
-        cursor.execute(query_string, [self.hostgroup_id])
-        check_count = cursor.fetchone()
-        return (int(check_count['attributes']) > 0)
+    def fetch(self, cursor):
+        return fetch_table(cursor, "pgsql_hostgroup_attributes", KEY_COLUMNS,
+                           match={'hostgroup_id': self.hostgroup_id})
 
     def select(self, cursor):
-        query_string = ("SELECT * FROM pgsql_hostgroup_attributes"
-                        " WHERE hostgroup_id = %s")
-
-        query_data = [self.hostgroup_id]
-
-        cursor.execute(query_string, query_data)
-        repl_group = cursor.fetchone()
-        return repl_group
-
-    def create(self, result, cursor):
+        return self.fetch(cursor).get(
+            row_key({'hostgroup_id': self.hostgroup_id}, KEY_COLUMNS))
+
+    def changeset(self, current):
+        if self.state == "present":
+            fields = self._as_fields()
+            for row in current.values():
+                # Skip columns the running version does not have.
+                fields = {k: v for k, v in fields.items() if k in row}
+            return compute_changeset(current, KEY_COLUMNS, present=[fields])
+        return compute_changeset(current, KEY_COLUMNS,
+                                 absent=[{'hostgroup_id': self.hostgroup_id}])
+
+    def create(self, result, cursor, changeset):
         if not self.check_mode:
-            result['changed'] = self._insert(cursor)
+            result['changed'] = self._apply(cursor, changeset)
             result['msg'] = "Added entry to pgsql_hostgroup_attributes"
             result['pgsql_hostgroup_attributes'] = self.select(cursor)
             self.manage_config(cursor, result['changed'])
@@ -300,10 +307,10 @@ class ProxySQLPgSQLHostgroupAttributes(object):
                              " pgsql_hostgroup_attributes, however" +
                              " check_mode is enabled.")
 
-    def delete(self, result, cursor):
+    def delete(self, result, cursor, changeset, current):
         if not self.check_mode:
-            result['pgsql_hostgroup_attributes'] = self.select(cursor)
-            result['changed'] = self._delete(cursor)
+            result['pgsql_hostgroup_attributes'] = current
+            result['changed'] = self._apply(cursor, changeset)
             result['msg'] = "Deleted entry from pgsql_hostgroup_attributes"
             self.manage_config(cursor, result['changed'])
         else:
@@ -312,11 +319,12 @@ class ProxySQLPgSQLHostgroupAttributes(object):
                              " from pgsql_hostgroup_attributes, however" +
                              " check_mode is enabled.")
 
-    def update(self, result, cursor):
+    def update(self, result, cursor, changeset, current):
         if not self.check_mode:
-            result['changed'] = self._update(cursor)
+            result['changed'] = self._apply(cursor, changeset)
             result['msg'] = "Updated entry in pgsql_hostgroup_attributes"
-            result['pgsql_hostgroup_attributes'] = self.select(cursor)
+            result['pgsql_hostgroup_attributes'] = \
+                merge_changes(current, changeset['update'][0][1])
             self.manage_config(cursor, result['changed'])
         else:
             result['changed'] = True
@@ -324,55 +332,15 @@ class ProxySQLPgSQLHostgroupAttributes(object):
                              " from pgsql_hostgroup_attributes, however" +
                              " check_mode is enabled.")
 
-    def _insert(self, cursor):
-        fields = self._as_fields()
-
-        query_string = \
-            "INSERT INTO pgsql_hostgroup_attributes (" \
-            + ", ".join(list(fields.keys())) \
-            + ") VALUES (" + ", ".join(["%s" for f in fields.values()]) + ")"
-
-        query_data = list(fields.values())
-
-        cursor.execute(query_string, query_data)
-
-        return True
-
-    def _delete(self, cursor):
-        query_string = ("DELETE FROM pgsql_hostgroup_attributes WHERE hostgroup_id = %s")
-
-        cursor.execute(query_string, [self.hostgroup_id])
-
-        return True
-
-    def _update(self, cursor):
-        current = self.select(cursor)
-        new = self._as_fields()
-
-        to_update = {
-            k: v for k, v in new.items()
-            # Use get with default for table changes.
-            if str(current.get(k, '')) != str(v)
-        }
-
-        if len(to_update) == 0:
-            return False
-
-        query = \
-            "UPDATE pgsql_hostgroup_attributes SET " \
-            + ", ".join([f"{k} = %s" for k in to_update.keys()]) \
-            + " WHERE hostgroup_id = %s"
-        args = [*list(to_update.values()), self.hostgroup_id]
-        cursor.execute(query, args)
+    def _apply(self, cursor, changeset):
+        apply_changeset(cursor, "pgsql_hostgroup_attributes", KEY_COLUMNS,
+                        changeset)
         return True
 
     def manage_config(self, cursor, state):
         if state and not self.check_mode:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "SERVERS", "pgsql")
-
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "SERVERS", "pgsql")
+            flush_config(cursor, self.params, self.flush_state,
+                         "SERVERS", "pgsql")
 
     def _as_fields(self):
         return {
@@ -401,6 +369,7 @@ def main():
                                                'absent']),
         save_to_disk=dict(default=True, type='bool'),
         load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool'),
 
         hostgroup_id=dict(required=True, type='int'),
         max_num_online_servers=dict(type='int', default=1000000),
@@ -445,12 +414,28 @@ def main():
     result['state'] = hostgroup_attributes.state
     result['changed'] = False
 
+    try:
+        current = hostgroup_attributes.fetch(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="Unable to read hostgroup attributes.. %s" % to_native(e)
+        )
+
+    attributes = next(iter(current.values()), None)
+    changeset = hostgroup_attributes.changeset(current)
+
     if hostgroup_attributes.state == "present":
         try:
-            if not hostgroup_attributes.check_exists(cursor, keys=True):
-                hostgroup_attributes.create(result, cursor)
+            if changeset['insert']:
+                hostgroup_attributes.create(result, cursor, changeset)
+            elif changeset['update']:
+                hostgroup_attributes.update(result, cursor, changeset,
+                                            attributes)
             else:
-                hostgroup_attributes.update(result, cursor)
+                result['msg'] = ("The entry already exists in" +
+                                 " pgsql_hostgroup_attributes and" +
+                                 " doesn't need to be updated.")
+                result['pgsql_hostgroup_attributes'] = attributes
 
         except mysql_driver.Error as e:
             module.fail_json(
@@ -459,8 +444,9 @@ def main():
 
     elif hostgroup_attributes.state == "absent":
         try:
-            if hostgroup_attributes.check_exists(cursor, keys=True):
-                hostgroup_attributes.delete(result, cursor)
+            if changeset['delete']:
+                hostgroup_attributes.delete(result, cursor, changeset,
+                                            attributes)
             else:
                 result['changed'] = False
                 result['msg'] = ("The pgsql_hostgroup_attributes is absent" +
@@ -209,6 +209,7 @@ options:
 extends_documentation_fragment:
 - community.proxysql.proxysql.managing_config
 - community.proxysql.proxysql.connectivity
+- community.proxysql.proxysql.regex_check
 attributes:
   check_mode:
     description: Do not make any changes to memory, disk, or runtime.
@@ -299,11 +300,15 @@ stdout:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    check_rule_regexes,
+    compute_changeset,
+    fetch_table,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    proxysql_regex_check_argument_spec,
+    deferred_flush_path,
+    flush_config,
 )
 from ansible.module_utils._text import to_native
 
@@ -317,8 +322,8 @@ class ProxySQLPgSQLQueryRule(object):
     def __init__(self, module):
         self.state = module.params["state"]
         self.force_delete = module.params["force_delete"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
 
         config_data_keys = ["rule_id",
                             "active",
@@ -358,17 +363,9 @@ class ProxySQLPgSQLQueryRule(object):
         self.config_data = dict((k, module.params[k])
                                 for k in config_data_keys)
 
-    def check_rule_pk_exists(self, cursor):
-        query_string = ("SELECT count(*) AS `rule_count`"
-                        " FROM pgsql_query_rules"
-                        " WHERE rule_id = %s")
-
-        query_data = \
-            [self.config_data["rule_id"]]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['rule_count']) > 0)
+    def get_rule_pk_config(self, cursor):
+        return fetch_table(cursor, "pgsql_query_rules", ["rule_id"],
+                           match={"rule_id": self.config_data["rule_id"]})
 
     def check_rule_cfg_exists(self, cursor):
         query_string = ("SELECT count(*) AS `rule_count`"
@@ -497,12 +494,8 @@ class ProxySQLPgSQLQueryRule(object):
 
     def manage_config(self, cursor, state):
         if state:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "QUERY RULES",
-                                    variable="pgsql")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "QUERY RULES",
-                                       variable="pgsql")
+            flush_config(cursor, self.params, self.flush_state,
+                         "QUERY RULES", "pgsql")
 
     def create_rule(self, check_mode, result, cursor):
         if not check_mode:
@@ -595,8 +588,10 @@ def main():
                                                'absent']),
         force_delete=dict(default=False, type='bool'),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool')
     )
+    argument_spec.update(proxysql_regex_check_argument_spec())
 
     module = AnsibleModule(
         supports_check_mode=True,
@@ -625,17 +620,47 @@ def main():
     result['state'] = proxysql_query_rule.state
 
     if proxysql_query_rule.state == "present":
+        try:
+            check_rule_regexes(module, cursor,
+                               [proxysql_query_rule.config_data], "pgsql")
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to read the query digest.. %s" % to_native(e)
+            )
+
+    if proxysql_query_rule.state == "present" and \
+       proxysql_query_rule.config_data["rule_id"] is not None:
+        # A rule given by rule_id is looked up by primary key only.
+        try:
+            current_rules = proxysql_query_rule.get_rule_pk_config(cursor)
+            changeset = compute_changeset(current_rules, ["rule_id"],
+                                          present=[proxysql_query_rule.config_data])
+            if changeset['insert']:
+                proxysql_query_rule.create_rule(module.check_mode,
+                                                result,
+                                                cursor)
+            elif changeset['update']:
+                proxysql_query_rule.update_rule(module.check_mode,
+                                                result,
+                                                cursor)
+            else:
+                result['changed'] = False
+                result['msg'] = ("The rule already exists in" +
+                                 " pgsql_query_rules and doesn't need to be" +
+                                 " updated.")
+                result['rules'] = list(current_rules.values())
+
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to modify rule.. %s" % to_native(e)
+            )
+
+    elif proxysql_query_rule.state == "present":
         try:
             if not proxysql_query_rule.check_rule_cfg_exists(cursor):
-                if proxysql_query_rule.config_data["rule_id"] and \
-                   proxysql_query_rule.check_rule_pk_exists(cursor):
-                    proxysql_query_rule.update_rule(module.check_mode,
-                                                    result,
-                                                    cursor)
-                else:
-                    proxysql_query_rule.create_rule(module.check_mode,
-                                                    result,
-                                                    cursor)
+                proxysql_query_rule.create_rule(module.check_mode,
+                                                result,
+                                                cursor)
             else:
                 result['changed'] = False
                 result['msg'] = ("The rule already exists in" +
@@ -166,11 +166,16 @@ stdout:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
+    row_key,
 )
 from ansible.module_utils._text import to_native
 
@@ -201,17 +206,23 @@ def perform_checks(module):
             )
 
 
+SERVER_KEY_COLUMNS = ["hostgroup_id", "hostname", "port"]
+
+
 class ProxySQLPgSQLServer(object):
 
     def __init__(self, module):
         self.state = module.params["state"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
 
         self.hostgroup_id = module.params["hostgroup_id"]
         self.hostname = module.params["hostname"]
         self.port = module.params["port"]
 
+        self.key_data = dict((k, module.params[k])
+                             for k in SERVER_KEY_COLUMNS)
+
         config_data_keys = ["status",
                             "weight",
                             "compression",
@@ -224,145 +235,37 @@ class ProxySQLPgSQLServer(object):
         self.config_data = dict((k, module.params[k])
                                 for k in config_data_keys)
 
-    def check_server_config_exists(self, cursor):
-        query_string = ("SELECT count(*) AS `host_count`"
-                        " FROM pgsql_servers"
-                        " WHERE hostgroup_id = %s"
-                        "   AND hostname = %s"
-                        "   AND port = %s")
-
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['host_count']) > 0)
-
-    def check_server_config(self, cursor):
-        query_string = ("SELECT count(*) AS `host_count`"
-                        " FROM pgsql_servers"
-                        " WHERE hostgroup_id = %s"
-                        "   AND hostname = %s"
-                        "   AND port = %s")
-
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += "\n  AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-
-        if isinstance(check_count, tuple):
-            return int(check_count[0]) > 0
-
-        return (int(check_count['host_count']) > 0)
+    def get_servers_config(self, cursor):
+        return fetch_table(cursor, "pgsql_servers", SERVER_KEY_COLUMNS,
+                           match=self.key_data)
 
     def get_server_config(self, cursor):
-        query_string = ("SELECT * FROM pgsql_servers"
-                        " WHERE hostgroup_id = %s"
-                        "   AND hostname = %s"
-                        "   AND port = %s")
-
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        cursor.execute(query_string, query_data)
-        server = cursor.fetchone()
-        return server
-
-    def create_server_config(self, cursor):
-        query_string = \
-            """INSERT INTO pgsql_servers (
-               hostgroup_id,
-               hostname,
-               port"""
-
-        cols = 3
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                query_string += ",\n" + col
-
-        query_string += \
-            (")\n" +
-             "VALUES (" +
-             "%s ," * cols)
-
-        query_string = query_string[:-2]
-        query_string += ")"
-
-        cursor.execute(query_string, query_data)
-        return True
-
-    def update_server_config(self, cursor):
-        query_string = "UPDATE pgsql_servers"
-
-        cols = 0
-        query_data = []
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                if cols == 1:
-                    query_string += "\nSET " + col + "= %s,"
-                else:
-                    query_string += "\n    " + col + " = %s,"
-
-        query_string = query_string[:-1]
-        query_string += ("\nWHERE hostgroup_id = %s\n  AND hostname = %s" +
-                         "\n  AND port = %s")
-
-        query_data.append(self.hostgroup_id)
-        query_data.append(self.hostname)
-        query_data.append(self.port)
-
-        cursor.execute(query_string, query_data)
-        return True
-
-    def delete_server_config(self, cursor):
-        query_string = ("DELETE FROM pgsql_servers"
-                        " WHERE hostgroup_id = %s"
-                        "   AND hostname = %s"
-                        "   AND port = %s")
-
-        query_data = \
-            [self.hostgroup_id,
-             self.hostname,
-             self.port]
-
-        cursor.execute(query_string, query_data)
+        servers = self.get_servers_config(cursor)
+        return servers.get(row_key(self.key_data, SERVER_KEY_COLUMNS))
+
+    def compute_changes(self, current_servers):
+        if self.state == "present":
+            server = dict(self.key_data)
+            server.update(self.config_data)
+            return compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                     present=[server])
+        return compute_changeset(current_servers, SERVER_KEY_COLUMNS,
+                                 absent=[self.key_data])
+
+    def apply_server_config(self, cursor, changeset):
+        apply_changeset(cursor, "pgsql_servers", SERVER_KEY_COLUMNS,
+                        changeset)
         return True
 
     def manage_config(self, cursor, state):
         if state:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "SERVERS",
-                                    variable="pgsql")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "SERVERS",
-                                       variable="pgsql")
-
-    def create_server(self, check_mode, result, cursor):
+            flush_config(cursor, self.params, self.flush_state,
+                         "SERVERS", "pgsql")
+
+    def create_server(self, check_mode, result, cursor, changeset):
         if not check_mode:
             result['changed'] = \
-                self.create_server_config(cursor)
+                self.apply_server_config(cursor, changeset)
             result['msg'] = "Added server to pgsql_servers"
             result['server'] = \
                 self.get_server_config(cursor)
@@ -374,13 +277,13 @@ class ProxySQLPgSQLServer(object):
                              " pgsql_servers, however check_mode" +
                              " is enabled.")
 
-    def update_server(self, check_mode, result, cursor):
+    def update_server(self, check_mode, result, cursor, changeset, server):
         if not check_mode:
             result['changed'] = \
-                self.update_server_config(cursor)
+                self.apply_server_config(cursor, changeset)
             result['msg'] = "Updated server in pgsql_servers"
             result['server'] = \
-                self.get_server_config(cursor)
+                merge_changes(server, changeset['update'][0][1])
             self.manage_config(cursor,
                                result['changed'])
         else:
@@ -389,12 +292,11 @@ class ProxySQLPgSQLServer(object):
                              " pgsql_servers, however check_mode" +
                              " is enabled.")
 
-    def delete_server(self, check_mode, result, cursor):
+    def delete_server(self, check_mode, result, cursor, changeset, server):
         if not check_mode:
-            result['server'] = \
-                self.get_server_config(cursor)
+            result['server'] = server
             result['changed'] = \
-                self.delete_server_config(cursor)
+                self.apply_server_config(cursor, changeset)
             result['msg'] = "Deleted server from pgsql_servers"
             self.manage_config(cursor,
                                result['changed'])
@@ -429,7 +331,8 @@ def main():
         state=dict(default='present', choices=['present',
                                                'absent']),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool')
     )
 
     module = AnsibleModule(
@@ -462,23 +365,35 @@ def main():
     if proxysql_server.hostname:
         result['hostname'] = proxysql_server.hostname
 
+    try:
+        current_servers = proxysql_server.get_servers_config(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read servers.. %s" % to_native(e)
+        )
+
+    server = current_servers.get(row_key(proxysql_server.key_data,
+                                         SERVER_KEY_COLUMNS))
+    changeset = proxysql_server.compute_changes(current_servers)
+
     if proxysql_server.state == "present":
         try:
-            if not proxysql_server.check_server_config(cursor):
-                if not proxysql_server.check_server_config_exists(cursor):
-                    proxysql_server.create_server(module.check_mode,
-                                                  result,
-                                                  cursor)
-                else:
-                    proxysql_server.update_server(module.check_mode,
-                                                  result,
-                                                  cursor)
+            if changeset['insert']:
+                proxysql_server.create_server(module.check_mode,
+                                              result,
+                                              cursor,
+                                              changeset)
+            elif changeset['update']:
+                proxysql_server.update_server(module.check_mode,
+                                              result,
+                                              cursor,
+                                              changeset,
+                                              server)
             else:
                 result['changed'] = False
                 result['msg'] = ("The server already exists in pgsql_servers" +
                                  " and doesn't need to be updated.")
-                result['server'] = \
-                    proxysql_server.get_server_config(cursor)
+                result['server'] = server
         except mysql_driver.Error as e:
             module.fail_json(
                 msg="unable to modify server.. %s" % to_native(e)
@@ -486,10 +401,12 @@ def main():
 
     elif proxysql_server.state == "absent":
         try:
-            if proxysql_server.check_server_config_exists(cursor):
+            if changeset['delete']:
                 proxysql_server.delete_server(module.check_mode,
                                               result,
-                                              cursor)
+                                              cursor,
+                                              changeset,
+                                              server)
             else:
                 result['changed'] = False
                 result['msg'] = ("The server is already absent from the" +
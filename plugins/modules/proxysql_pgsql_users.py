@@ -146,11 +146,16 @@ stdout:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime
+    deferred_flush_path,
+    flush_config,
+    row_key,
 )
 from ansible.module_utils._text import to_native
 
@@ -159,17 +164,23 @@ from ansible.module_utils._text import to_native
 #
 
 
+USER_KEY_COLUMNS = ["username", "backend", "frontend"]
+
+
 class ProxySQLPgSQLUser(object):
 
     def __init__(self, module):
         self.state = module.params["state"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
 
         self.username = module.params["username"]
         self.backend = module.params["backend"]
         self.frontend = module.params["frontend"]
 
+        self.key_data = dict((k, module.params[k])
+                             for k in USER_KEY_COLUMNS)
+
         config_data_keys = ["password",
                             "active",
                             "use_ssl",
@@ -182,139 +193,36 @@ class ProxySQLPgSQLUser(object):
         self.config_data = dict((k, module.params[k])
                                 for k in config_data_keys)
 
-    def check_user_config_exists(self, cursor):
-        query_string = ("SELECT count(*) AS `user_count`"
-                        " FROM pgsql_users"
-                        " WHERE username = %s"
-                        "   AND backend = %s"
-                        "   AND frontend = %s")
-
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['user_count']) > 0)
-
-    def check_user_privs(self, cursor):
-        query_string = ("SELECT count(*) AS `user_count`"
-                        " FROM pgsql_users"
-                        " WHERE username = %s"
-                        "   AND backend = %s"
-                        "   AND frontend = %s")
-
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += "\n  AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['user_count']) > 0)
+    def get_users_config(self, cursor):
+        return fetch_table(cursor, "pgsql_users", USER_KEY_COLUMNS,
+                           match=self.key_data)
 
     def get_user_config(self, cursor):
-        query_string = ("SELECT *"
-                        " FROM pgsql_users"
-                        " WHERE username = %s"
-                        "   AND backend = %s"
-                        "   AND frontend = %s")
-
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        cursor.execute(query_string, query_data)
-        user = cursor.fetchone()
-        return user
-
-    def create_user_config(self, cursor):
-        query_string = ("INSERT INTO pgsql_users ("
-                        "username,"
-                        " backend,"
-                        " frontend")
-
-        cols = 3
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                query_string += ",\n" + col
-
-        query_string += \
-            (")\n" +
-             "VALUES (" +
-             "%s ," * cols)
-
-        query_string = query_string[:-2]
-        query_string += ")"
-
-        cursor.execute(query_string, query_data)
-        return True
-
-    def update_user_config(self, cursor):
-        query_string = ("UPDATE pgsql_users")
-
-        cols = 0
-        query_data = []
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                if cols == 1:
-                    query_string += "\nSET " + col + "= %s,"
-                else:
-                    query_string += "\n    " + col + " = %s,"
-
-        query_string = query_string[:-1]
-        query_string += ("\nWHERE username = %s\n  AND backend = %s" +
-                         "\n  AND frontend = %s")
-
-        query_data.append(self.username)
-        query_data.append(self.backend)
-        query_data.append(self.frontend)
-
-        cursor.execute(query_string, query_data)
-        return True
-
-    def delete_user_config(self, cursor):
-        query_string = ("DELETE FROM pgsql_users"
-                        " WHERE username = %s"
-                        "   AND backend = %s"
-                        "   AND frontend = %s")
-
-        query_data = \
-            [self.username,
-             self.backend,
-             self.frontend]
-
-        cursor.execute(query_string, query_data)
+        users = self.get_users_config(cursor)
+        return users.get(row_key(self.key_data, USER_KEY_COLUMNS))
+
+    def compute_changes(self, current_users):
+        if self.state == "present":
+            user = dict(self.key_data)
+            user.update(self.config_data)
+            return compute_changeset(current_users, USER_KEY_COLUMNS,
+                                     present=[user])
+        return compute_changeset(current_users, USER_KEY_COLUMNS,
+                                 absent=[self.key_data])
+
+    def apply_user_config(self, cursor, changeset):
+        apply_changeset(cursor, "pgsql_users", USER_KEY_COLUMNS, changeset)
         return True
 
     def manage_config(self, cursor, state):
         if state:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "USERS", "pgsql")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "USERS", "pgsql")
+            flush_config(cursor, self.params, self.flush_state,
+                         "USERS", "pgsql")
 
-    def create_user(self, check_mode, result, cursor):
+    def create_user(self, check_mode, result, cursor, changeset):
         if not check_mode:
             result['changed'] = \
-                self.create_user_config(cursor)
+                self.apply_user_config(cursor, changeset)
             result['msg'] = "Added user to pgsql_users"
             result['user'] = \
                 self.get_user_config(cursor)
@@ -326,13 +234,13 @@ class ProxySQLPgSQLUser(object):
                              " pgsql_users, however check_mode" +
                              " is enabled.")
 
-    def update_user(self, check_mode, result, cursor):
+    def update_user(self, check_mode, result, cursor, changeset, user):
         if not check_mode:
             result['changed'] = \
-                self.update_user_config(cursor)
+                self.apply_user_config(cursor, changeset)
             result['msg'] = "Updated user in pgsql_users"
             result['user'] = \
-                self.get_user_config(cursor)
+                merge_changes(user, changeset['update'][0][1])
             self.manage_config(cursor,
                                result['changed'])
         else:
@@ -341,12 +249,11 @@ class ProxySQLPgSQLUser(object):
                              " pgsql_users, however check_mode" +
                              " is enabled.")
 
-    def delete_user(self, check_mode, result, cursor):
+    def delete_user(self, check_mode, result, cursor, changeset, user):
         if not check_mode:
-            result['user'] = \
-                self.get_user_config(cursor)
+            result['user'] = user
             result['changed'] = \
-                self.delete_user_config(cursor)
+                self.apply_user_config(cursor, changeset)
             result['msg'] = "Deleted user from pgsql_users"
             self.manage_config(cursor,
                                result['changed'])
@@ -377,7 +284,8 @@ def main():
         state=dict(default='present', choices=['present',
                                                'absent']),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool')
     )
 
     module = AnsibleModule(
@@ -408,23 +316,35 @@ def main():
     if proxysql_user.username:
         result['username'] = proxysql_user.username
 
+    try:
+        current_users = proxysql_user.get_users_config(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read users.. %s" % to_native(e)
+        )
+
+    user = current_users.get(row_key(proxysql_user.key_data,
+                                     USER_KEY_COLUMNS))
+    changeset = proxysql_user.compute_changes(current_users)
+
     if proxysql_user.state == "present":
         try:
-            if not proxysql_user.check_user_privs(cursor):
-                if not proxysql_user.check_user_config_exists(cursor):
-                    proxysql_user.create_user(module.check_mode,
-                                              result,
-                                              cursor)
-                else:
-                    proxysql_user.update_user(module.check_mode,
-                                              result,
-                                              cursor)
+            if changeset['insert']:
+                proxysql_user.create_user(module.check_mode,
+                                          result,
+                                          cursor,
+                                          changeset)
+            elif changeset['update']:
+                proxysql_user.update_user(module.check_mode,
+                                          result,
+                                          cursor,
+                                          changeset,
+                                          user)
             else:
                 result['changed'] = False
                 result['msg'] = ("The user already exists in pgsql_users" +
                                  " and doesn't need to be updated.")
-                result['user'] = \
-                    proxysql_user.get_user_config(cursor)
+                result['user'] = user
         except mysql_driver.Error as e:
             module.fail_json(
                 msg="unable to modify user.. %s" % to_native(e)
@@ -432,10 +352,12 @@ def main():
 
     elif proxysql_user.state == "absent":
         try:
-            if proxysql_user.check_user_config_exists(cursor):
+            if changeset['delete']:
                 proxysql_user.delete_user(module.check_mode,
                                           result,
-                                          cursor)
+                                          cursor,
+                                          changeset,
+                                          user)
             else:
                 result['changed'] = False
                 result['msg'] = ("The user is already absent from the" +
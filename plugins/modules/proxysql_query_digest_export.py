@@ -0,0 +1,287 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: proxysql_query_digest_export
+author: "Ansible ProxySQL community (@ansible-collections)"
+short_description: Exports the proxysql query digest to a file
+description:
+   - The M(community.proxysql.proxysql_query_digest_export) module writes the
+     rows of a proxysql query digest table to a file on the target, as
+     newline delimited JSON or CSV.
+   - The rows are streamed from the admin interface with an unbuffered
+     cursor and written as they arrive, so the memory used does not depend
+     on the size of the digest table. Only the number of rows and the
+     checksum of the file are returned.
+version_added: '1.9.0'
+options:
+  dest:
+    description:
+      - Path of the file the rows are written to.
+      - The file is replaced atomically, and only when its content changed.
+    type: path
+    required: true
+  table:
+    description:
+      - The digest table to export.
+      - Reading a C(_reset) table resets the statistics after they are
+        exported, so the module then always reports a change.
+      - In check mode the statistics are not reset, the rows of the table
+        without the C(_reset) suffix are read instead.
+    type: str
+    choices: [ "stats_mysql_query_digest", "stats_mysql_query_digest_reset",
+               "stats_pgsql_query_digest", "stats_pgsql_query_digest_reset" ]
+    default: stats_mysql_query_digest
+  format:
+    description:
+      - C(ndjson) writes one JSON object per row and line.
+      - C(csv) writes a header line with the column names followed by one
+        line per row.
+    type: str
+    choices: [ "ndjson", "csv" ]
+    default: ndjson
+  columns:
+    description:
+      - The columns to export. All columns are exported if omitted.
+    type: list
+    elements: str
+  where:
+    description:
+      - An SQL expression restricting the rows exported, such as
+        C(count_star > 100).
+    type: str
+  fetch_size:
+    description:
+      - Number of rows read from the admin interface at a time.
+    type: int
+    default: 1000
+extends_documentation_fragment:
+- community.proxysql.proxysql.connectivity
+- ansible.builtin.files
+notes:
+- Supports C(check_mode).
+- With the community.proxysql.proxysql connection plugin the rows are
+  transferred in a single response and are not streamed.
+'''
+
+EXAMPLES = '''
+---
+- name: Export the query digest for capacity planning
+  community.proxysql.proxysql_query_digest_export:
+    login_user: 'admin'
+    login_password: 'admin'
+    dest: /var/tmp/query_digest.ndjson
+
+- name: Export the busiest digests of the last interval as CSV and reset them
+  community.proxysql.proxysql_query_digest_export:
+    login_user: 'admin'
+    login_password: 'admin'
+    table: stats_mysql_query_digest_reset
+    format: csv
+    columns: [hostgroup, schemaname, username, digest, digest_text, count_star, sum_time]
+    where: count_star > 100
+    dest: /var/tmp/query_digest.csv
+'''
+
+RETURN = '''
+dest:
+    description: Path of the exported file.
+    returned: always
+    type: str
+    sample: /var/tmp/query_digest.ndjson
+rows:
+    description: Number of rows exported.
+    returned: always
+    type: int
+    sample: 1532
+checksum:
+    description: SHA1 checksum of the exported file.
+    returned: always
+    type: str
+    sample: 2a0eb7e6b4e0e1dca3e2bb7a5a8b2e6a5f7c1d3e
+'''
+
+import csv
+import json
+import os
+import re
+import tempfile
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    fetch_rows,
+    mysql_connect,
+    mysql_driver,
+    proxysql_common_argument_spec,
+)
+from ansible.module_utils._text import to_native
+
+# ===========================================
+# proxysql module specific support methods.
+#
+
+IDENTIFIER = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+class NDJSONWriter(object):
+
+    def __init__(self, stream, columns):
+        self.stream = stream
+
+    def writerow(self, row):
+        self.stream.write(json.dumps(row) + "\n")
+
+
+class CSVWriter(object):
+
+    def __init__(self, stream, columns):
+        self.writer = csv.DictWriter(stream, fieldnames=columns,
+                                     lineterminator="\n")
+        self.writer.writeheader()
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+
+
+writers = {
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+}
+
+
+class ProxySQLQueryDigestExport(object):
+
+    def __init__(self, module):
+        self.dest = module.params["dest"]
+        self.table = module.params["table"]
+        self.reset = self.table.endswith("_reset")
+        self.format = module.params["format"]
+        self.columns = module.params["columns"]
+        self.where = module.params["where"]
+        self.fetch_size = module.params["fetch_size"]
+
+    def query(self, check_mode):
+        table = self.table
+        if self.reset and check_mode:
+            table = table[:-len("_reset")]
+
+        query_string = "SELECT {0} FROM {1}".format(
+            ", ".join(self.columns) if self.columns else "*", table)
+        if self.where:
+            query_string += " WHERE {0}".format(self.where)
+        return query_string
+
+    def export(self, cursor, path, check_mode):
+        cursor.execute(self.query(check_mode))
+        columns = [column[0] for column in cursor.description or []]
+
+        count = 0
+        with open(path, "w", newline="") as stream:
+            writer = writers[self.format](stream, columns)
+            for row in fetch_rows(cursor, self.fetch_size):
+                writer.writerow(row)
+                count += 1
+
+        return count
+
+# ===========================================
+# Module execution.
+#
+
+
+def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        dest=dict(required=True, type='path'),
+        table=dict(default='stats_mysql_query_digest',
+                   choices=['stats_mysql_query_digest',
+                            'stats_mysql_query_digest_reset',
+                            'stats_pgsql_query_digest',
+                            'stats_pgsql_query_digest_reset']),
+        format=dict(default='ndjson', choices=['ndjson', 'csv']),
+        columns=dict(type='list', elements='str'),
+        where=dict(type='str'),
+        fetch_size=dict(default=1000, type='int'),
+    )
+
+    module = AnsibleModule(
+        supports_check_mode=True,
+        argument_spec=argument_spec,
+        add_file_common_args=True
+    )
+
+    digest_export = ProxySQLQueryDigestExport(module)
+
+    invalid = [col for col in digest_export.columns or []
+               if not IDENTIFIER.match(col)]
+    if invalid:
+        module.fail_json(msg="invalid column name in columns: %s" %
+                         ", ".join(invalid))
+    if digest_export.fetch_size < 1:
+        module.fail_json(msg="fetch_size must be 1 or greater")
+
+    dest_dir = os.path.dirname(digest_export.dest) or "."
+    if not os.path.isdir(dest_dir):
+        module.fail_json(msg="Destination directory %s does not exist" % dest_dir)
+
+    login_user = module.params["login_user"]
+    login_password = module.params["login_password"]
+    config_file = module.params["config_file"]
+
+    cursor = None
+    try:
+        cursor, db_conn, version = mysql_connect(module,
+                                                 login_user,
+                                                 login_password,
+                                                 config_file,
+                                                 cursor_class='SSDictCursor')
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
+        )
+
+    # The rows are written next to dest, so the final move is atomic, or to
+    # the module temporary directory when nothing is to be written.
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=".proxysql_digest_",
+        dir=module.tmpdir if module.check_mode else dest_dir)
+    os.close(fd)
+    module.add_cleanup_file(tmp_path)
+
+    result = dict(dest=digest_export.dest)
+    try:
+        result['rows'] = digest_export.export(cursor, tmp_path,
+                                              module.check_mode)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to export %s.. %s" % (digest_export.table, to_native(e))
+        )
+    except (IOError, OSError) as e:
+        module.fail_json(
+            msg="unable to write %s.. %s" % (digest_export.dest, to_native(e))
+        )
+
+    result['checksum'] = module.sha1(tmp_path)
+    result['changed'] = (digest_export.reset or
+                         not os.path.exists(digest_export.dest) or
+                         module.sha1(digest_export.dest) != result['checksum'])
+
+    if result['changed'] and not module.check_mode:
+        module.atomic_move(tmp_path, digest_export.dest)
+
+    file_args = module.load_file_common_arguments(module.params)
+    if not module.check_mode or os.path.exists(digest_export.dest):
+        result['changed'] = module.set_fs_attributes_if_different(
+            file_args, result['changed'])
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
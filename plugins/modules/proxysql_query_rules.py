@@ -193,9 +193,33 @@ options:
         schedules deleted, you can set I(force_delete) to C(True).
     type: bool
     default: false
+  rules:
+    description:
+      - A list of query rules to manage in a single run.
+      - Each item accepts the same keys as the single rule options above, from
+        I(rule_id) to I(comment). I(rule_id) is required for every item.
+      - The C(mysql_query_rules) table is read once, the required inserts,
+        updates and deletes are computed in memory and applied in one batch,
+        followed by a single save to disk and load to runtime.
+      - Keys that are omitted from an item are not managed, their current
+        value is left untouched.
+      - With I(state=absent) the listed rules are removed by I(rule_id).
+      - Mutually exclusive with the single rule options.
+    type: list
+    elements: dict
+    version_added: '1.9.0'
+  purge:
+    description:
+      - Only used with I(rules) and I(state=present).
+      - If C(True), rules that exist in C(mysql_query_rules) but are not
+        listed in I(rules) are deleted.
+    type: bool
+    default: false
+    version_added: '1.9.0'
 extends_documentation_fragment:
 - community.proxysql.proxysql.managing_config
 - community.proxysql.proxysql.connectivity
+- community.proxysql.proxysql.regex_check
 notes:
 - Supports C(check_mode).
 '''
@@ -305,6 +329,27 @@ EXAMPLES = '''
     username: 'guest_ro'
     state: absent
     force_delete: true
+
+# This example manages a complete rule set in a single task. Rules that are
+# not listed are removed, and the query rules are saved to disk and loaded to
+# runtime only once.
+
+- name: Manage all query rules
+  community.proxysql.proxysql_query_rules:
+    login_user: admin
+    login_password: admin
+    rules:
+      - rule_id: 1
+        active: true
+        match_digest: '^SELECT .* FOR UPDATE$'
+        destination_hostgroup: 1
+        apply: true
+      - rule_id: 2
+        active: true
+        match_digest: '^SELECT'
+        destination_hostgroup: 2
+        apply: true
+    purge: true
 '''
 
 RETURN = '''
@@ -352,80 +397,109 @@ stdout:
         ],
         "state": "present"
     }
+rules_added:
+    description: The I(rule_id) of the rules added when I(rules) is used.
+    returned: When I(rules) is used.
+    type: list
+    elements: int
+    sample: [1, 2]
+    version_added: '1.9.0'
+rules_updated:
+    description: The I(rule_id) of the rules updated when I(rules) is used.
+    returned: When I(rules) is used.
+    type: list
+    elements: int
+    sample: [3]
+    version_added: '1.9.0'
+rules_deleted:
+    description: The I(rule_id) of the rules deleted when I(rules) is used.
+    returned: When I(rules) is used.
+    type: list
+    elements: int
+    sample: [4, 5]
+    version_added: '1.9.0'
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    check_rule_regexes,
+    compute_changeset,
+    fetch_table,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    proxysql_regex_check_argument_spec,
+    deferred_flush_path,
+    flush_config,
 )
 from ansible.module_utils._text import to_native
+from ansible.module_utils.common.validation import (
+    check_type_bool,
+    check_type_int,
+    check_type_str,
+)
 
 # ===========================================
 # proxysql module specific support methods.
 #
 
 
+RULE_CONFIG_KEYS = ["rule_id",
+                    "active",
+                    "username",
+                    "schemaname",
+                    "flagIN",
+                    "client_addr",
+                    "proxy_addr",
+                    "proxy_port",
+                    "digest",
+                    "match_digest",
+                    "match_pattern",
+                    "negate_match_pattern",
+                    "re_modifiers",
+                    "flagOUT",
+                    "replace_pattern",
+                    "destination_hostgroup",
+                    "cache_ttl",
+                    "multiplex",
+                    "timeout",
+                    "retries",
+                    "delay",
+                    "next_query_flagIN",
+                    "mirror_flagOUT",
+                    "mirror_hostgroup",
+                    "error_msg",
+                    "OK_msg",
+                    "multiplex",
+                    "log",
+                    "apply",
+                    "comment"]
+
+
+def rule_config_keys(version):
+    config_data_keys = list(RULE_CONFIG_KEYS)
+
+    if version.get('major') >= 2:
+        config_data_keys.append("cache_empty_result")
+
+    return config_data_keys
+
+
 class ProxyQueryRule(object):
 
     def __init__(self, module, version):
         self.state = module.params["state"]
         self.force_delete = module.params["force_delete"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
-
-        config_data_keys = ["rule_id",
-                            "active",
-                            "username",
-                            "schemaname",
-                            "flagIN",
-                            "client_addr",
-                            "proxy_addr",
-                            "proxy_port",
-                            "digest",
-                            "match_digest",
-                            "match_pattern",
-                            "negate_match_pattern",
-                            "re_modifiers",
-                            "flagOUT",
-                            "replace_pattern",
-                            "destination_hostgroup",
-                            "cache_ttl",
-                            "multiplex",
-                            "timeout",
-                            "retries",
-                            "delay",
-                            "next_query_flagIN",
-                            "mirror_flagOUT",
-                            "mirror_hostgroup",
-                            "error_msg",
-                            "OK_msg",
-                            "multiplex",
-                            "log",
-                            "apply",
-                            "comment"]
-
-        if version.get('major') >= 2:
-            config_data_keys.append("cache_empty_result")
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
 
         self.config_data = dict((k, module.params[k])
-                                for k in config_data_keys)
+                                for k in rule_config_keys(version))
 
-    def check_rule_pk_exists(self, cursor):
-        query_string = \
-            """SELECT count(*) AS `rule_count`
-               FROM mysql_query_rules
-               WHERE rule_id = %s"""
-
-        query_data = \
-            [self.config_data["rule_id"]]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['rule_count']) > 0)
+    def get_rule_pk_config(self, cursor):
+        return fetch_table(cursor, "mysql_query_rules", ["rule_id"],
+                           match={"rule_id": self.config_data["rule_id"]})
 
     def check_rule_cfg_exists(self, cursor):
         query_string = \
@@ -558,10 +632,7 @@ class ProxyQueryRule(object):
 
     def manage_config(self, cursor, state):
         if state:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "QUERY RULES")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "QUERY RULES")
+            flush_config(cursor, self.params, self.flush_state, "QUERY RULES")
 
     def create_rule(self, check_mode, result, cursor):
         if not check_mode:
@@ -608,6 +679,106 @@ class ProxyQueryRule(object):
                              " mysql_query_rules, however" +
                              " check_mode is enabled.")
 
+
+class ProxyQueryRuleSet(object):
+
+    type_checkers = {
+        'int': check_type_int,
+        'bool': check_type_bool,
+        'str': check_type_str,
+    }
+
+    def __init__(self, module, version, rule_spec):
+        self.state = module.params["state"]
+        self.purge = module.params["purge"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
+
+        self.config_data_keys = rule_config_keys(version)
+        self.rules = dict()
+
+        for rule in module.params["rules"]:
+            config_data = self.validate_rule(module, rule, rule_spec)
+            if config_data["rule_id"] in self.rules:
+                module.fail_json(
+                    msg="rule_id %s is listed more than once in rules" %
+                        config_data["rule_id"]
+                )
+            self.rules[config_data["rule_id"]] = config_data
+
+    def validate_rule(self, module, rule, rule_spec):
+        unsupported = sorted(set(rule.keys()) - set(self.config_data_keys))
+        if unsupported:
+            module.fail_json(
+                msg="Unsupported keys in rules item: %s" %
+                    ", ".join(unsupported)
+            )
+
+        if rule.get("rule_id") is None:
+            module.fail_json(msg="rule_id is required for every item in rules")
+
+        config_data = dict()
+        for col in self.config_data_keys:
+            val = rule.get(col)
+            if val is not None:
+                try:
+                    val = self.type_checkers[rule_spec[col].get('type', 'str')](val)
+                except TypeError as e:
+                    module.fail_json(
+                        msg="Invalid value for %s in rules item with rule_id"
+                            " %s: %s" % (col, rule["rule_id"], to_native(e))
+                    )
+                choices = rule_spec[col].get('choices')
+                if choices and val not in choices:
+                    module.fail_json(
+                        msg="%s must be one of %s in rules item with rule_id"
+                            " %s" % (col, choices, rule["rule_id"])
+                    )
+            config_data[col] = val
+
+        return config_data
+
+    def get_rules_config(self, cursor):
+        return fetch_table(cursor, "mysql_query_rules", ["rule_id"])
+
+    def compute_changes(self, current_rules):
+        rules = [config_data for rule_id, config_data
+                 in sorted(self.rules.items())]
+
+        if self.state == "present":
+            return compute_changeset(current_rules, ["rule_id"],
+                                     present=rules, purge=self.purge)
+        return compute_changeset(current_rules, ["rule_id"], absent=rules)
+
+    def manage_config(self, cursor, state):
+        if state:
+            flush_config(cursor, self.params, self.flush_state, "QUERY RULES")
+
+    def apply_rules(self, check_mode, result, cursor):
+        changeset = self.compute_changes(self.get_rules_config(cursor))
+
+        result['rules_added'] = [int(rule["rule_id"])
+                                 for rule in changeset['insert']]
+        result['rules_updated'] = [int(key["rule_id"])
+                                   for key, changes in changeset['update']]
+        result['rules_deleted'] = sorted(int(key["rule_id"])
+                                         for key in changeset['delete'])
+        result['changed'] = any(changeset.values())
+
+        if not result['changed']:
+            result['msg'] = ("The rules in mysql_query_rules don't need to" +
+                             " be updated.")
+        elif check_mode:
+            result['msg'] = ("Rules would have been updated in" +
+                             " mysql_query_rules, however" +
+                             " check_mode is enabled.")
+        else:
+            apply_changeset(cursor, "mysql_query_rules", ["rule_id"],
+                            changeset)
+            result['msg'] = "Updated rules in mysql_query_rules"
+            self.manage_config(cursor,
+                               result['changed'])
+
 # ===========================================
 # Module execution.
 #
@@ -650,12 +821,18 @@ def main():
                                                'absent']),
         force_delete=dict(default=False, type='bool'),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool'),
+        rules=dict(type='list', elements='dict'),
+        purge=dict(default=False, type='bool')
     )
+    argument_spec.update(proxysql_regex_check_argument_spec())
 
     module = AnsibleModule(
         supports_check_mode=True,
-        argument_spec=argument_spec
+        argument_spec=argument_spec,
+        mutually_exclusive=[('rules', k) for k in
+                            RULE_CONFIG_KEYS + ["cache_empty_result"]]
     )
 
     login_user = module.params["login_user"]
@@ -674,23 +851,71 @@ def main():
             msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
         )
 
-    proxysql_query_rule = ProxyQueryRule(module, version)
     result = {}
 
+    if module.params["rules"] is not None:
+        proxysql_query_rule_set = ProxyQueryRuleSet(module, version,
+                                                    argument_spec)
+        result['state'] = proxysql_query_rule_set.state
+        try:
+            if proxysql_query_rule_set.state == "present":
+                check_rule_regexes(module, cursor,
+                                   proxysql_query_rule_set.rules.values())
+            proxysql_query_rule_set.apply_rules(module.check_mode,
+                                                result,
+                                                cursor)
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to modify rules.. %s" % to_native(e)
+            )
+        module.exit_json(**result)
+
+    proxysql_query_rule = ProxyQueryRule(module, version)
+
     result['state'] = proxysql_query_rule.state
 
     if proxysql_query_rule.state == "present":
+        try:
+            check_rule_regexes(module, cursor,
+                               [proxysql_query_rule.config_data])
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to read the query digest.. %s" % to_native(e)
+            )
+
+    if proxysql_query_rule.state == "present" and \
+       proxysql_query_rule.config_data["rule_id"] is not None:
+        # A rule given by rule_id is looked up by primary key only.
+        try:
+            current_rules = proxysql_query_rule.get_rule_pk_config(cursor)
+            changeset = compute_changeset(current_rules, ["rule_id"],
+                                          present=[proxysql_query_rule.config_data])
+            if changeset['insert']:
+                proxysql_query_rule.create_rule(module.check_mode,
+                                                result,
+                                                cursor)
+            elif changeset['update']:
+                proxysql_query_rule.update_rule(module.check_mode,
+                                                result,
+                                                cursor)
+            else:
+                result['changed'] = False
+                result['msg'] = ("The rule already exists in" +
+                                 " mysql_query_rules and doesn't need to be" +
+                                 " updated.")
+                result['rules'] = list(current_rules.values())
+
+        except mysql_driver.Error as e:
+            module.fail_json(
+                msg="unable to modify rule.. %s" % to_native(e)
+            )
+
+    elif proxysql_query_rule.state == "present":
         try:
             if not proxysql_query_rule.check_rule_cfg_exists(cursor):
-                if proxysql_query_rule.config_data["rule_id"] and \
-                   proxysql_query_rule.check_rule_pk_exists(cursor):
-                    proxysql_query_rule.update_rule(module.check_mode,
-                                                    result,
-                                                    cursor)
-                else:
-                    proxysql_query_rule.create_rule(module.check_mode,
-                                                    result,
-                                                    cursor)
+                proxysql_query_rule.create_rule(module.check_mode,
+                                                result,
+                                                cursor)
             else:
                 result['changed'] = False
                 result['msg'] = ("The rule already exists in" +
@@ -0,0 +1,390 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: proxysql_query_rules_advisor
+author: "Ansible ProxySQL community (@ansible-collections)"
+short_description: Proposes caching and routing query rules from the proxysql query digest
+description:
+   - The M(community.proxysql.proxysql_query_rules_advisor) module ranks the
+     digests of C(stats_mysql_query_digest) or C(stats_pgsql_query_digest)
+     and proposes query rules for the busiest ones.
+   - The digest rows are aggregated per digest by the admin interface and
+     streamed with an unbuffered cursor. Only the I(top) digests are kept in
+     memory, so the size of the digest table does not matter.
+   - Reads are C(SELECT) statements that do not lock rows or assign
+     variables. A read is cacheable when it does not call a non
+     deterministic function, such as C(NOW()) or C(RAND()), and runs often
+     enough for a cached result to be reused.
+   - The proposed rules can be passed as is to the I(rules) option of
+     M(community.proxysql.proxysql_query_rules). The rules proposed for the
+     C(pgsql) frontends are applied one at a time with
+     M(community.proxysql.proxysql_pgsql_query_rules). Nothing is changed by
+     this module.
+version_added: '1.9.0'
+options:
+  protocol:
+    description:
+      - Read the query digest of the C(mysql) or the C(pgsql) frontends.
+    type: str
+    choices: [ "mysql", "pgsql" ]
+    default: mysql
+  hostgroups:
+    description:
+      - Only rank the queries that were sent to these hostgroups. All
+        hostgroups are considered if omitted.
+    type: list
+    elements: int
+  top:
+    description:
+      - Number of digests ranked and returned.
+    type: int
+    default: 20
+  rank_by:
+    description:
+      - The counter the digests are ranked by. Ties are broken by the other
+        counter, then reads are ranked before writes.
+    type: str
+    choices: [ "sum_time", "count_star" ]
+    default: sum_time
+  reader_hostgroup:
+    description:
+      - When set, a routing rule to this hostgroup is proposed for every read
+        in the ranking.
+    type: int
+  cache_ttl_min:
+    description:
+      - The lowest I(cache_ttl) proposed, in milliseconds.
+    type: int
+    default: 1000
+  cache_ttl_max:
+    description:
+      - The highest I(cache_ttl) proposed, in milliseconds.
+      - A read is only cached when it ran at least ten times per
+        I(cache_ttl_max) on average since it was first seen. The proposed
+        I(cache_ttl) is the time it takes for ten runs, rounded up to the
+        second and kept between I(cache_ttl_min) and I(cache_ttl_max).
+    type: int
+    default: 60000
+  rule_id_start:
+    description:
+      - The I(rule_id) of the first proposed rule. The rules are numbered in
+        the order of the ranking.
+    type: int
+    default: 1000
+  fetch_size:
+    description:
+      - Number of digests read from the admin interface at a time.
+    type: int
+    default: 1000
+extends_documentation_fragment:
+- community.proxysql.proxysql.connectivity
+notes:
+- Supports C(check_mode).
+'''
+
+EXAMPLES = '''
+---
+- name: Propose rules for the 50 most expensive digests of the writer hostgroup
+  community.proxysql.proxysql_query_rules_advisor:
+    login_user: 'admin'
+    login_password: 'admin'
+    hostgroups: [1]
+    reader_hostgroup: 2
+    top: 50
+  register: advice
+
+- name: Apply the proposed rules
+  community.proxysql.proxysql_query_rules:
+    login_user: 'admin'
+    login_password: 'admin'
+    rules: "{{ advice.rules }}"
+
+- name: Propose rules for the pgsql frontends
+  community.proxysql.proxysql_query_rules_advisor:
+    login_user: 'admin'
+    login_password: 'admin'
+    protocol: pgsql
+    reader_hostgroup: 2
+  register: pgsql_advice
+
+- name: Apply the proposed pgsql rules
+  community.proxysql.proxysql_pgsql_query_rules:
+    login_user: 'admin'
+    login_password: 'admin'
+    defer_flush: true
+    rule_id: "{{ item.rule_id }}"
+    active: "{{ item.active }}"
+    digest: "{{ item.digest }}"
+    cache_ttl: "{{ item.cache_ttl | default(omit) }}"
+    destination_hostgroup: "{{ item.destination_hostgroup | default(omit) }}"
+    apply: "{{ item.apply }}"
+    comment: "{{ item.comment }}"
+  loop: "{{ pgsql_advice.rules }}"
+
+- name: Save and load the pgsql query rules once
+  community.proxysql.proxysql_manage_config:
+    login_user: 'admin'
+    login_password: 'admin'
+    flush_deferred: true
+'''
+
+RETURN = '''
+digests:
+    description: The ranked digests, the first one ranks highest.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - digest: "0x3a2f5c8e1d7b9a60"
+          digest_text: "SELECT name FROM products WHERE id=?"
+          query_class: read
+          cacheable: true
+          count_star: 918220
+          sum_time: 41320311
+          avg_time: 45
+          first_seen: 1760000000
+          last_seen: 1760086400
+rules:
+    description:
+      - The proposed query rules, ready for the I(rules) option of
+        M(community.proxysql.proxysql_query_rules), or for a loop over
+        M(community.proxysql.proxysql_pgsql_query_rules).
+      - Cacheable reads get a I(cache_ttl), and reads get a
+        I(destination_hostgroup) when I(reader_hostgroup) is set.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule_id: 1000
+          active: true
+          digest: "0x3a2f5c8e1d7b9a60"
+          cache_ttl: 1000
+          destination_hostgroup: 2
+          apply: true
+          comment: "advisor: SELECT name FROM products WHERE id=?"
+rows:
+    description: Number of distinct digests read.
+    returned: always
+    type: int
+    sample: 18342
+'''
+
+import heapq
+import re
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    fetch_rows,
+    mysql_connect,
+    mysql_driver,
+    proxysql_common_argument_spec,
+)
+from ansible.module_utils._text import to_native
+
+# ===========================================
+# proxysql module specific support methods.
+#
+
+CACHE_RUNS_PER_TTL = 10
+
+CLASS_ORDER = {'read': 2, 'write': 1, 'other': 0}
+
+WRITE_STATEMENT = re.compile(
+    r'^\s*(INSERT|UPDATE|DELETE|REPLACE|MERGE|UPSERT|TRUNCATE|LOAD|COPY)\b',
+    re.IGNORECASE)
+
+READ_STATEMENT = re.compile(r'^\s*\(?\s*SELECT\b', re.IGNORECASE)
+
+# Reads that lock rows or write to variables or files.
+LOCKING_READ = re.compile(
+    r'\bFOR\s+(UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b'
+    r'|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\b|:=',
+    re.IGNORECASE)
+
+NON_DETERMINISTIC = re.compile(
+    r'\b(NOW|SYSDATE|CURDATE|CURTIME|CURRENT_DATE|CURRENT_TIME|CURRENT_TIMESTAMP'
+    r'|LOCALTIME|LOCALTIMESTAMP|UNIX_TIMESTAMP|UTC_DATE|UTC_TIME|UTC_TIMESTAMP'
+    r'|RAND|RANDOM|UUID|UUID_SHORT|LAST_INSERT_ID|LASTVAL|CURRVAL|NEXTVAL'
+    r'|FOUND_ROWS|ROW_COUNT|CONNECTION_ID|GET_LOCK|RELEASE_LOCK|SLEEP'
+    r'|SQL_NO_CACHE)\b|@',
+    re.IGNORECASE)
+
+
+def query_class(digest_text):
+    if WRITE_STATEMENT.match(digest_text):
+        return 'write'
+    if READ_STATEMENT.match(digest_text):
+        if LOCKING_READ.search(digest_text):
+            return 'write'
+        return 'read'
+    return 'other'
+
+
+def suggest_cache_ttl(digest, ttl_min, ttl_max):
+    """Return the cache_ttl in ms for CACHE_RUNS_PER_TTL runs, or None."""
+    if digest['count_star'] < CACHE_RUNS_PER_TTL:
+        return None
+    span_ms = max(digest['last_seen'] - digest['first_seen'], 0) * 1000
+    ttl = CACHE_RUNS_PER_TTL * span_ms / digest['count_star']
+    if ttl > ttl_max:
+        return None
+    ttl = -(-int(ttl) // 1000) * 1000
+    return min(max(ttl, ttl_min), ttl_max)
+
+
+class ProxySQLQueryRulesAdvisor(object):
+
+    def __init__(self, module):
+        self.protocol = module.params["protocol"]
+        self.hostgroups = module.params["hostgroups"]
+        self.top = module.params["top"]
+        self.rank_by = module.params["rank_by"]
+        self.reader_hostgroup = module.params["reader_hostgroup"]
+        self.cache_ttl_min = module.params["cache_ttl_min"]
+        self.cache_ttl_max = module.params["cache_ttl_max"]
+        self.rule_id_start = module.params["rule_id_start"]
+        self.fetch_size = module.params["fetch_size"]
+        self.rows = 0
+
+        self.tie_break = "count_star" if self.rank_by == "sum_time" else "sum_time"
+
+    def get_digests(self, cursor):
+        query_string = \
+            """SELECT digest, digest_text,
+                      SUM(count_star) AS count_star,
+                      SUM(sum_time) AS sum_time,
+                      MIN(first_seen) AS first_seen,
+                      MAX(last_seen) AS last_seen
+               FROM stats_{0}_query_digest""".format(self.protocol)
+        query_data = []
+
+        if self.hostgroups:
+            query_string += "\n WHERE hostgroup IN ({0})".format(
+                ", ".join(["%s"] * len(self.hostgroups)))
+            query_data = list(self.hostgroups)
+
+        query_string += "\n GROUP BY digest, digest_text"
+
+        cursor.execute(query_string, query_data)
+
+        for row in fetch_rows(cursor, self.fetch_size):
+            self.rows += 1
+            digest = dict(digest=row['digest'], digest_text=row['digest_text'] or '')
+            for col in ('count_star', 'sum_time', 'first_seen', 'last_seen'):
+                digest[col] = int(row[col] or 0)
+            digest['query_class'] = query_class(digest['digest_text'])
+            yield digest
+
+    def rank_key(self, digest):
+        return (digest[self.rank_by], digest[self.tie_break],
+                CLASS_ORDER[digest['query_class']])
+
+    def rank(self, cursor):
+        ranking = heapq.nlargest(self.top, self.get_digests(cursor),
+                                 key=self.rank_key)
+
+        for digest in ranking:
+            digest['avg_time'] = (digest['sum_time'] // digest['count_star']
+                                  if digest['count_star'] else 0)
+            digest['cacheable'] = (digest['query_class'] == 'read' and
+                                   not NON_DETERMINISTIC.search(digest['digest_text']))
+        return ranking
+
+    def propose_rules(self, ranking):
+        rules = []
+        for digest in ranking:
+            if digest['query_class'] != 'read':
+                continue
+
+            rule = dict()
+            if digest['cacheable']:
+                cache_ttl = suggest_cache_ttl(digest, self.cache_ttl_min,
+                                              self.cache_ttl_max)
+                if cache_ttl is not None:
+                    rule['cache_ttl'] = cache_ttl
+            if self.reader_hostgroup is not None:
+                rule['destination_hostgroup'] = self.reader_hostgroup
+            if not rule:
+                continue
+
+            rule.update(rule_id=self.rule_id_start + len(rules),
+                        active=True,
+                        digest=digest['digest'],
+                        apply=True,
+                        comment="advisor: %s" % digest['digest_text'][:200])
+            rules.append(rule)
+        return rules
+
+# ===========================================
+# Module execution.
+#
+
+
+def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        protocol=dict(default='mysql', choices=['mysql', 'pgsql']),
+        hostgroups=dict(type='list', elements='int'),
+        top=dict(default=20, type='int'),
+        rank_by=dict(default='sum_time', choices=['sum_time', 'count_star']),
+        reader_hostgroup=dict(type='int'),
+        cache_ttl_min=dict(default=1000, type='int'),
+        cache_ttl_max=dict(default=60000, type='int'),
+        rule_id_start=dict(default=1000, type='int'),
+        fetch_size=dict(default=1000, type='int'),
+    )
+
+    module = AnsibleModule(
+        supports_check_mode=True,
+        argument_spec=argument_spec
+    )
+
+    advisor = ProxySQLQueryRulesAdvisor(module)
+
+    if advisor.top < 1:
+        module.fail_json(msg="top must be 1 or greater")
+    if advisor.fetch_size < 1:
+        module.fail_json(msg="fetch_size must be 1 or greater")
+    if not 0 < advisor.cache_ttl_min <= advisor.cache_ttl_max:
+        module.fail_json(msg="cache_ttl_min must be greater than 0 and not "
+                             "greater than cache_ttl_max")
+
+    login_user = module.params["login_user"]
+    login_password = module.params["login_password"]
+    config_file = module.params["config_file"]
+
+    cursor = None
+    try:
+        cursor, db_conn, version = mysql_connect(module,
+                                                 login_user,
+                                                 login_password,
+                                                 config_file,
+                                                 cursor_class='SSDictCursor')
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
+        )
+
+    result = dict(changed=False)
+    try:
+        result['digests'] = advisor.rank(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read the query digest.. %s" % to_native(e)
+        )
+
+    result['rules'] = advisor.propose_rules(result['digests'])
+    result['rows'] = advisor.rows
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
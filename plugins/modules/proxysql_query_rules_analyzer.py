@@ -0,0 +1,485 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: proxysql_query_rules_analyzer
+author: "Ansible ProxySQL community (@ansible-collections)"
+short_description: Analyzes the flagIN, flagOUT and apply chains of the proxysql query rules
+description:
+   - The M(community.proxysql.proxysql_query_rules_analyzer) module reads the
+     whole C(mysql_query_rules) or C(pgsql_query_rules) table and the rule
+     hits of the stats schema, and checks the rule chains as a whole.
+   - ProxySQL evaluates the active rules in I(rule_id) order. A query starts
+     with a flag of C(0), or with the I(next_query_flagIN) set by a rule for
+     the previous query of the session, and is only evaluated against the
+     rules whose I(flagIN) is its current flag. A matching rule with
+     I(flagOUT) changes the flag for the rules that follow it, and a matching
+     rule with I(apply) ends the evaluation.
+   - The module reports the active rules no query can reach, the rules that
+     never match because an earlier rule with I(apply) matches every query
+     they match, the loops between flags, and the number of rules a query
+     is evaluated against. It also proposes new I(rule_id) for the rules
+     with I(apply) so that the most hit ones are evaluated first, where this
+     does not change which rule a query ends on.
+   - A rule is only considered to match every query of another one when
+     each of its match criteria is unset or identical. Regular expressions
+     are not compared beyond that, so the reports err on the side of
+     missing a shadowed rule rather than reporting one wrongly.
+version_added: '1.9.0'
+options:
+  protocol:
+    description:
+      - Analyze the C(mysql) or the C(pgsql) query rules.
+    type: str
+    choices: [ "mysql", "pgsql" ]
+    default: mysql
+extends_documentation_fragment:
+- community.proxysql.proxysql.connectivity
+notes:
+- Supports C(check_mode).
+- Loops between flags are only followed by ProxySQL when
+  C(mysql-query_processor_iterations) is set.
+'''
+
+EXAMPLES = '''
+---
+- name: Analyze the query rule chains
+  community.proxysql.proxysql_query_rules_analyzer:
+    login_user: 'admin'
+    login_password: 'admin'
+  register: chains
+
+- name: Fail on rules that never match
+  ansible.builtin.assert:
+    that:
+      - chains.unreachable == []
+      - chains.shadowed == []
+'''
+
+RETURN = '''
+rules:
+    description: Number of active rules analyzed.
+    returned: always
+    type: int
+    sample: 42
+unreachable:
+    description: The active rules whose I(flagIN) no query can have when it reaches them.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule_id: 30
+          flagIN: 5
+shadowed:
+    description:
+      - The active rules that never match, because an earlier rule with
+        I(apply) and the same I(flagIN) matches every query they match.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule_id: 12
+          shadowed_by: 10
+loops:
+    description:
+      - The groups of flags that lead back to each other through the
+        I(flagOUT) of rules without I(apply).
+    returned: always
+    type: list
+    elements: list
+    sample: [[1, 2]]
+query_classes:
+    description:
+      - One entry per reachable rule with I(apply) that is not shadowed,
+        for the queries that end on it, and one entry per starting flag, for the queries that match no
+        rule with I(apply).
+      - I(rules_evaluated) is the number of rules such a query is evaluated
+        against, on the shortest chain of flags.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule_id: 10
+          hits: 81230
+          rules_evaluated: 3
+        - flag: 0
+          rules_evaluated: 14
+expected_rules_evaluated:
+    description:
+      - The average of I(rules_evaluated) over the queries that ended on a
+        rule with I(apply), weighted by the rule hits.
+      - C(null) when no such rule has hits.
+    returned: always
+    type: float
+    sample: 3.4
+reorder:
+    description:
+      - The proposed new I(rule_id) of the rules with I(apply) to move, so
+        that within each run of consecutive rules with I(apply) and the same
+        I(flagIN) the most hit rules come first.
+      - Two rules are only swapped when they can not match the same query,
+        because they require different values for the same criterion or
+        their patterns start with different literal text.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule_id: 11
+          new_rule_id: 10
+          hits: 81230
+        - rule_id: 10
+          new_rule_id: 11
+          hits: 120
+'''
+
+import re
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    mysql_connect,
+    mysql_driver,
+    proxysql_common_argument_spec,
+)
+from ansible.module_utils._text import to_native
+
+# ===========================================
+# proxysql module specific support methods.
+#
+
+INT_COLUMNS = ("rule_id", "active", "flagIN", "flagOUT", "apply",
+               "next_query_flagIN", "proxy_port", "negate_match_pattern")
+
+# Criteria compared for equality, per protocol.
+MATCH_COLUMNS = {
+    'mysql': ("username", "schemaname", "client_addr", "proxy_addr",
+              "proxy_port", "digest"),
+    'pgsql': ("username", "database", "client_addr", "proxy_addr",
+              "proxy_port", "digest"),
+}
+
+PATTERN_COLUMNS = ("match_digest", "match_pattern")
+
+# Patterns matching any query.
+CATCH_ALL_PATTERNS = ("", ".", ".*", "^", "^.*")
+
+REGEX_METACHARACTERS = set(".^$*+?{}[]\\|()")
+
+# An unescaped alternation or group, as in '^SELECT|^UPDATE', can match
+# queries that do not start with the literal prefix of the pattern.
+ALTERNATION_OR_GROUP = re.compile(r'(?:^|[^\\])(?:\\\\)*[|(]')
+
+
+def _to_int(value):
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def literal_prefix(pattern, caseless):
+    """Return the literal text an anchored pattern starts with, or None."""
+    if not pattern or not pattern.startswith("^"):
+        return None
+    if ALTERNATION_OR_GROUP.search(pattern):
+        return None
+    prefix = []
+    for char in pattern[1:]:
+        if char in REGEX_METACHARACTERS:
+            # A quantifier applies to the preceding character.
+            if char in "*+?{" and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+    prefix = "".join(prefix)
+    return prefix.lower() if caseless else prefix
+
+
+class RuleChainAnalyzer(object):
+
+    def __init__(self, rules, hits, protocol):
+        self.match_columns = MATCH_COLUMNS[protocol]
+        self.hits = hits
+        self.rules = []
+
+        for row in sorted(rules, key=lambda row: int(row["rule_id"])):
+            rule = dict(row)
+            for col in INT_COLUMNS:
+                if col in rule:
+                    rule[col] = _to_int(rule[col])
+            rule["flagIN"] = rule.get("flagIN") or 0
+            if rule["flagOUT"] == rule["flagIN"]:
+                rule["flagOUT"] = None
+            if rule.get("active"):
+                self.rules.append(rule)
+
+    def entry_flags(self, reachable):
+        flags = set([0])
+        for index, rule in enumerate(self.rules):
+            if index in reachable and rule.get("next_query_flagIN") is not None:
+                flags.add(rule["next_query_flagIN"])
+        return flags
+
+    def reach(self):
+        """Return the rule indexes each flag is reachable from, and the
+        fewest rules evaluated to reach every reachable rule.
+
+        The entry flags depend on the reachable rules, through
+        next_query_flagIN, so the walk is repeated until they settle.
+        """
+        reachable = dict()
+        entries = set([0])
+        while True:
+            # flag: (index the flag is reachable from, rules evaluated)
+            starts = dict((flag, [(0, 0)]) for flag in entries)
+            reachable = dict()
+            for index, rule in enumerate(self.rules):
+                flag = rule["flagIN"]
+                costs = [cost + self.count_flag(flag, start, index)
+                         for start, cost in starts.get(flag, [])
+                         if start <= index]
+                if not costs:
+                    continue
+                reachable[index] = min(costs)
+                if rule["flagOUT"] is not None and not rule.get("apply"):
+                    starts.setdefault(rule["flagOUT"], []).append(
+                        (index + 1, reachable[index]))
+
+            new_entries = self.entry_flags(reachable)
+            if new_entries == entries:
+                self.starts = starts
+                return reachable
+            entries = new_entries
+
+    def count_flag(self, flag, start, end):
+        """Number of rules with flagIN flag from index start to end, inclusive."""
+        return sum(1 for rule in self.rules[start:end + 1]
+                   if rule["flagIN"] == flag)
+
+    def covers(self, earlier, later):
+        """Whether every query matching later also matches earlier."""
+        for col in self.match_columns:
+            if earlier.get(col) not in (None, "") and \
+               earlier.get(col) != later.get(col):
+                return False
+        for col in PATTERN_COLUMNS:
+            if earlier.get(col) in CATCH_ALL_PATTERNS + (None,) and \
+               not earlier.get("negate_match_pattern"):
+                continue
+            for key in (col, "negate_match_pattern", "re_modifiers"):
+                if earlier.get(key) != later.get(key):
+                    return False
+        return True
+
+    def disjoint(self, first, second):
+        """Whether no query can match both rules."""
+        for col in self.match_columns:
+            if first.get(col) not in (None, "") and \
+               second.get(col) not in (None, "") and \
+               first.get(col) != second.get(col):
+                return True
+        for col in PATTERN_COLUMNS:
+            if first.get("negate_match_pattern") or second.get("negate_match_pattern"):
+                continue
+            caseless = any("CASELESS" in (rule.get("re_modifiers") or "CASELESS").upper()
+                           for rule in (first, second))
+            prefixes = [literal_prefix(rule.get(col), caseless)
+                        for rule in (first, second)]
+            if None in prefixes:
+                continue
+            if not (prefixes[0].startswith(prefixes[1]) or
+                    prefixes[1].startswith(prefixes[0])):
+                return True
+        return False
+
+    def find_shadowed(self, reachable):
+        shadowed = []
+        for index, rule in enumerate(self.rules):
+            if index not in reachable:
+                continue
+            flag_from = min(start for start, cost in self.starts[rule["flagIN"]])
+            for earlier_index in range(flag_from, index):
+                earlier = self.rules[earlier_index]
+                if earlier_index in reachable and earlier.get("apply") and \
+                   earlier["flagIN"] == rule["flagIN"] and \
+                   self.covers(earlier, rule):
+                    shadowed.append(dict(rule_id=rule["rule_id"],
+                                         shadowed_by=earlier["rule_id"]))
+                    break
+        return shadowed
+
+    def find_loops(self, reachable):
+        graph = dict()
+        for index in reachable:
+            rule = self.rules[index]
+            if rule["flagOUT"] is not None and not rule.get("apply"):
+                graph.setdefault(rule["flagIN"], set()).add(rule["flagOUT"])
+
+        # Tarjan's strongly connected components.
+        index_of = dict()
+        lowlink = dict()
+        stack = []
+        on_stack = set()
+        loops = []
+
+        def visit(flag):
+            index_of[flag] = lowlink[flag] = len(index_of)
+            stack.append(flag)
+            on_stack.add(flag)
+            for target in graph.get(flag, ()):
+                if target not in index_of:
+                    visit(target)
+                    lowlink[flag] = min(lowlink[flag], lowlink[target])
+                elif target in on_stack:
+                    lowlink[flag] = min(lowlink[flag], index_of[target])
+            if lowlink[flag] == index_of[flag]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == flag:
+                        break
+                if len(component) > 1:
+                    loops.append(sorted(component))
+
+        for flag in sorted(graph):
+            if flag not in index_of:
+                visit(flag)
+        return sorted(loops)
+
+    def query_classes(self, reachable, shadowed):
+        classes = []
+        for index in sorted(reachable):
+            rule = self.rules[index]
+            if rule.get("apply") and rule["rule_id"] not in shadowed:
+                classes.append(dict(rule_id=rule["rule_id"],
+                                    hits=self.hits.get(rule["rule_id"], 0),
+                                    rules_evaluated=reachable[index]))
+        for flag in sorted(self.entry_flags(reachable)):
+            classes.append(dict(flag=flag,
+                                rules_evaluated=self.count_flag(
+                                    flag, 0, len(self.rules) - 1)))
+        return classes
+
+    def propose_reorder(self, reachable):
+        runs = []
+        for index, rule in enumerate(self.rules):
+            if index in reachable and rule.get("apply") and runs and \
+               runs[-1][-1] == index - 1 and \
+               self.rules[runs[-1][-1]]["flagIN"] == rule["flagIN"]:
+                runs[-1].append(index)
+            elif index in reachable and rule.get("apply"):
+                runs.append([index])
+
+        reorder = []
+        for run in runs:
+            pending = [self.rules[index] for index in run]
+            ordered = []
+            while pending:
+                # Only a rule disjoint from every earlier pending rule may
+                # move ahead of them.
+                movable = [rule for position, rule in enumerate(pending)
+                           if all(self.disjoint(rule, earlier)
+                                  for earlier in pending[:position])]
+                best = max(movable, key=lambda rule: self.hits.get(rule["rule_id"], 0))
+                ordered.append(best)
+                pending.remove(best)
+
+            for slot, rule in zip(run, ordered):
+                new_rule_id = self.rules[slot]["rule_id"]
+                if new_rule_id != rule["rule_id"]:
+                    reorder.append(dict(rule_id=rule["rule_id"],
+                                        new_rule_id=new_rule_id,
+                                        hits=self.hits.get(rule["rule_id"], 0)))
+        return reorder
+
+    def analyze(self):
+        reachable = self.reach()
+
+        result = dict(rules=len(self.rules))
+        result['unreachable'] = [dict(rule_id=rule["rule_id"], flagIN=rule["flagIN"])
+                                 for index, rule in enumerate(self.rules)
+                                 if index not in reachable]
+        result['shadowed'] = self.find_shadowed(reachable)
+        result['loops'] = self.find_loops(reachable)
+        result['query_classes'] = self.query_classes(
+            reachable, set(rule['rule_id'] for rule in result['shadowed']))
+
+        ended = [query_class for query_class in result['query_classes']
+                 if query_class.get('hits')]
+        total_hits = sum(query_class['hits'] for query_class in ended)
+        result['expected_rules_evaluated'] = round(
+            sum(query_class['hits'] * query_class['rules_evaluated']
+                for query_class in ended) / float(total_hits), 1) if total_hits else None
+
+        result['reorder'] = self.propose_reorder(reachable)
+        return result
+
+
+def get_rules(cursor, protocol):
+    cursor.execute("SELECT * FROM {0}_query_rules".format(protocol))
+    return cursor.fetchall()
+
+
+def get_hits(cursor, protocol):
+    cursor.execute("SELECT rule_id, hits FROM stats_{0}_query_rules".format(protocol))
+    return dict((int(row["rule_id"]), int(row["hits"])) for row in cursor.fetchall())
+
+# ===========================================
+# Module execution.
+#
+
+
+def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        protocol=dict(default='mysql', choices=['mysql', 'pgsql']),
+    )
+
+    module = AnsibleModule(
+        supports_check_mode=True,
+        argument_spec=argument_spec
+    )
+
+    protocol = module.params["protocol"]
+
+    login_user = module.params["login_user"]
+    login_password = module.params["login_password"]
+    config_file = module.params["config_file"]
+
+    cursor = None
+    try:
+        cursor, db_conn, version = mysql_connect(module,
+                                                 login_user,
+                                                 login_password,
+                                                 config_file,
+                                                 cursor_class='DictCursor')
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
+        )
+
+    try:
+        rules = get_rules(cursor, protocol)
+        hits = get_hits(cursor, protocol)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read the %s query rules.. %s" % (protocol, to_native(e))
+        )
+
+    result = RuleChainAnalyzer(rules, hits, protocol).analyze()
+    result['changed'] = False
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,14 +20,14 @@ options:
     description:
       - Filtering criteria matching username, a query will match only if the connection is made with
         the correct username.
+      - Required unless I(rules) or I(src) is used.
     type: str
-    required: true
   schemaname:
     description:
       - Filtering criteria matching schemaname, a query will match only if the connection uses
         schemaname as its default schema.
+      - Required unless I(rules) or I(src) is used.
     type: str
-    required: true
   flagIN:
     description:
       - Evaluated in the same way as I(flagIN) is in B(mysql_query_rules) and correlates to the
@@ -40,8 +40,8 @@ options:
       - Route matched queries to this hostgroup. This happens unless there is a
         started transaction and the logged in user has
         I(transaction_persistent) set to C(True) (refer to M(community.proxysql.proxysql_mysql_users)).
+      - Required unless I(rules) or I(src) is used.
     type: int
-    required: true
   comment:
     description:
       - Free form text field, usable for a descriptive comment of the query rule.
@@ -60,6 +60,51 @@ options:
         schedules deleted, you can set I(force_delete) to C(True).
     type: bool
     default: false
+  rules:
+    description:
+      - A list of fast routing rules to manage in a single run.
+      - Each item accepts the I(username), I(schemaname), I(flagIN),
+        I(destination_hostgroup) and I(comment) keys of the single rule
+        options. I(destination_hostgroup) is only required with
+        I(state=present), I(flagIN) defaults to C(0) and I(comment) to an
+        empty string.
+      - The C(mysql_query_rules_fast_routing) table is read once and indexed
+        by I(username), I(schemaname) and I(flagIN). The required inserts,
+        updates and deletes are computed in memory and written with multi-row
+        statements of at most I(batch_size) rows, followed by a single save
+        to disk and load to runtime.
+      - With I(state=absent) the listed rules are removed.
+      - For tens of thousands of rules prefer I(src), every item of I(rules)
+        is validated and echoed back by Ansible.
+      - Mutually exclusive with I(src) and the single rule options.
+    type: list
+    elements: dict
+    version_added: '1.9.0'
+  src:
+    description:
+      - Path of a file on the managed host holding the rules, managed as
+        with I(rules).
+      - A C(.csv) file has a header line naming the columns, C(username),
+        C(schemaname), C(flagIN), C(destination_hostgroup) and C(comment).
+        A C(.json), C(.yml) or C(.yaml) file holds a list of rules with the
+        keys of the I(rules) items. YAML files need the C(PyYAML) library.
+      - Mutually exclusive with I(rules) and the single rule options.
+    type: path
+    version_added: '1.9.0'
+  purge:
+    description:
+      - Only used with I(rules) or I(src) and I(state=present).
+      - If C(true), rules that exist in C(mysql_query_rules_fast_routing)
+        but are not listed are deleted.
+    type: bool
+    default: false
+    version_added: '1.9.0'
+  batch_size:
+    description:
+      - Maximum number of rows written per statement with I(rules) or I(src).
+    type: int
+    default: 500
+    version_added: '1.9.0'
 extends_documentation_fragment:
 - community.proxysql.proxysql.managing_config
 - community.proxysql.proxysql.connectivity
@@ -81,6 +126,17 @@ EXAMPLES = '''
     state: present
     save_to_disk: true
     load_to_runtime: true
+
+# This example provisions the fast routing rules of all the tenants listed in
+# a CSV file, removes the rules of the tenants that are not listed, and loads
+# the query rules to runtime once.
+- name: Provision the tenants
+  community.proxysql.proxysql_query_rules_fast_routing:
+    login_user: admin
+    login_password: admin
+    src: /etc/proxysql/tenants.csv
+    purge: true
+    batch_size: 1000
 '''
 
 RETURN = '''
@@ -104,30 +160,69 @@ stdout:
         ],
         "state": "present"
     }
+rows_added:
+    description: Number of rules added when I(rules) or I(src) is used.
+    returned: When I(rules) or I(src) is used.
+    type: int
+    sample: 1200
+    version_added: '1.9.0'
+rows_updated:
+    description: Number of rules updated when I(rules) or I(src) is used.
+    returned: When I(rules) or I(src) is used.
+    type: int
+    sample: 3
+    version_added: '1.9.0'
+rows_deleted:
+    description: Number of rules deleted when I(rules) or I(src) is used.
+    returned: When I(rules) or I(src) is used.
+    type: int
+    sample: 14
+    version_added: '1.9.0'
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    read_rows_file,
+    row_key,
+    deferred_flush_path,
+    flush_config,
 )
 from ansible.module_utils._text import to_native
+from ansible.module_utils.common.validation import (
+    check_type_int,
+    check_type_str,
+)
 
 # ===========================================
 # proxysql module specific support methods.
 #
 
 
+RULE_KEY_COLUMNS = ["username", "schemaname", "flagIN"]
+
+RULE_ITEM_SPEC = dict(
+    username=dict(type='str', required=True),
+    schemaname=dict(type='str', required=True),
+    flagIN=dict(type='int', default=0),
+    destination_hostgroup=dict(type='int'),
+    comment=dict(type='str', default=''),
+)
+
+
 class ProxyQueryRuleFastRouting(object):
 
     def __init__(self, module):
         self.state = module.params["state"]
         self.force_delete = module.params["force_delete"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
 
         config_data_keys = [
             "username",
@@ -142,157 +237,42 @@ class ProxyQueryRuleFastRouting(object):
             for k in config_data_keys
         )
 
-    def check_rule_pk_exists(self, cursor):
-        query_string = (
-            "SELECT count(*) AS `rule_count` "
-            "FROM mysql_query_rules_fast_routing "
-            "WHERE username = %s  "
-            "AND schemaname = %s "
-            "AND flagIN = %s"
-        )
-
-        query_data = [
-            self.config_data["username"],
-            self.config_data["schemaname"],
-            self.config_data["flagIN"],
-        ]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['rule_count']) > 0)
-
-    def check_rule_cfg_exists(self, cursor):
-        query_string = "SELECT count(*) AS `rule_count` FROM mysql_query_rules_fast_routing"
-
-        cols = 0
-        query_data = []
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                if cols == 1:
-                    query_string += " WHERE " + col + " = %s"
-                else:
-                    query_string += " AND " + col + " = %s"
-
-        if cols > 0:
-            cursor.execute(query_string, query_data)
-        else:
-            cursor.execute(query_string)
-        check_count = cursor.fetchone()
-        return int(check_count['rule_count'])
-
-    def get_rule_config(self, cursor):
-        query_string = (
-            "SELECT * "
-            "FROM mysql_query_rules_fast_routing "
-            "WHERE username = %s "
-            "AND schemaname = %s "
-            "AND flagIN = %s"
-        )
-
-        query_data = [
-            self.config_data["username"],
-            self.config_data["schemaname"],
-            self.config_data["flagIN"]
-        ]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += " AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        rule = cursor.fetchall()
-        return rule
-
-    def create_rule_config(self, cursor):
-        query_string = "INSERT INTO mysql_query_rules_fast_routing ("
-
-        cols = 0
-        query_data = []
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                query_string += col + ","
-
-        query_string = query_string[:-1]
-        query_string += ") VALUES (" + "%s, " * cols
-        query_string = query_string[:-2]
-        query_string += ")"
-
-        cursor.execute(query_string, query_data)
-        return True
-
-    def update_rule_config(self, cursor):
-        query_string = "UPDATE mysql_query_rules_fast_routing"
-
-        cols = 0
-        query_data = [
-            self.config_data["username"],
-            self.config_data["schemaname"],
-            self.config_data["flagIN"]
-        ]
-
-        for col, val in self.config_data.items():
-            if val is not None and col not in ("username", "schemaname", "flagIN"):
-                query_data.insert(cols, val)
-                cols += 1
-                if cols == 1:
-                    query_string += " SET " + col + "= %s,"
-                else:
-                    query_string += " " + col + " = %s,"
-
-        query_string = query_string[:-1]
-        query_string += (
-            "WHERE username = %s "
-            "AND schemaname = %s "
-            "AND flagIN = %s"
+        self.key_data = dict(
+            (k, self.config_data[k])
+            for k in RULE_KEY_COLUMNS
         )
 
-        cursor.execute(query_string, query_data)
+    def get_rules_config(self, cursor):
+        return fetch_table(cursor, "mysql_query_rules_fast_routing",
+                           RULE_KEY_COLUMNS, match=self.key_data)
+
+    def compute_changes(self, current_rules):
+        changeset = compute_changeset(current_rules, RULE_KEY_COLUMNS,
+                                      present=[self.config_data])
+        if self.state == "present":
+            return changeset
+
+        # A rule is only removed when it matches every given option.
+        if current_rules and not changeset['update']:
+            return compute_changeset(current_rules, RULE_KEY_COLUMNS,
+                                     absent=[self.key_data])
+        return compute_changeset({}, RULE_KEY_COLUMNS)
+
+    def apply_rule_config(self, cursor, changeset):
+        apply_changeset(cursor, "mysql_query_rules_fast_routing",
+                        RULE_KEY_COLUMNS, changeset)
         return True
 
-    def delete_rule_config(self, cursor):
-        query_string = "DELETE FROM mysql_query_rules_fast_routing"
-
-        cols = 0
-        query_data = []
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                cols += 1
-                query_data.append(val)
-                if cols == 1:
-                    query_string += " WHERE " + col + " = %s"
-                else:
-                    query_string += " AND " + col + " = %s"
-
-        if cols > 0:
-            cursor.execute(query_string, query_data)
-        else:
-            cursor.execute(query_string)
-        check_count = cursor.rowcount
-        return True, int(check_count)
-
     def manage_config(self, cursor, changed):
-        if not changed:
-            return
+        if changed:
+            flush_config(cursor, self.params, self.flush_state, "QUERY RULES")
 
-        if self.save_to_disk:
-            save_config_to_disk(cursor, "QUERY RULES")
-        if self.load_to_runtime:
-            load_config_to_runtime(cursor, "QUERY RULES")
-
-    def create_rule(self, check_mode, result, cursor):
+    def create_rule(self, check_mode, result, cursor, changeset):
         if not check_mode:
-            result['changed'] = self.create_rule_config(cursor)
+            result['changed'] = self.apply_rule_config(cursor, changeset)
             result['msg'] = "Added rule to mysql_query_rules_fast_routing."
             self.manage_config(cursor, result['changed'])
-            result['rules'] = self.get_rule_config(cursor)
+            result['rules'] = list(self.get_rules_config(cursor).values())
         else:
             result['changed'] = True
             result['msg'] = (
@@ -301,12 +281,13 @@ class ProxyQueryRuleFastRouting(object):
                 "however check_mode is enabled."
             )
 
-    def update_rule(self, check_mode, result, cursor):
+    def update_rule(self, check_mode, result, cursor, changeset, rules):
         if not check_mode:
-            result['changed'] = self.update_rule_config(cursor)
+            result['changed'] = self.apply_rule_config(cursor, changeset)
             result['msg'] = "Updated rule in mysql_query_rules_fast_routing."
             self.manage_config(cursor, result['changed'])
-            result['rules'] = self.get_rule_config(cursor)
+            result['rules'] = [merge_changes(rule, changeset['update'][0][1])
+                               for rule in rules]
         else:
             result['changed'] = True
             result['msg'] = (
@@ -315,10 +296,11 @@ class ProxyQueryRuleFastRouting(object):
                 "however check_mode is enabled."
             )
 
-    def delete_rule(self, check_mode, result, cursor):
+    def delete_rule(self, check_mode, result, cursor, changeset, rules):
         if not check_mode:
-            result['rules'] = self.get_rule_config(cursor)
-            result['changed'], result['rows_affected'] = self.delete_rule_config(cursor)
+            result['rules'] = rules
+            result['changed'] = self.apply_rule_config(cursor, changeset)
+            result['rows_affected'] = len(changeset['delete'])
             result['msg'] = "Deleted rule from mysql_query_rules_fast_routing."
             self.manage_config(cursor, result['changed'])
         else:
@@ -329,6 +311,102 @@ class ProxyQueryRuleFastRouting(object):
                 "however check_mode is enabled."
             )
 
+
+class ProxyQueryRuleFastRoutingSet(object):
+
+    type_checkers = {
+        'int': check_type_int,
+        'str': check_type_str,
+    }
+
+    def __init__(self, module, rules):
+        self.state = module.params["state"]
+        self.purge = module.params["purge"]
+        self.batch_size = module.params["batch_size"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
+
+        self.rules = dict()
+
+        for index, rule in enumerate(rules, 1):
+            config_data = self.validate_rule(module, rule, index)
+            key = row_key(config_data, RULE_KEY_COLUMNS)
+            if key in self.rules:
+                module.fail_json(
+                    msg="the rule for username %s, schemaname %s and flagIN"
+                        " %s is listed more than once" % key
+                )
+            self.rules[key] = config_data
+
+    def validate_rule(self, module, rule, index):
+        unsupported = sorted(set(rule.keys()) - set(RULE_ITEM_SPEC.keys()))
+        if unsupported:
+            module.fail_json(
+                msg="Unsupported keys in rule %s: %s" %
+                    (index, ", ".join(unsupported))
+            )
+
+        config_data = dict()
+        for col, spec in RULE_ITEM_SPEC.items():
+            val = rule.get(col)
+            if val is None:
+                if spec.get('required'):
+                    module.fail_json(msg="%s is required in rule %s" % (col, index))
+                val = spec.get('default')
+            else:
+                try:
+                    val = self.type_checkers[spec['type']](val)
+                except TypeError as e:
+                    module.fail_json(
+                        msg="Invalid value for %s in rule %s: %s" %
+                            (col, index, to_native(e))
+                    )
+            config_data[col] = val
+
+        if self.state == "present" and config_data["destination_hostgroup"] is None:
+            module.fail_json(msg="destination_hostgroup is required in rule %s" % index)
+
+        return config_data
+
+    def get_rules_config(self, cursor):
+        return fetch_table(cursor, "mysql_query_rules_fast_routing",
+                           RULE_KEY_COLUMNS)
+
+    def compute_changes(self, current_rules):
+        rules = list(self.rules.values())
+
+        if self.state == "present":
+            return compute_changeset(current_rules, RULE_KEY_COLUMNS,
+                                     present=rules, purge=self.purge)
+        return compute_changeset(current_rules, RULE_KEY_COLUMNS, absent=rules)
+
+    def manage_config(self, cursor, state):
+        if state:
+            flush_config(cursor, self.params, self.flush_state, "QUERY RULES")
+
+    def apply_rules(self, check_mode, result, cursor):
+        current_rules = self.get_rules_config(cursor)
+        changeset = self.compute_changes(current_rules)
+
+        result['rows_added'] = len(changeset['insert'])
+        result['rows_updated'] = len(changeset['update'])
+        result['rows_deleted'] = len(changeset['delete'])
+        result['changed'] = any(changeset.values())
+
+        if not result['changed']:
+            result['msg'] = ("The rules in mysql_query_rules_fast_routing"
+                             " don't need to be updated.")
+        elif check_mode:
+            result['msg'] = ("Rules would have been updated in"
+                             " mysql_query_rules_fast_routing, however"
+                             " check_mode is enabled.")
+        else:
+            apply_changeset(cursor, "mysql_query_rules_fast_routing",
+                            RULE_KEY_COLUMNS, changeset,
+                            batch_size=self.batch_size, current=current_rules)
+            result['msg'] = "Updated rules in mysql_query_rules_fast_routing"
+            self.manage_config(cursor, result['changed'])
+
 # ===========================================
 # Module execution.
 #
@@ -337,22 +415,35 @@ class ProxyQueryRuleFastRouting(object):
 def main():
     argument_spec = proxysql_common_argument_spec()
     argument_spec.update(
-        username=dict(required=True, type='str'),
-        schemaname=dict(required=True, type='str'),
-        destination_hostgroup=dict(required=True, type='int'),
+        username=dict(type='str'),
+        schemaname=dict(type='str'),
+        destination_hostgroup=dict(type='int'),
         flagIN=dict(default=0, type='int'),
         comment=dict(default='', type='str'),
         state=dict(default='present', choices=['present', 'absent']),
         force_delete=dict(default=False, type='bool'),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool'),
+        rules=dict(type='list', elements='dict'),
+        src=dict(type='path'),
+        purge=dict(default=False, type='bool'),
+        batch_size=dict(default=500, type='int'),
     )
 
     module = AnsibleModule(
         supports_check_mode=True,
-        argument_spec=argument_spec
+        argument_spec=argument_spec,
+        mutually_exclusive=[('rules', 'src')] + [
+            (bulk, k) for bulk in ('rules', 'src')
+            for k in ('username', 'schemaname', 'destination_hostgroup')],
+        required_one_of=[('username', 'rules', 'src')],
+        required_together=[('username', 'schemaname', 'destination_hostgroup')],
     )
 
+    if module.params["batch_size"] < 1:
+        module.fail_json(msg="batch_size must be 1 or greater")
+
     login_user = module.params["login_user"]
     login_password = module.params["login_password"]
     config_file = module.params["config_file"]
@@ -369,19 +460,40 @@ def main():
     except mysql_driver.Error as e:
         module.fail_json(msg="unable to connect to ProxySQL Admin Module: %s" % to_native(e))
 
-    query_rule = ProxyQueryRuleFastRouting(module)
     result = {}
 
+    if module.params["rules"] is not None or module.params["src"] is not None:
+        rules = module.params["rules"]
+        if rules is None:
+            rules = read_rows_file(module, module.params["src"])
+        query_rule_set = ProxyQueryRuleFastRoutingSet(module, rules)
+        result['state'] = query_rule_set.state
+        try:
+            query_rule_set.apply_rules(module.check_mode, result, cursor)
+        except mysql_driver.Error as e:
+            module.fail_json(msg="unable to modify rules: %s" % to_native(e))
+        module.exit_json(**result)
+
+    query_rule = ProxyQueryRuleFastRouting(module)
+
     result['state'] = query_rule.state
 
+    try:
+        current_rules = query_rule.get_rules_config(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(msg="unable to read rules: %s" % to_native(e))
+
+    rules = list(current_rules.values())
+    changeset = query_rule.compute_changes(current_rules)
+
     if query_rule.state == "present":
         try:
-            if not query_rule.check_rule_cfg_exists(cursor):
-                if query_rule.config_data["username"] and query_rule.config_data["schemaname"] and \
-                   query_rule.check_rule_pk_exists(cursor):
-                    query_rule.update_rule(module.check_mode, result, cursor)
-                else:
-                    query_rule.create_rule(module.check_mode, result, cursor)
+            if changeset['insert']:
+                query_rule.create_rule(module.check_mode, result, cursor,
+                                       changeset)
+            elif changeset['update']:
+                query_rule.update_rule(module.check_mode, result, cursor,
+                                       changeset, rules)
             else:
                 result['changed'] = False
                 result['msg'] = (
@@ -389,19 +501,18 @@ def main():
                     "mysql_query_rules_fast_routing "
                     "and doesn't need to be updated."
                 )
-                result['rules'] = query_rule.get_rule_config(cursor)
+                result['rules'] = rules
 
         except mysql_driver.Error as e:
             module.fail_json(msg="unable to modify rule: %s" % to_native(e))
 
     elif query_rule.state == "absent":
         try:
-            existing_rules = query_rule.check_rule_cfg_exists(cursor)
-            if existing_rules > 0:
-                if existing_rules == 1 or query_rule.force_delete:
-                    query_rule.delete_rule(module.check_mode, result, cursor)
-                else:
-                    module.fail_json(msg=("Operation would delete multiple rules use force_delete to override this."))
+            if len(changeset['delete']) > 1 and not query_rule.force_delete:
+                module.fail_json(msg=("Operation would delete multiple rules use force_delete to override this."))
+            elif changeset['delete']:
+                query_rule.delete_rule(module.check_mode, result, cursor,
+                                       changeset, rules)
             else:
                 result['changed'] = False
                 result['msg'] = (
@@ -0,0 +1,311 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2026, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: proxysql_query_rules_migrate
+author: "Ansible ProxySQL community (@ansible-collections)"
+short_description: Moves username and schemaname routing rules to the fast routing table
+description:
+   - The M(community.proxysql.proxysql_query_rules_migrate) module finds the
+     query rules that only route the queries of a I(username) and
+     I(schemaname) to a I(destination_hostgroup), creates the equivalent
+     rows in C(mysql_query_rules_fast_routing) and deactivates the original
+     rules.
+   - The fast routing table is a hash lookup, where every query rule is a
+     regular expression evaluation in I(rule_id) order.
+   - A rule is migrated when it is active, has I(apply), sets a
+     I(username), a I(schemaname), a I(destination_hostgroup) and
+     optionally a I(flagIN) and a I(comment), and nothing else.
+   - ProxySQL only looks the fast routing table up when no query rule set a
+     destination. A rule is therefore only migrated when every active rule
+     after it with the same I(flagIN) requires another I(username) or
+     I(schemaname), and when no fast routing row with another
+     I(destination_hostgroup) exists for its I(username), I(schemaname) and
+     I(flagIN). The other rules are returned in I(skipped).
+   - Both tables are written in one batch, followed by a single save to
+     disk and load to runtime of the query rules.
+version_added: '1.9.0'
+options:
+  protocol:
+    description:
+      - Migrate the C(mysql) or the C(pgsql) query rules. For C(pgsql) the
+        I(schemaname) of the rules is their I(database).
+    type: str
+    choices: [ "mysql", "pgsql" ]
+    default: mysql
+  rule_ids:
+    description:
+      - Only consider these rules. All the rules are considered if omitted.
+    type: list
+    elements: int
+extends_documentation_fragment:
+- community.proxysql.proxysql.managing_config
+- community.proxysql.proxysql.connectivity
+notes:
+- Supports C(check_mode) and C(diff_mode).
+'''
+
+EXAMPLES = '''
+---
+- name: Preview the rules that would move to the fast routing table
+  community.proxysql.proxysql_query_rules_migrate:
+    login_user: 'admin'
+    login_password: 'admin'
+  check_mode: true
+  diff: true
+
+- name: Move the routing rules to the fast routing table
+  community.proxysql.proxysql_query_rules_migrate:
+    login_user: 'admin'
+    login_password: 'admin'
+'''
+
+RETURN = '''
+migrated:
+    description: The rules deactivated and their fast routing rows.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule_id: 20
+          username: app
+          schemaname: shop
+          flagIN: 0
+          destination_hostgroup: 2
+          comment: "migrated from query rule 20"
+skipped:
+    description: The routing rules that can not be migrated, and why.
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - rule_id: 21
+          reason: "rule_id 90 after it can match the same queries"
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    mysql_connect,
+    mysql_driver,
+    proxysql_common_argument_spec,
+    deferred_flush_path,
+    flush_config,
+)
+from ansible.module_utils._text import to_native
+
+# ===========================================
+# proxysql module specific support methods.
+#
+
+SCHEMA_COLUMN = {
+    'mysql': "schemaname",
+    'pgsql': "database",
+}
+
+# Columns a rule may set and still be a fast routing rule, next to the
+# schema column. negate_match_pattern and re_modifiers have no effect
+# without a pattern.
+ROUTING_COLUMNS = ("rule_id", "active", "username", "flagIN",
+                   "destination_hostgroup", "apply", "comment",
+                   "negate_match_pattern", "re_modifiers", "attributes")
+
+
+def _is_set(value):
+    return value not in (None, "")
+
+
+class ProxyQueryRuleMigration(object):
+
+    def __init__(self, module):
+        self.protocol = module.params["protocol"]
+        self.rule_ids = module.params["rule_ids"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
+
+        self.rules_table = "{0}_query_rules".format(self.protocol)
+        self.fast_routing_table = "{0}_query_rules_fast_routing".format(self.protocol)
+        self.schema_column = SCHEMA_COLUMN[self.protocol]
+        self.fast_routing_key = ["username", self.schema_column, "flagIN"]
+
+    def get_config(self, cursor):
+        return (fetch_table(cursor, self.rules_table, ["rule_id"]),
+                fetch_table(cursor, self.fast_routing_table, self.fast_routing_key))
+
+    def is_routing_rule(self, rule):
+        for col, val in rule.items():
+            if col in ROUTING_COLUMNS or col == self.schema_column:
+                continue
+            if _is_set(val):
+                return False
+        return (_is_set(rule.get("destination_hostgroup")) and
+                str(rule.get("negate_match_pattern") or 0) == "0")
+
+    def reason_to_skip(self, rule, later_rules, fast_routing):
+        if not _is_set(rule.get("username")):
+            return "it matches any username"
+        if not _is_set(rule.get(self.schema_column)):
+            return "it matches any %s" % self.schema_column
+        if str(rule.get("apply")) != "1":
+            return "it does not have apply set"
+
+        flag = str(rule.get("flagIN") or 0)
+        for later in later_rules:
+            if str(later.get("flagIN") or 0) != flag:
+                continue
+            if any(_is_set(later.get(col)) and later.get(col) != rule.get(col)
+                   for col in ("username", self.schema_column)):
+                continue
+            return "rule_id %s after it can match the same queries" % later["rule_id"]
+
+        current = fast_routing.get((rule["username"], rule[self.schema_column], flag))
+        if current is not None and \
+           str(current["destination_hostgroup"]) != str(rule["destination_hostgroup"]):
+            return ("a fast routing row routes it to hostgroup %s" %
+                    current["destination_hostgroup"])
+        return None
+
+    def plan(self, current_rules, fast_routing):
+        active = sorted((rule for rule in current_rules.values()
+                         if str(rule.get("active")) == "1"),
+                        key=lambda rule: int(rule["rule_id"]))
+
+        migrated = []
+        skipped = []
+        for index, rule in enumerate(active):
+            if self.rule_ids and int(rule["rule_id"]) not in self.rule_ids:
+                continue
+            if not self.is_routing_rule(rule):
+                continue
+
+            reason = self.reason_to_skip(rule, active[index + 1:], fast_routing)
+            if reason:
+                skipped.append(dict(rule_id=int(rule["rule_id"]), reason=reason))
+                continue
+
+            row = dict(username=rule["username"],
+                       flagIN=int(rule.get("flagIN") or 0),
+                       destination_hostgroup=int(rule["destination_hostgroup"]),
+                       comment=rule.get("comment") or
+                       "migrated from query rule %s" % rule["rule_id"])
+            row[self.schema_column] = rule[self.schema_column]
+            migrated.append(dict(row, rule_id=int(rule["rule_id"])))
+        return migrated, skipped
+
+    def compute_changes(self, current_rules, fast_routing, migrated):
+        rows = []
+        for entry in migrated:
+            row = dict(entry)
+            del row["rule_id"]
+            key = tuple(str(row[col]) for col in self.fast_routing_key)
+            # An existing row with the same destination is kept as is.
+            if key not in fast_routing:
+                rows.append(row)
+
+        return (compute_changeset(current_rules, ["rule_id"],
+                                  present=[dict(rule_id=entry["rule_id"], active=False)
+                                           for entry in migrated]),
+                compute_changeset(fast_routing, self.fast_routing_key,
+                                  present=rows))
+
+    def diff(self, current_rules, fast_routing, migrated, fast_routing_changes):
+        before = {self.rules_table: [], self.fast_routing_table: []}
+        after = {self.rules_table: [], self.fast_routing_table: []}
+        for entry in migrated:
+            rule = current_rules[(str(entry["rule_id"]),)]
+            before[self.rules_table].append(dict(rule))
+            after[self.rules_table].append(dict(rule, active="0"))
+        for row in fast_routing_changes['insert']:
+            after[self.fast_routing_table].append(row)
+        return dict(before=before, after=after)
+
+    def manage_config(self, cursor, state):
+        if state:
+            flush_config(cursor, self.params, self.flush_state,
+                         "QUERY RULES", self.protocol)
+
+    def migrate(self, module, result, cursor):
+        current_rules, fast_routing = self.get_config(cursor)
+        migrated, skipped = self.plan(current_rules, fast_routing)
+        rule_changes, fast_routing_changes = self.compute_changes(
+            current_rules, fast_routing, migrated)
+
+        result['migrated'] = migrated
+        result['skipped'] = skipped
+        result['changed'] = bool(migrated)
+        if module._diff:
+            result['diff'] = self.diff(current_rules, fast_routing, migrated,
+                                       fast_routing_changes)
+
+        if not result['changed']:
+            result['msg'] = ("No rule in %s needs to be migrated." %
+                             self.rules_table)
+        elif module.check_mode:
+            result['msg'] = ("Rules would have been migrated to %s, however"
+                             " check_mode is enabled." % self.fast_routing_table)
+        else:
+            apply_changeset(cursor, self.fast_routing_table,
+                            self.fast_routing_key, fast_routing_changes)
+            apply_changeset(cursor, self.rules_table, ["rule_id"], rule_changes)
+            result['msg'] = "Migrated rules to %s" % self.fast_routing_table
+            self.manage_config(cursor, result['changed'])
+
+# ===========================================
+# Module execution.
+#
+
+
+def main():
+    argument_spec = proxysql_common_argument_spec()
+    argument_spec.update(
+        protocol=dict(default='mysql', choices=['mysql', 'pgsql']),
+        rule_ids=dict(type='list', elements='int'),
+        save_to_disk=dict(default=True, type='bool'),
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool'),
+    )
+
+    module = AnsibleModule(
+        supports_check_mode=True,
+        argument_spec=argument_spec
+    )
+
+    login_user = module.params["login_user"]
+    login_password = module.params["login_password"]
+    config_file = module.params["config_file"]
+
+    cursor = None
+    try:
+        cursor, db_conn, version = mysql_connect(module,
+                                                 login_user,
+                                                 login_password,
+                                                 config_file,
+                                                 cursor_class='DictCursor')
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to connect to ProxySQL Admin Module.. %s" % to_native(e)
+        )
+
+    migration = ProxyQueryRuleMigration(module)
+    result = {}
+
+    try:
+        migration.migrate(module, result, cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to migrate rules.. %s" % to_native(e)
+        )
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -119,11 +119,15 @@ stdout:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
+    merge_changes,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
 )
 from ansible.module_utils._text import to_native
 
@@ -132,6 +136,9 @@ from ansible.module_utils._text import to_native
 #
 
 
+KEY_COLUMNS = ["writer_hostgroup"]
+
+
 def perform_checks(module):
     if not module.params["writer_hostgroup"] >= 0:
         module.fail_json(
@@ -152,8 +159,8 @@ class ProxySQLReplicationHostgroup(object):
 
     def __init__(self, module, version):
         self.state = module.params["state"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
         self.writer_hostgroup = module.params["writer_hostgroup"]
         self.reader_hostgroup = module.params["reader_hostgroup"]
         self.comment = module.params["comment"]
@@ -161,74 +168,47 @@ class ProxySQLReplicationHostgroup(object):
         self.check_type_support = version.get('major') >= 2
         self.check_mode = module.check_mode
 
-    def check_repl_group_config(self, cursor, keys):
-        query_string = \
-            """SELECT count(*) AS `repl_groups`
-               FROM mysql_replication_hostgroups
-               WHERE writer_hostgroup = %s"""
-
-        query_data = \
-            [self.writer_hostgroup]
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return (int(check_count['repl_groups']) > 0)
+    def get_repl_groups_config(self, cursor):
+        return fetch_table(cursor, "mysql_replication_hostgroups", KEY_COLUMNS,
+                           match={'writer_hostgroup': self.writer_hostgroup})
 
     def get_repl_group_config(self, cursor):
-        query_string = \
-            """SELECT *
-               FROM mysql_replication_hostgroups
-               WHERE writer_hostgroup = %s"""
-
-        query_data = \
-            [self.writer_hostgroup]
-
-        cursor.execute(query_string, query_data)
-        repl_group = cursor.fetchone()
-        return repl_group
-
-    def create_repl_group_config(self, cursor):
-        query_string = \
-            """INSERT INTO mysql_replication_hostgroups (
-               writer_hostgroup,
-               reader_hostgroup,
-               comment)
-               VALUES (%s, %s, %s)"""
-
-        query_data = \
-            [self.writer_hostgroup,
-             self.reader_hostgroup,
-             self.comment or '']
-
-        cursor.execute(query_string, query_data)
-
+        repl_groups = self.get_repl_groups_config(cursor)
+        return next(iter(repl_groups.values()), None)
+
+    def compute_changes(self, current):
+        if self.state == "absent":
+            return compute_changeset(
+                current, KEY_COLUMNS,
+                absent=[{'writer_hostgroup': self.writer_hostgroup}])
+
+        repl_group = {
+            'writer_hostgroup': self.writer_hostgroup,
+            'reader_hostgroup': self.reader_hostgroup,
+            'comment': self.comment or '',
+        }
         if self.check_type_support:
-            self.update_check_type(cursor)
+            repl_group['check_type'] = self.check_type
+        for row in current.values():
+            # Skip columns the running version does not have.
+            repl_group = dict((k, v) for k, v in repl_group.items()
+                              if k in row)
 
-        return True
+        return compute_changeset(current, KEY_COLUMNS, present=[repl_group])
 
-    def delete_repl_group_config(self, cursor):
-        query_string = \
-            """DELETE FROM mysql_replication_hostgroups
-               WHERE writer_hostgroup = %s"""
-
-        query_data = \
-            [self.writer_hostgroup]
-
-        cursor.execute(query_string, query_data)
+    def apply_repl_group_config(self, cursor, changeset):
+        apply_changeset(cursor, "mysql_replication_hostgroups", KEY_COLUMNS,
+                        changeset)
         return True
 
     def manage_config(self, cursor, state):
         if state and not self.check_mode:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "SERVERS")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "SERVERS")
+            flush_config(cursor, self.params, self.flush_state, "SERVERS")
 
-    def create_repl_group(self, result, cursor):
+    def create_repl_group(self, result, cursor, changeset):
         if not self.check_mode:
             result['changed'] = \
-                self.create_repl_group_config(cursor)
+                self.apply_repl_group_config(cursor, changeset)
             result['msg'] = "Added server to mysql_hosts"
             result['repl_group'] = \
                 self.get_repl_group_config(cursor)
@@ -240,42 +220,25 @@ class ProxySQLReplicationHostgroup(object):
                              " mysql_replication_hostgroups, however" +
                              " check_mode is enabled.")
 
-    def update_repl_group(self, result, cursor):
-        current = self.get_repl_group_config(cursor)
-
-        if self.check_type_support and current.get('check_type') != self.check_type:
-            result['changed'] = True
-            if not self.check_mode:
-                result['msg'] = "Updated replication hostgroups"
-                self.update_check_type(cursor)
-            else:
-                result['msg'] = "Updated replication hostgroups in check_mode"
-
-        if current.get('comment') != self.comment:
-            result['changed'] = True
-            result['msg'] = "Updated replication hostgroups in check_mode"
-            if not self.check_mode:
-                result['msg'] = "Updated replication hostgroups"
-                self.update_comment(cursor)
-
-        if int(current.get('reader_hostgroup')) != self.reader_hostgroup:
-            result['changed'] = True
+    def update_repl_group(self, result, cursor, changeset, current):
+        result['changed'] = True
+        if not self.check_mode:
+            result['msg'] = "Updated replication hostgroups"
+            self.apply_repl_group_config(cursor, changeset)
+            result['repl_group'] = \
+                merge_changes(current, changeset['update'][0][1])
+        else:
             result['msg'] = "Updated replication hostgroups in check_mode"
-            if not self.check_mode:
-                result['msg'] = "Updated replication hostgroups"
-                self.update_reader_hostgroup(cursor)
-
-        result['repl_group'] = self.get_repl_group_config(cursor)
+            result['repl_group'] = current
 
         self.manage_config(cursor,
                            result['changed'])
 
-    def delete_repl_group(self, result, cursor):
+    def delete_repl_group(self, result, cursor, changeset, current):
         if not self.check_mode:
-            result['repl_group'] = \
-                self.get_repl_group_config(cursor)
+            result['repl_group'] = current
             result['changed'] = \
-                self.delete_repl_group_config(cursor)
+                self.apply_repl_group_config(cursor, changeset)
             result['msg'] = "Deleted server from mysql_hosts"
             self.manage_config(cursor,
                                result['changed'])
@@ -285,30 +248,6 @@ class ProxySQLReplicationHostgroup(object):
                              " mysql_replication_hostgroups, however" +
                              " check_mode is enabled.")
 
-    def update_check_type(self, cursor):
-        try:
-            query_string = ("UPDATE mysql_replication_hostgroups "
-                            "SET check_type = %s "
-                            "WHERE writer_hostgroup = %s")
-
-            cursor.execute(query_string, (self.check_type, self.writer_hostgroup))
-        except Exception as e:
-            pass
-
-    def update_reader_hostgroup(self, cursor):
-        query_string = ("UPDATE mysql_replication_hostgroups "
-                        "SET reader_hostgroup = %s "
-                        "WHERE writer_hostgroup = %s")
-
-        cursor.execute(query_string, (self.reader_hostgroup, self.writer_hostgroup))
-
-    def update_comment(self, cursor):
-        query_string = ("UPDATE mysql_replication_hostgroups "
-                        "SET comment = %s "
-                        "WHERE writer_hostgroup = %s ")
-
-        cursor.execute(query_string, (self.comment, self.writer_hostgroup))
-
 
 # ===========================================
 # Module execution.
@@ -327,7 +266,8 @@ def main():
         state=dict(default='present', choices=['present',
                                                'absent']),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool')
     )
 
     module = AnsibleModule(
@@ -359,16 +299,32 @@ def main():
     result['state'] = proxysql_repl_group.state
     result['changed'] = False
 
+    try:
+        current = proxysql_repl_group.get_repl_groups_config(cursor)
+    except mysql_driver.Error as e:
+        module.fail_json(
+            msg="unable to read replication hostgroup.. %s" % to_native(e)
+        )
+
+    repl_group = next(iter(current.values()), None)
+    changeset = proxysql_repl_group.compute_changes(current)
+
     if proxysql_repl_group.state == "present":
         try:
-            if not proxysql_repl_group.check_repl_group_config(cursor,
-                                                               keys=True):
+            if changeset['insert']:
                 proxysql_repl_group.create_repl_group(result,
-                                                      cursor)
+                                                      cursor,
+                                                      changeset)
+            elif changeset['update']:
+                proxysql_repl_group.update_repl_group(result,
+                                                      cursor,
+                                                      changeset,
+                                                      repl_group)
             else:
-                proxysql_repl_group.update_repl_group(result, cursor)
-
-                result['repl_group'] = proxysql_repl_group.get_repl_group_config(cursor)
+                result['msg'] = ("The repl group already exists in" +
+                                 " mysql_replication_hostgroups and doesn't" +
+                                 " need to be updated.")
+                result['repl_group'] = repl_group
 
         except mysql_driver.Error as e:
             module.fail_json(
@@ -377,9 +333,11 @@ def main():
 
     elif proxysql_repl_group.state == "absent":
         try:
-            if proxysql_repl_group.check_repl_group_config(cursor,
-                                                           keys=True):
-                proxysql_repl_group.delete_repl_group(result, cursor)
+            if changeset['delete']:
+                proxysql_repl_group.delete_repl_group(result,
+                                                      cursor,
+                                                      changeset,
+                                                      repl_group)
             else:
                 result['changed'] = False
                 result['msg'] = ("The repl group is already absent from the" +
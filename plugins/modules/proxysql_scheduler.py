@@ -136,11 +136,14 @@ stdout:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.proxysql.plugins.module_utils.mysql import (
+    apply_changeset,
+    compute_changeset,
+    fetch_table,
     mysql_connect,
     mysql_driver,
     proxysql_common_argument_spec,
-    save_config_to_disk,
-    load_config_to_runtime,
+    deferred_flush_path,
+    flush_config,
 )
 from ansible.module_utils._text import to_native
 
@@ -162,8 +165,8 @@ class ProxySQLSchedule(object):
     def __init__(self, module):
         self.state = module.params["state"]
         self.force_delete = module.params["force_delete"]
-        self.save_to_disk = module.params["save_to_disk"]
-        self.load_to_runtime = module.params["load_to_runtime"]
+        self.params = module.params
+        self.flush_state = deferred_flush_path(module)
         self.active = module.params["active"]
         self.interval_ms = module.params["interval_ms"]
         self.filename = module.params["filename"]
@@ -178,49 +181,17 @@ class ProxySQLSchedule(object):
         self.config_data = dict((k, module.params[k])
                                 for k in config_data_keys)
 
-    def check_schedule_config(self, cursor):
-        query_string = \
-            """SELECT count(*) AS `schedule_count`
-               FROM scheduler
-               WHERE active = %s
-                 AND interval_ms = %s
-                 AND filename = %s"""
-
-        query_data = \
-            [self.active,
-             self.interval_ms,
-             self.filename]
+    def get_schedules_config(self, cursor):
+        match = dict(active=self.active,
+                     interval_ms=self.interval_ms,
+                     filename=self.filename)
+        match.update((col, val) for col, val in self.config_data.items()
+                     if val is not None)
 
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += "\n  AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.fetchone()
-        return int(check_count['schedule_count'])
+        return fetch_table(cursor, "scheduler", ["id"], match=match)
 
     def get_schedule_config(self, cursor):
-        query_string = \
-            """SELECT *
-               FROM scheduler
-               WHERE active = %s
-                 AND interval_ms = %s
-                 AND filename = %s"""
-
-        query_data = \
-            [self.active,
-             self.interval_ms,
-             self.filename]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += "\n  AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        schedule = cursor.fetchall()
-        return schedule
+        return list(self.get_schedules_config(cursor).values())
 
     def create_schedule_config(self, cursor):
         query_string = \
@@ -250,33 +221,15 @@ class ProxySQLSchedule(object):
         cursor.execute(query_string, query_data)
         return True
 
-    def delete_schedule_config(self, cursor):
-        query_string = \
-            """DELETE FROM scheduler
-               WHERE active = %s
-                 AND interval_ms = %s
-                 AND filename = %s"""
-
-        query_data = \
-            [self.active,
-             self.interval_ms,
-             self.filename]
-
-        for col, val in self.config_data.items():
-            if val is not None:
-                query_data.append(val)
-                query_string += "\n  AND " + col + " = %s"
-
-        cursor.execute(query_string, query_data)
-        check_count = cursor.rowcount
-        return True, int(check_count)
+    def delete_schedule_config(self, cursor, schedules):
+        # Every schedule matching the given options is removed.
+        changeset = compute_changeset(schedules, ["id"], purge=True)
+        apply_changeset(cursor, "scheduler", ["id"], changeset)
+        return True
 
     def manage_config(self, cursor, state):
         if state:
-            if self.save_to_disk:
-                save_config_to_disk(cursor, "SCHEDULER")
-            if self.load_to_runtime:
-                load_config_to_runtime(cursor, "SCHEDULER")
+            flush_config(cursor, self.params, self.flush_state, "SCHEDULER")
 
     def create_schedule(self, check_mode, result, cursor):
         if not check_mode:
@@ -293,12 +246,11 @@ class ProxySQLSchedule(object):
                              " scheduler, however check_mode" +
                              " is enabled.")
 
-    def delete_schedule(self, check_mode, result, cursor):
+    def delete_schedule(self, check_mode, result, cursor, schedules):
         if not check_mode:
-            result['schedules'] = \
-                self.get_schedule_config(cursor)
+            result['schedules'] = list(schedules.values())
             result['changed'] = \
-                self.delete_schedule_config(cursor)
+                self.delete_schedule_config(cursor, schedules)
             result['msg'] = "Deleted schedule from scheduler"
             self.manage_config(cursor,
                                result['changed'])
@@ -329,7 +281,8 @@ def main():
                                                'absent']),
         force_delete=dict(default=False, type='bool'),
         save_to_disk=dict(default=True, type='bool'),
-        load_to_runtime=dict(default=True, type='bool')
+        load_to_runtime=dict(default=True, type='bool'),
+        defer_flush=dict(default=False, type='bool')
     )
 
     module = AnsibleModule(
@@ -363,7 +316,8 @@ def main():
 
     if proxysql_schedule.state == "present":
         try:
-            if proxysql_schedule.check_schedule_config(cursor) <= 0:
+            schedules = proxysql_schedule.get_schedules_config(cursor)
+            if not schedules:
                 proxysql_schedule.create_schedule(module.check_mode,
                                                   result,
                                                   cursor)
@@ -371,8 +325,7 @@ def main():
                 result['changed'] = False
                 result['msg'] = ("The schedule already exists and doesn't" +
                                  " need to be updated.")
-                result['schedules'] = \
-                    proxysql_schedule.get_schedule_config(cursor)
+                result['schedules'] = list(schedules.values())
         except mysql_driver.Error as e:
             module.fail_json(
                 msg="unable to modify schedule.. %s" % to_native(e)
@@ -380,13 +333,13 @@ def main():
 
     elif proxysql_schedule.state == "absent":
         try:
-            existing_schedules = \
-                proxysql_schedule.check_schedule_config(cursor)
-            if existing_schedules > 0:
-                if existing_schedules == 1 or proxysql_schedule.force_delete:
+            schedules = proxysql_schedule.get_schedules_config(cursor)
+            if len(schedules) > 0:
+                if len(schedules) == 1 or proxysql_schedule.force_delete:
                     proxysql_schedule.delete_schedule(module.check_mode,
                                                       result,
-                                                      cursor)
+                                                      cursor,
+                                                      schedules)
                 else:
                     module.fail_json(
                         msg=("Operation would delete multiple records" +